@@ -0,0 +1,124 @@
+"""Idempotency registry for side effects tied to a message.
+
+Each side effect is keyed by ``(message id, action)``. The first call to
+``once`` starts it and remembers its future for ``ttl`` seconds. A second call
+for the same key within that window starts nothing: while the first run is in
+flight it gets the same future, and afterwards it gets the remembered result.
+This covers a questions-channel message that also mentions the bot (both
+handlers would create a thread on it) and events that a gateway resume
+delivers twice. Failed actions are remembered too, so a duplicate does not
+repeat a call that just failed. Cancelled ones are forgotten.
+
+With a shared state backend, a new action also has to ``claim`` its key there
+before it starts. Another bot process that receives the same event (an
+overlapping deployment, or two instances during a rolling restart) then skips
+it instead of replying twice.
+"""
+
+import asyncio
+import os
+import time
+from collections import Counter, OrderedDict
+
+# Action names
+THREAD = "thread"
+COMMAND_REPLY = "command_reply"
+# Later replies of the same command use "command_reply:<n>"
+# Auto-response rules use "rule:<rule id>"
+RULE = "rule"
+
+
+class ActionRegistry:
+    """In-flight and recent actions by (message id, action), with a TTL"""
+
+    def __init__(self, ttl: float = 300.0, max_size: int = 10000, shared=None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.shared = shared
+
+        # (message id, action) -> (expires at, future), oldest first
+        self._entries = OrderedDict()
+
+        self.started = 0
+        self.suppressed = 0
+        self.suppressed_by_action = Counter()
+        self.claimed_elsewhere = 0
+
+    @classmethod
+    def from_env(cls, shared=None):
+        """Build a registry configured from ACTION_* environment variables"""
+        return cls(
+            ttl=float(os.getenv("ACTION_TTL", "300")),
+            max_size=int(os.getenv("ACTION_REGISTRY_SIZE", "10000")),
+            shared=shared,
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def once(self, message_id: int, action: str, start) -> asyncio.Future:
+        """Run ``start()`` unless this action already ran for the message recently
+
+        ``start`` returns an awaitable (a coroutine, or a future such as the one
+        ``OutboundScheduler.submit`` returns). Duplicates get the first call's
+        future instead. If another process claimed the action first, the
+        future resolves to None without calling ``start``.
+        """
+        now = time.monotonic()
+        self._expire(now)
+
+        key = (message_id, action)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.suppressed += 1
+            self.suppressed_by_action[action] += 1
+            return entry[1]
+
+        if self.shared is not None:
+            start = self._claimed(key, start)
+        future = asyncio.ensure_future(start())
+        future.add_done_callback(lambda done: self._finished(key, done))
+        self._entries[key] = (now + self.ttl, future)
+        self.started += 1
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return future
+
+    def stats(self) -> dict:
+        """Tracked keys and started/suppressed counts"""
+        return {
+            "tracked": len(self._entries),
+            "started": self.started,
+            "suppressed": self.suppressed,
+            "claimed_elsewhere": self.claimed_elsewhere,
+            **{
+                f"suppressed_{action}": count
+                for action, count in sorted(self.suppressed_by_action.items())
+            },
+        }
+
+    def _claimed(self, key: tuple, start):
+        async def run():
+            if not await self.shared.claim(f"{key[0]}:{key[1]}", self.ttl):
+                self.claimed_elsewhere += 1
+                return None
+            return await start()
+
+        return run
+
+    def _expire(self, now: float):
+        entries = self._entries
+        while entries:
+            key, (expires, _) = next(iter(entries.items()))
+            if expires > now:
+                return
+            del entries[key]
+
+    def _finished(self, key, future):
+        if future.cancelled():
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is future:
+                del self._entries[key]
+            return
+        # Fire-and-forget callers never await; don't let asyncio report it
+        future.exception()
@@ -0,0 +1,292 @@
+"""Bounded handler concurrency with priority classes and load shedding.
+
+discord.py runs every gateway event in its own task, with no limit on how many
+are in flight. Handlers wrapped by ``AdmissionController`` first take a slot:
+
+- Each class of work (commands, messages, member events, reactions) has its
+  own concurrency limit and a bounded queue of waiting handlers. All classes
+  share one global limit.
+- When a slot frees up it goes to the waiting handler of the highest-priority
+  class whose own limit allows it, so commands overtake a message flood.
+- When a class's queue is full, the arriving handler (``drop_newest``) or
+  the one that has waited longest (``drop_oldest``) is shed: it returns
+  without running.
+
+Optional work inside handlers, such as reply-context REST lookups, asks
+``allow(feature)`` first. Each feature has a pressure threshold, where
+pressure is handlers in flight plus waiting, divided by the global limit.
+Above its threshold the feature is skipped.
+"""
+
+import asyncio
+import functools
+import os
+import time
+from collections import Counter, deque
+
+# Classes of handler work
+CLASS_COMMAND = "command"
+CLASS_MESSAGE = "message"
+CLASS_MEMBER = "member"
+CLASS_REACTION = "reaction"
+
+# class -> (concurrency, queue size); classes are admitted in this order
+DEFAULT_LIMITS = {
+    CLASS_COMMAND: (16, 200),
+    CLASS_MESSAGE: (32, 1000),
+    CLASS_MEMBER: (16, 1000),
+    CLASS_REACTION: (16, 1000),
+}
+
+# What to shed when a class's queue is full
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+POLICIES = (DROP_OLDEST, DROP_NEWEST)
+
+# Optional work, shed when pressure reaches its threshold
+REPLY_LOOKUP = "reply_lookup"
+REACTION_LOOKUP = "reaction_lookup"
+DEBUG_LOG = "debug_log"
+
+DEFAULT_SHED = {
+    REPLY_LOOKUP: 1.0,
+    REACTION_LOOKUP: 1.0,
+    DEBUG_LOG: 0.75,
+}
+
+
+class AdmissionClass:
+    """Limit, wait queue and counters for one class of handlers"""
+
+    __slots__ = (
+        "name",
+        "limit",
+        "max_queue",
+        "in_flight",
+        "waiters",
+        "admitted",
+        "queued",
+        "shed",
+        "max_wait",
+        "overloaded",
+    )
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.waiters = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+        self.max_wait = 0.0
+        # Set from the first shed until the queue empties again
+        self.overloaded = False
+
+
+def parse_limits(spec: str) -> dict:
+    """``"command=16:200,message=32:1000"`` -> {class: (concurrency, queue)}"""
+    limits = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, values = item.partition("=")
+        concurrency, _, queue = values.partition(":")
+        limits[name.strip()] = (int(concurrency), int(queue or concurrency))
+    return limits
+
+
+def parse_shed(spec: str) -> dict:
+    """``"reply_lookup=1.0,debug_log=off"`` -> {feature: threshold or None}"""
+    shed = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, threshold = item.partition("=")
+        threshold = threshold.strip().lower()
+        shed[name.strip()] = None if threshold in ("", "off") else float(threshold)
+    return shed
+
+
+class AdmissionController:
+    """Per-class concurrency limits, priority hand-off and shedding
+
+    ``concurrency`` is the global limit; 0 admits everything immediately.
+    ``limits`` overrides entries of ``DEFAULT_LIMITS`` and ``shed`` entries of
+    ``DEFAULT_SHED`` (a threshold of None never sheds that feature).
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 64,
+        limits: dict = None,
+        policy: str = DROP_NEWEST,
+        shed: dict = None,
+        event_log=None,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown shed policy: {policy!r}")
+
+        self.concurrency = concurrency
+        self.policy = policy
+        self.event_log = event_log
+        self.shed_at = {**DEFAULT_SHED, **(shed or {})}
+
+        limits = {**DEFAULT_LIMITS, **(limits or {})}
+        # Dict order is priority order
+        self._classes = {
+            name: AdmissionClass(name, limit, max_queue)
+            for name, (limit, max_queue) in limits.items()
+        }
+
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.features_shed = Counter()
+
+    @classmethod
+    def from_env(cls, event_log=None):
+        """Build a controller configured from ADMISSION_* environment variables"""
+        return cls(
+            concurrency=int(os.getenv("ADMISSION_CONCURRENCY", "64")),
+            limits=parse_limits(os.getenv("ADMISSION_LIMITS", "")),
+            policy=os.getenv("ADMISSION_POLICY", DROP_NEWEST),
+            shed=parse_shed(os.getenv("ADMISSION_SHED", "")),
+            event_log=event_log,
+        )
+
+    async def acquire(self, name: str) -> bool:
+        """Wait for a slot in class ``name``; False if the handler was shed"""
+        if not self.concurrency:
+            return True
+        klass = self._classes[name]
+        if klass.in_flight < klass.limit and self.in_flight < self.concurrency:
+            self._admit(klass)
+            return True
+
+        waiters = klass.waiters
+        if len(waiters) >= klass.max_queue:
+            self._shed(klass)
+            if self.policy == DROP_NEWEST or not self._pop(waiters, False):
+                return False
+
+        future = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        klass.queued += 1
+        started = time.monotonic()
+        try:
+            admitted = await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                if future in waiters:
+                    waiters.remove(future)
+            elif future.result():
+                # The slot was handed over just before the cancellation
+                self.release(name)
+            raise
+
+        if admitted:
+            klass.max_wait = max(klass.max_wait, time.monotonic() - started)
+        return admitted
+
+    def release(self, name: str):
+        """Give back a slot taken by a successful ``acquire``"""
+        if not self.concurrency:
+            return
+        self._classes[name].in_flight -= 1
+        self.in_flight -= 1
+        self._wake()
+
+    def guard(self, name: str):
+        """Decorator running an async handler only once admitted to ``name``"""
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if not await self.acquire(name):
+                    return None
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self.release(name)
+
+            return wrapper
+
+        return decorator
+
+    def pressure(self) -> float:
+        """Handlers in flight plus waiting, relative to the global limit"""
+        if not self.concurrency:
+            return 0.0
+        waiting = sum(len(klass.waiters) for klass in self._classes.values())
+        return (self.in_flight + waiting) / self.concurrency
+
+    def allow(self, feature: str) -> bool:
+        """Whether optional work ``feature`` should run at the current pressure"""
+        threshold = self.shed_at.get(feature)
+        if threshold is None or self.pressure() < threshold:
+            return True
+        self.features_shed[feature] += 1
+        return False
+
+    def stats(self) -> dict:
+        """Global and per-class occupancy, queueing and shedding counters"""
+        stats = {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "pressure": round(self.pressure(), 3),
+        }
+        for name, klass in self._classes.items():
+            stats[f"{name}_in_flight"] = klass.in_flight
+            stats[f"{name}_waiting"] = len(klass.waiters)
+            stats[f"{name}_admitted"] = klass.admitted
+            stats[f"{name}_queued"] = klass.queued
+            stats[f"{name}_shed"] = klass.shed
+            stats[f"{name}_max_wait_ms"] = round(klass.max_wait * 1000, 2)
+        for feature in self.shed_at:
+            stats[f"{feature}_shed"] = self.features_shed[feature]
+        return stats
+
+    def _admit(self, klass: AdmissionClass):
+        klass.in_flight += 1
+        klass.admitted += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _wake(self):
+        # Hand free slots to waiters, highest-priority class first
+        while self.in_flight < self.concurrency:
+            for klass in self._classes.values():
+                if klass.waiters and klass.in_flight < klass.limit:
+                    break
+            else:
+                return
+            if self._pop(klass.waiters, True):
+                self._admit(klass)
+            if klass.overloaded and not klass.waiters:
+                klass.overloaded = False
+                if self.event_log is not None:
+                    self.event_log.emit(
+                        "overload_ended", admission_class=klass.name, shed=klass.shed
+                    )
+
+    def _pop(self, waiters: deque, result: bool) -> bool:
+        # Cancelled waiters may still be queued until their task runs
+        while waiters:
+            future = waiters.popleft()
+            if not future.done():
+                future.set_result(result)
+                return True
+        return False
+
+    def _shed(self, klass: AdmissionClass):
+        klass.shed += 1
+        if not klass.overloaded:
+            klass.overloaded = True
+            if self.event_log is not None:
+                self.event_log.emit(
+                    "overload_started",
+                    admission_class=klass.name,
+                    in_flight=klass.in_flight,
+                    waiting=len(klass.waiters),
+                )
@@ -0,0 +1,159 @@
+"""Bounded in-memory queue drained in batches by one background thread.
+
+``EventLog``, ``EventStore`` and the SQLite state backend all turn calls made
+on the event loop into batched writes on a thread of their own. They share
+this writer: ``put`` only appends to a deque under a lock. The thread wakes
+when a full batch is queued or every ``flush_interval`` seconds and hands
+everything queued to ``write``. It owns whatever ``connect`` returns (a
+database connection, say) for its whole life, and it can run periodic
+maintenance such as deleting expired rows between batches.
+"""
+
+import threading
+import time
+from collections import deque
+
+# What to do when the queue is full
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+POLICIES = (DROP_OLDEST, DROP_NEWEST)
+
+
+class BatchWriter:
+    """Queue of items written in batches by a background thread
+
+    ``write(resource, batch)`` writes a deque of items; an exception counts
+    the batch as dropped and is passed to ``on_error(error, rows)``.
+    ``connect()`` runs on the thread before the first batch and its result is
+    the ``resource``. ``disconnect(resource)`` runs after the last batch.
+    ``maintain(resource)`` runs between batches, first at startup and then
+    every ``maintain_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        write,
+        name: str,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        max_queue: int = 10000,
+        policy: str = DROP_NEWEST,
+        connect=None,
+        disconnect=None,
+        maintain=None,
+        maintain_interval: float = 3600.0,
+        on_error=None,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown drop policy: {policy!r}")
+
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.policy = policy
+        self.maintain_interval = maintain_interval
+
+        self._write = write
+        self._connect = connect
+        self._disconnect = disconnect
+        self._maintain = maintain
+        self._on_error = on_error
+
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+
+        self._queue = deque()
+        self._cond = threading.Condition(threading.Lock())
+        self._thread = None
+        self._closed = False
+
+    def __len__(self):
+        return len(self._queue)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def put(self, item) -> bool:
+        """Queue an item; never blocks on I/O. False if the item was dropped"""
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                self.dropped += 1
+                if self.policy == DROP_NEWEST:
+                    return False
+                self._queue.popleft()
+            self._queue.append(item)
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def start(self):
+        """Start the writer thread; returns once ``connect`` has run"""
+        if self._thread is not None:
+            return
+        self._closed = False
+        ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(ready,), name=self.name, daemon=True
+        )
+        self._thread.start()
+        ready.wait()
+
+    def close(self, timeout: float = 10.0):
+        """Stop the writer thread after writing everything still queued"""
+        if self._thread is None:
+            return
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def drain(self, resource=None):
+        """Write everything queued on the calling thread (writer not running)"""
+        self._flush(resource, self._take())
+
+    def _take(self):
+        with self._cond:
+            batch = self._queue
+            self._queue = deque()
+        return batch
+
+    def _run(self, ready: threading.Event):
+        try:
+            resource = self._connect() if self._connect is not None else None
+        finally:
+            ready.set()
+        next_maintenance = time.monotonic()
+        try:
+            while True:
+                with self._cond:
+                    if not self._closed and len(self._queue) < self.batch_size:
+                        self._cond.wait(self.flush_interval)
+                    closed = self._closed
+                self._flush(resource, self._take())
+                if closed:
+                    self._flush(resource, self._take())
+                    return
+                if self._maintain is not None and time.monotonic() >= next_maintenance:
+                    self._maintain(resource)
+                    next_maintenance = time.monotonic() + self.maintain_interval
+        finally:
+            if self._disconnect is not None:
+                self._disconnect(resource)
+
+    def _flush(self, resource, batch):
+        if not batch:
+            return
+        try:
+            self._write(resource, batch)
+        except Exception as e:
+            # Losing a batch is preferable to killing the writer thread
+            self.dropped += len(batch)
+            if self._on_error is not None:
+                self._on_error(e, len(batch))
+            return
+        self.written += len(batch)
+        self.batches += 1
@@ -0,0 +1 @@
+"""Benchmarks for the bot's hot paths. Run modules with ``python -m benchmarks.<name>``."""
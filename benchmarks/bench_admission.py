@@ -0,0 +1,166 @@
+"""Spam flood: unbounded handler tasks vs the AdmissionController.
+
+Delivers ``--messages`` message events over ``--burst`` seconds, one task per
+event as discord.py dispatches them, plus a ``!ping`` command every
+``--command-every`` seconds. A message handler resolves its reply target over
+simulated REST and then sends; a command only sends. The send path is shared
+and slows down as more requests are in flight, like a saturated HTTP client.
+
+The unbounded run awaits everything. The admitted run wraps handlers in an
+``AdmissionController`` with the bot's default classes, so commands are
+admitted first, queued messages beyond the limit are shed and reply lookups
+are skipped under pressure. The benchmark reports command latency, peak
+handler tasks in flight, the tracemalloc peak and shed counts.
+
+    python -m benchmarks.bench_admission [--messages 20000] [--burst 2] [--rest-latency 0.05]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+from admission import (
+    CLASS_COMMAND,
+    CLASS_MESSAGE,
+    REPLY_LOOKUP,
+    AdmissionController,
+)
+
+
+class FakeHTTP:
+    """REST stand-in whose latency grows with the requests in flight"""
+
+    def __init__(self, latency: float, capacity: int):
+        self.latency = latency
+        self.capacity = capacity
+        self.in_flight = 0
+        self.requests = 0
+
+    async def request(self, payload: bytes):
+        self.in_flight += 1
+        self.requests += 1
+        try:
+            # Past capacity every request queues behind the others
+            await asyncio.sleep(self.latency * max(1.0, self.in_flight / self.capacity))
+            return payload
+        finally:
+            self.in_flight -= 1
+
+
+class Handlers:
+    """Message and command handlers, optionally behind admission control"""
+
+    def __init__(self, http: FakeHTTP, admission=None):
+        self.http = http
+        self.admission = admission
+        self.tasks = 0
+        self.max_tasks = 0
+        self.command_latency = []
+
+    async def on_message(self, content: bytes):
+        self._enter()
+        try:
+            if self.admission is None:
+                await self._message(content)
+                return
+            if not await self.admission.acquire(CLASS_MESSAGE):
+                return
+            try:
+                await self._message(content)
+            finally:
+                self.admission.release(CLASS_MESSAGE)
+        finally:
+            self.tasks -= 1
+
+    async def on_command(self):
+        self._enter()
+        started = time.perf_counter()
+        try:
+            if self.admission is None:
+                await self.http.request(b"pong")
+            elif await self.admission.acquire(CLASS_COMMAND):
+                try:
+                    await self.http.request(b"pong")
+                finally:
+                    self.admission.release(CLASS_COMMAND)
+            self.command_latency.append(time.perf_counter() - started)
+        finally:
+            self.tasks -= 1
+
+    async def _message(self, content: bytes):
+        # Reply context is optional work
+        if self.admission is None or self.admission.allow(REPLY_LOOKUP):
+            content += await self.http.request(b"original message " * 8)
+        await self.http.request(content)
+
+    def _enter(self):
+        self.tasks += 1
+        self.max_tasks = max(self.max_tasks, self.tasks)
+
+
+async def flood(handlers: Handlers, messages: int, burst: float, command_every: float):
+    tasks = []
+    per_tick = max(1, int(messages * 0.001 / burst))
+    next_command = 0.0
+    start = time.perf_counter()
+    for i in range(0, messages, per_tick):
+        for j in range(i, min(i + per_tick, messages)):
+            tasks.append(asyncio.create_task(handlers.on_message(b"spam %d" % j)))
+        elapsed = time.perf_counter() - start
+        if elapsed >= next_command:
+            tasks.append(asyncio.create_task(handlers.on_command()))
+            next_command += command_every
+        await asyncio.sleep(0.001)
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start
+
+
+def run(name: str, args, admission=None):
+    http = FakeHTTP(args.rest_latency, args.capacity)
+    handlers = Handlers(http, admission)
+
+    tracemalloc.start()
+    wall = asyncio.run(flood(handlers, args.messages, args.burst, args.command_every))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latency = sorted(handlers.command_latency)
+    p50 = statistics.median(latency) * 1000
+    p99 = latency[min(len(latency) - 1, int(len(latency) * 0.99))] * 1000
+    print(
+        f"{name:<10} !ping p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  "
+        f"{handlers.max_tasks:>6} tasks peak  {peak / 2**20:6.1f} MiB peak  "
+        f"{http.requests:>6} REST  {wall:5.2f} s wall"
+    )
+    if admission is not None:
+        stats = admission.stats()
+        print(
+            f"{'':<10} {stats['message_shed']} messages shed, "
+            f"{stats['reply_lookup_shed']} reply lookups skipped, "
+            f"message max wait {stats['message_max_wait_ms']} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--burst", type=float, default=2.0)
+    parser.add_argument("--command-every", type=float, default=0.05)
+    parser.add_argument("--rest-latency", type=float, default=0.05)
+    parser.add_argument("--capacity", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    print(
+        f"{args.messages:,} messages over {args.burst:g} s, !ping every "
+        f"{args.command_every * 1000:g} ms, {args.rest_latency * 1000:g} ms REST "
+        f"latency up to {args.capacity} requests in flight"
+    )
+    run("unbounded", args)
+    run("admitted", args, AdmissionController(concurrency=args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
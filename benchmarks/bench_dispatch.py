@@ -0,0 +1,152 @@
+"""Per-event cost of the old inline reaction handler vs the dispatch layer.
+
+The event mix mirrors a busy guild: a share of reactions come from bots or
+DMs and are rejected, the rest are logged. Both paths format the same log
+fields; the old path also builds its DEBUG lines before the bot filter, as
+on_reaction_add used to.
+
+    python -m benchmarks.bench_dispatch [--events N]
+"""
+
+import argparse
+import asyncio
+import io
+import time
+from types import SimpleNamespace
+
+import discord
+
+from dispatch import (
+    REACTION_ADD,
+    EventDispatcher,
+    channel_fields,
+    from_reaction,
+)
+
+
+def make_channel(cls, channel_id, name, guild):
+    channel = cls.__new__(cls)
+    channel.id = channel_id
+    if cls is not discord.DMChannel:
+        channel.name = name
+        channel.guild = guild
+    return channel
+
+
+def make_events(n: int):
+    guild = SimpleNamespace(id=1, name="Bench Guild")
+    text = make_channel(discord.TextChannel, 10, "general", guild)
+    dm = make_channel(discord.DMChannel, 11, None, None)
+    human = SimpleNamespace(id=100, name="human", bot=False)
+    bot_user = SimpleNamespace(id=200, name="robot", bot=True)
+    author = SimpleNamespace(id=300, name="author", bot=False)
+
+    events = []
+    for i in range(n):
+        slot = i % 10
+        if slot < 3:
+            channel, user, msg_guild = text, bot_user, guild
+        elif slot < 5:
+            channel, user, msg_guild = dm, human, None
+        else:
+            channel, user, msg_guild = text, human, guild
+        message = SimpleNamespace(
+            id=i, channel=channel, guild=msg_guild, author=author, content="hello"
+        )
+        events.append((SimpleNamespace(emoji="👍", message=message), user))
+    return events
+
+
+async def old_handler(reaction, user, sink):
+    print(f"🔍 DEBUG: Reaction event triggered!", file=sink)
+    print(f"🔍 DEBUG: User: {user.name}, Bot: {user.bot}", file=sink)
+    print(f"🔍 DEBUG: Channel type: {type(reaction.message.channel)}", file=sink)
+    print(
+        f"🔍 DEBUG: Guild: {reaction.message.guild.name if reaction.message.guild else 'DM'}",
+        file=sink,
+    )
+    if user.bot:
+        return
+    if isinstance(
+        reaction.message.channel,
+        (discord.TextChannel, discord.Thread, discord.ForumChannel),
+    ):
+        record = {
+            "emoji": str(reaction.emoji),
+            "user": user.name,
+            "user_id": user.id,
+            "message_id": reaction.message.id,
+            "content": reaction.message.content,
+            "message_author": reaction.message.author.name,
+            "guild_id": reaction.message.guild.id,
+        }
+        if isinstance(reaction.message.channel, discord.Thread):
+            record["thread"] = reaction.message.channel.name
+        elif isinstance(reaction.message.channel, discord.ForumChannel):
+            record["forum"] = reaction.message.channel.name
+        else:
+            record["channel"] = reaction.message.channel.name
+        sink.records.append(record)
+
+
+class NullSink(io.StringIO):
+    """Discards printed text but keeps records so both paths do equal work"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def write(self, data):
+        return len(data)
+
+
+async def bench_old(events):
+    sink = NullSink()
+    start = time.perf_counter()
+    for reaction, user in events:
+        await old_handler(reaction, user, sink)
+    return time.perf_counter() - start
+
+
+async def bench_new(events):
+    records = []
+    dispatcher = EventDispatcher()
+
+    @dispatcher.consumer(REACTION_ADD)
+    async def log_reaction(record):
+        reaction = record.source
+        records.append(
+            {
+                "emoji": str(reaction.emoji),
+                "user": record.user.name,
+                "user_id": record.user_id,
+                "message_id": record.message_id,
+                "content": reaction.message.content,
+                "message_author": reaction.message.author.name,
+                "guild_id": record.guild_id,
+                **channel_fields(record),
+            }
+        )
+
+    start = time.perf_counter()
+    for reaction, user in events:
+        record = from_reaction(REACTION_ADD, reaction, user)
+        if record is not None:
+            await dispatcher.dispatch(record)
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    old = await bench_old(events)
+    new = await bench_new(events)
+    print(f"inline handler: {old / args.events * 1e6:6.2f} µs/event")
+    print(f"dispatch layer: {new / args.events * 1e6:6.2f} µs/event")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
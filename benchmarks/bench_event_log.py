@@ -0,0 +1,78 @@
+"""Events/sec of synchronous print() logging vs the batched EventLog.
+
+Each simulated event writes the same 6 lines the old handlers printed. The
+output stream is a slow writer that sleeps on every write() call, standing in
+for a congested pipe or container log driver.
+
+    python -m benchmarks.bench_event_log [--events N] [--write-latency SECONDS]
+"""
+
+import argparse
+import time
+
+from event_log import EventLog
+
+
+class SlowStream:
+    """File-like object whose writes cost a fixed latency"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.writes = 0
+
+    def write(self, data):
+        time.sleep(self.latency)
+        self.writes += 1
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def bench_print(events: int, stream) -> float:
+    start = time.perf_counter()
+    for i in range(events):
+        print(f"📝 Message: hello world {i}", file=stream)
+        print(f"👤 Author: someone (ID: {i})", file=stream)
+        print("🏠 Guild: Bench Guild", file=stream)
+        print("📍 Channel: general", file=stream)
+        print(f"🔗 Reply to message ID: {i}", file=stream)
+        print("---" * 20, file=stream)
+    return time.perf_counter() - start
+
+
+def bench_event_log(events: int, stream) -> tuple:
+    log = EventLog(stream=stream, max_buffer=events, batch_size=512)
+    log.start()
+    start = time.perf_counter()
+    for i in range(events):
+        log.emit(
+            "message",
+            content=f"hello world {i}",
+            author="someone",
+            author_id=i,
+            guild_id=1,
+            channel="general",
+            reply_to=i,
+        )
+    elapsed = time.perf_counter() - start
+    log.close()
+    return elapsed, log.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--write-latency", type=float, default=0.0002)
+    args = parser.parse_args()
+
+    elapsed = bench_print(args.events, SlowStream(args.write_latency))
+    print(f"print():  {args.events / elapsed:>12,.0f} events/sec")
+
+    elapsed, stats = bench_event_log(args.events, SlowStream(args.write_latency))
+    print(f"EventLog: {args.events / elapsed:>12,.0f} events/sec (handler side)")
+    print(f"          {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Sustained insert rate of EventStore under a synthetic event flood.
+
+The flood records message, reaction and delete events as fast as one thread
+can call ``EventStore.record``. It reports the handler-side cost per call and
+the rate at which the writer gets rows onto disk. For comparison, the naive
+approach commits every event in its own transaction on the same schema.
+
+    python -m benchmarks.bench_event_store [--events N] [--naive-events N]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from event_store import INSERT, EventStore
+
+KINDS = ("message", "message", "message", "reaction_add", "message_delete")
+
+
+def flood_row(i: int) -> dict:
+    return {
+        "kind": KINDS[i % len(KINDS)],
+        "guild_id": 1 + i % 10,
+        "channel_id": 100 + i % 50,
+        "user_id": 10**16 + i % 5000,
+        "message_id": 10**17 + i,
+        "content": f"synthetic message number {i} with a little text",
+    }
+
+
+def bench_store(path: str, events: int) -> dict:
+    store = EventStore(path, max_queue=events)
+    store.start()
+    rows = [flood_row(i) for i in range(events)]
+
+    start = time.perf_counter()
+    for row in rows:
+        store.record(**row)
+    recorded = time.perf_counter() - start
+
+    while store.written + store.dropped < events:
+        time.sleep(0.01)
+    written = time.perf_counter() - start
+    store.close()
+    return {
+        "record_us": recorded / events * 1e6,
+        "inserts_per_sec": store.written / written,
+        "batches": store.batches,
+        "dropped": store.dropped,
+    }
+
+
+def bench_naive(path: str, events: int) -> float:
+    # Reuse EventStore's connection setup so only the write pattern differs
+    connection = EventStore(path)._connect()
+    start = time.perf_counter()
+    for i in range(events):
+        row = flood_row(i)
+        connection.execute(
+            INSERT,
+            (
+                time.time(),
+                row["kind"],
+                row["guild_id"],
+                row["channel_id"],
+                row["user_id"],
+                row["message_id"],
+                row["content"],
+                None,
+            ),
+        )
+    elapsed = time.perf_counter() - start
+    connection.close()
+    return events / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--naive-events", type=int, default=5_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        naive = bench_naive(os.path.join(tmp, "naive.db"), args.naive_events)
+        path = os.path.join(tmp, "events.db")
+        result = bench_store(path, args.events)
+        size = os.path.getsize(path) / 2**20
+
+        # Indexed lookups the moderation commands rely on
+        connection = sqlite3.connect(path)
+        start = time.perf_counter()
+        for i in range(1000):
+            connection.execute(
+                "SELECT * FROM events WHERE message_id = ?", (10**17 + i * 97,)
+            ).fetchall()
+        lookup = (time.perf_counter() - start) / 1000
+        connection.close()
+
+    print(f"per-event commits: {naive:10,.0f} inserts/s")
+    print(
+        f"EventStore:        {result['inserts_per_sec']:10,.0f} inserts/s "
+        f"({result['batches']} batches, {result['dropped']} dropped)"
+    )
+    print(f"handler cost:      {result['record_us']:10.2f} µs/event")
+    print(f"database:          {size:10.1f} MiB for {args.events:,} events")
+    print(f"message_id lookup: {lookup * 1e6:10.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
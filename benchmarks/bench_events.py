@@ -0,0 +1,209 @@
+"""Event throughput of bot.py's handlers against a stored baseline.
+
+Each scenario replays a synthetic (or recorded, with ``--stream``) gateway
+stream through ``benchmarks.replay`` in a fresh subprocess, so peak RSS and the
+module-level caches are per scenario. Events/sec and p50/p99 handler latency are
+the best of five timed passes; one more pass runs under tracemalloc for the
+allocation peak. HTTP calls are counted over one timed pass. With ``--runs N``
+each scenario runs in N subprocesses and every metric is their median.
+Results are compared with ``benchmarks/baseline.json``, each metric with its
+own tolerance.
+
+    python -m benchmarks.bench_events [--events N] [--scenarios messages joins]
+    python -m benchmarks.bench_events --save-baseline   # median of 3 runs
+    python -m benchmarks.bench_events --stream recorded.jsonl
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tracemalloc
+
+from benchmarks.replay import SCENARIOS, ReplayEnvironment, load_stream, replay
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# Allowed change before a metric is flagged as a regression: a fraction of the
+# baseline plus an absolute slack. Tail latency varies most between runs.
+# Greetings are batched by time window, so joins make a few more or fewer
+# HTTP calls depending on speed; anything beyond that is a real extra call.
+TOLERANCES = {
+    "events_per_sec": (0.3, 0),
+    "p99_us": (0.5, 50),
+    "alloc_peak_kib": (0.25, 0),
+    "peak_rss_mib": (0.25, 0),
+    "http_calls": (0.1, 20),
+}
+
+# Metrics where a lower value is the regression
+HIGHER_IS_BETTER = ("events_per_sec",)
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_scenario(
+    scenario: str, events: int, stream: str = None, repeat: int = 5
+) -> dict:
+    def make_stream(index: int) -> list:
+        if stream:
+            return load_stream(stream)
+        # Fresh ids per pass, so repeats aren't deduplicated as redeliveries
+        return SCENARIOS[scenario](events, start_id=10**15 + index * 10**8)
+
+    events_list = make_stream(0)
+    env = ReplayEnvironment()
+    await env.setup()
+
+    # Warm-up pass so imports and first-use caches don't skew the timing
+    await replay(env, events_list[: min(200, len(events_list))])
+
+    # Best of ``repeat`` timed passes keeps scheduler noise out of the comparison
+    runs = []
+    for index in range(repeat):
+        calls = sum(env.http.calls.values())
+        runs.append(await replay(env, make_stream(index + 1)))
+        if index == 0:
+            http_calls = sum(env.http.calls.values()) - calls
+    handled = min(run["handled_seconds"] for run in runs)
+    p50 = min(percentile(run["latencies"], 0.50) for run in runs)
+    p99 = min(percentile(run["latencies"], 0.99) for run in runs)
+
+    traced = make_stream(repeat + 1)
+    gc.collect()
+    tracemalloc.start()
+    await replay(env, traced)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    await env.close()
+    return {
+        "scenario": scenario,
+        "events": len(events_list),
+        "events_per_sec": round(len(events_list) / handled),
+        "p50_us": round(p50 * 1e6, 1),
+        "p99_us": round(p99 * 1e6, 1),
+        "alloc_peak_kib": round(peak / 1024, 1),
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mib": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+        "http_calls": http_calls,
+    }
+
+
+def spawn(scenario: str, events: int, stream: str = None) -> dict:
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.bench_events",
+        "--scenario",
+        scenario,
+        "--events",
+        str(events),
+    ]
+    if stream:
+        command += ["--stream", stream]
+    output = subprocess.run(
+        command, capture_output=True, text=True, check=True, cwd=ROOT
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def median_result(results: list) -> dict:
+    """Per-metric median of several runs of one scenario"""
+    merged = dict(results[0])
+    for key, value in merged.items():
+        if isinstance(value, (int, float)):
+            merged[key] = statistics.median(result[key] for result in results)
+    return merged
+
+
+def compare(result: dict, baseline: dict) -> list:
+    """Human-readable regressions of ``result`` against its baseline entry"""
+    regressions = []
+    for key, (fraction, slack) in TOLERANCES.items():
+        if key not in baseline:
+            continue
+        allowed = baseline[key] * fraction + slack
+        if key in HIGHER_IS_BETTER:
+            if result[key] < baseline[key] - allowed:
+                regressions.append(f"{key} {result[key]:,} < {baseline[key]:,}")
+        elif result[key] > baseline[key] + allowed:
+            regressions.append(f"{key} {result[key]:,} > {baseline[key]:,}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=5_000)
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS)
+    )
+    parser.add_argument("--stream", help="replay a recorded JSONL stream instead")
+    parser.add_argument(
+        "--runs",
+        type=int,
+        help="subprocesses per scenario, medians reported (1, or 3 when saving)",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store these results as baseline"
+    )
+    parser.add_argument("--scenario", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        result = asyncio.run(run_scenario(args.scenario, args.events, args.stream))
+        print(json.dumps(result))
+        return
+
+    scenarios = ["recorded"] if args.stream else args.scenarios
+    runs = args.runs or (3 if args.save_baseline else 1)
+    try:
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = {}
+
+    results = {}
+    failed = False
+    for scenario in scenarios:
+        result = results[scenario] = median_result(
+            [spawn(scenario, args.events, args.stream) for _ in range(runs)]
+        )
+        print(
+            f"{scenario:>9}: {result['events_per_sec']:>8,} events/s  "
+            f"p50 {result['p50_us']:7.1f} µs  p99 {result['p99_us']:7.1f} µs  "
+            f"alloc peak {result['alloc_peak_kib']:8.1f} KiB  "
+            f"RSS {result['peak_rss_mib']:6.1f} MiB  "
+            f"HTTP {result['http_calls']}"
+        )
+        if scenario in baseline and not args.save_baseline:
+            regressions = compare(result, baseline[scenario])
+            for regression in regressions:
+                print(f"           ❌ regression: {regression}")
+            if not regressions:
+                print("           ✅ within baseline")
+            failed = failed or bool(regressions)
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(BASELINE, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"saved baseline to {os.path.relpath(BASELINE, ROOT)}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
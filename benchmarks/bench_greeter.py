@@ -0,0 +1,105 @@
+"""Simulated 1,000-member join burst: one send per join vs GreetingDispatcher.
+
+The mocked channel enforces a Discord-like per-channel rate limit (5 sends per
+window, scaled down so the benchmark finishes quickly) and serialises sends the
+way discord.py's HTTP client does.
+
+    python -m benchmarks.bench_greeter [--joins N] [--burst SECONDS]
+"""
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from greeter import WELCOME, GreetingDispatcher
+
+
+class MockChannel:
+    """Channel whose send() obeys a fixed-window rate limit"""
+
+    def __init__(self, limit: int = 5, per: float = 0.05):
+        self.id = 1
+        self.name = "welcome"
+        self.guild = SimpleNamespace(id=1, name="Bench Guild")
+        self.limit = limit
+        self.per = per
+        self.sent = []
+        self._lock = asyncio.Lock()
+        self._window_start = 0.0
+        self._window_count = 0
+
+    async def send(self, content):
+        async with self._lock:
+            now = time.perf_counter()
+            if now - self._window_start >= self.per:
+                self._window_start = now
+                self._window_count = 0
+            if self._window_count >= self.limit:
+                await asyncio.sleep(self._window_start + self.per - now)
+                self._window_start = time.perf_counter()
+                self._window_count = 0
+            self._window_count += 1
+            self.sent.append(content)
+
+
+def make_member(i, guild):
+    return SimpleNamespace(id=i, name=f"user{i}", mention=f"<@{i}>", guild=guild)
+
+
+def render(kind, members, overflow):
+    if len(members) == 1 and not overflow:
+        return f"Welcome {members[0].mention}!"
+    return f"Welcome {', '.join(m.mention for m in members)} and {overflow} more!"
+
+
+async def joins(n: int, burst: float, on_join):
+    """Deliver ``n`` joins spread evenly over ``burst`` seconds"""
+    channel = MockChannel()
+    delay = burst / n
+    for i in range(n):
+        on_join(channel, make_member(i, channel.guild))
+        await asyncio.sleep(delay)
+    return channel
+
+
+async def bench_naive(n: int, burst: float):
+    tasks = []
+
+    def on_join(channel, member):
+        tasks.append(asyncio.create_task(channel.send(render(WELCOME, [member], 0))))
+
+    start = time.perf_counter()
+    channel = await joins(n, burst, on_join)
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start, len(channel.sent), None
+
+
+async def bench_dispatcher(n: int, burst: float, window: float):
+    dispatcher = GreetingDispatcher(render, window=window, max_mentions=20)
+
+    start = time.perf_counter()
+    channel = await joins(
+        n, burst, lambda channel, member: dispatcher.submit(WELCOME, channel, member)
+    )
+    await dispatcher.drain()
+    return time.perf_counter() - start, len(channel.sent), dispatcher.stats()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--joins", type=int, default=1000)
+    parser.add_argument("--burst", type=float, default=1.0)
+    parser.add_argument("--window", type=float, default=0.1)
+    args = parser.parse_args()
+
+    elapsed, sends, _ = await bench_naive(args.joins, args.burst)
+    print(f"naive:      {sends:>5} sends, last greeting after {elapsed:.2f}s")
+
+    elapsed, sends, stats = await bench_dispatcher(args.joins, args.burst, args.window)
+    print(f"dispatcher: {sends:>5} sends, last greeting after {elapsed:.2f}s")
+    print(f"            {stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,160 @@
+"""Member search and export cost on a synthetic large guild.
+
+Compares a name-prefix search through ``MemberIndex`` with the naive approach
+of filtering and sorting ``guild.members`` for every query, measures the
+incremental cost of joins and leaves, and checks that a streamed export's
+allocation peak stays flat as the guild grows while formatting the whole list
+in memory does not.
+
+    python -m benchmarks.bench_member_index [--members 100000] [--queries 200]
+"""
+
+import argparse
+import asyncio
+import datetime
+import random
+import tempfile
+import time
+import tracemalloc
+
+from cogs.members import EXPORT_CHUNK, EXPORT_SPOOL_BYTES, export_row, write_export
+from member_index import MemberIndex
+
+STATUSES = ("online", "idle", "dnd", "offline", "offline", "offline")
+SYLLABLES = ("ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "xi")
+
+
+class FakeMember:
+    __slots__ = (
+        "id",
+        "name",
+        "display_name",
+        "bot",
+        "raw_status",
+        "joined_at",
+        "created_at",
+        "guild",
+    )
+
+    def __init__(self, member_id: int, rng: random.Random, guild):
+        self.id = member_id
+        self.name = "".join(rng.choice(SYLLABLES) for _ in range(4)) + str(member_id)
+        # One in four members has a nickname
+        self.display_name = (
+            self.name if rng.random() < 0.75 else rng.choice(SYLLABLES) + self.name
+        )
+        self.bot = rng.random() < 0.02
+        self.raw_status = rng.choice(STATUSES)
+        self.joined_at = datetime.datetime(
+            2020, 1, 1, tzinfo=datetime.timezone.utc
+        ) + datetime.timedelta(minutes=member_id % 2_000_000)
+        self.created_at = self.joined_at
+        self.guild = guild
+
+
+class FakeGuild:
+    def __init__(self, members: int, seed: int = 1):
+        rng = random.Random(seed)
+        self.id = 1
+        self._members = {}
+        for i in range(members):
+            member = FakeMember(10**17 + i, rng, self)
+            self._members[member.id] = member
+
+    @property
+    def members(self):
+        return list(self._members.values())
+
+    def get_member(self, member_id):
+        return self._members.get(member_id)
+
+
+def naive_search(guild, prefix: str, limit: int) -> list:
+    prefix = prefix.casefold()
+    matches = [
+        m
+        for m in guild.members
+        if m.name.casefold().startswith(prefix)
+        or m.display_name.casefold().startswith(prefix)
+    ]
+    return sorted(matches, key=lambda m: m.name.casefold())[:limit]
+
+
+async def export_peak(guild, index: MemberIndex) -> tuple:
+    tracemalloc.start()
+    with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES) as fp:
+        await write_export(index.pages(guild, size=EXPORT_CHUNK), fp)
+        size = fp.tell()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, size
+
+
+def naive_export_peak(guild) -> int:
+    tracemalloc.start()
+    rows = [",".join(map(str, export_row(m))) for m in guild.members]
+    data = "\n".join(rows).encode()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows, data
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    guild = FakeGuild(args.members)
+    index = MemberIndex()
+    start = time.perf_counter()
+    index.build(guild)
+    build = time.perf_counter() - start
+
+    rng = random.Random(2)
+    prefixes = [
+        rng.choice(SYLLABLES) + rng.choice(SYLLABLES) for _ in range(args.queries)
+    ]
+
+    start = time.perf_counter()
+    for prefix in prefixes:
+        index.search(guild, prefix, limit=20)
+    indexed = (time.perf_counter() - start) / len(prefixes)
+
+    naive_queries = prefixes[: max(1, len(prefixes) // 20)]
+    start = time.perf_counter()
+    for prefix in naive_queries:
+        naive_search(guild, prefix, 20)
+    naive = (time.perf_counter() - start) / len(naive_queries)
+
+    # Joins and leaves: insort into and bisect-delete from the sorted entries
+    joiners = [FakeMember(10**18 + i, rng, guild) for i in range(1000)]
+    start = time.perf_counter()
+    for member in joiners:
+        guild._members[member.id] = member
+        index.member_joined(member)
+    for member in joiners:
+        index.member_left(member)
+        del guild._members[member.id]
+    churn = (time.perf_counter() - start) / (2 * len(joiners))
+
+    print(f"{args.members:,} members, index built in {build * 1000:.0f} ms")
+    print(f"prefix search, 20 results: {indexed * 1e6:9.1f} µs indexed")
+    print(f"                           {naive * 1e6:9.1f} µs scan + sort")
+    print(f"join/leave update:         {churn * 1e6:9.1f} µs")
+
+    for members in (args.members // 10, args.members):
+        small = FakeGuild(members)
+        small_index = MemberIndex()
+        small_index.build(small)
+        peak, size = asyncio.run(export_peak(small, small_index))
+        naive_peak = naive_export_peak(small)
+        print(
+            f"export {members:>9,} members: {size / 2**20:6.1f} MiB CSV, "
+            f"streamed peak {peak / 2**20:6.2f} MiB, in-memory peak {naive_peak / 2**20:6.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""RSS of discord.py's message cache vs raw mode's MessageStore.
+
+Each scenario runs in a fresh subprocess that builds N real ``discord.Message``
+objects from gateway-shaped payloads and keeps them either in the client's
+message cache (stock mode) or only as summaries in a ``MessageStore`` (raw
+mode). The reported figure is the RSS growth over the process baseline.
+
+    python -m benchmarks.bench_message_memory [--counts 10000 100000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+
+import discord
+
+from message_store import MessageStore
+from reply_cache import MessageSummary
+
+CONTENT = "This is a fairly ordinary chat message with a link https://example.com/{i}"
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        # ru_maxrss is KiB on Linux, bytes on macOS; only the peak is available
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def message_payload(i: int) -> dict:
+    return {
+        "id": str(10**17 + i),
+        "channel_id": "2",
+        "guild_id": "1",
+        "author": {
+            "id": str(10**16 + i % 5000),
+            "username": f"user{i % 5000}",
+            "discriminator": "0",
+            "avatar": None,
+        },
+        "content": CONTENT.format(i=i),
+        "timestamp": "2024-01-01T00:00:00+00:00",
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+    }
+
+
+def run_scenario(scenario: str, count: int) -> dict:
+    client = discord.Client(intents=discord.Intents.default(), max_messages=count)
+    state = client._connection
+    guild = discord.Guild(data={"id": "1", "name": "Bench Guild"}, state=state)
+    channel = discord.TextChannel(
+        state=state,
+        guild=guild,
+        data={"id": "2", "name": "general", "type": 0, "position": 0},
+    )
+    store = MessageStore(max_bytes=1 << 40)
+
+    gc.collect()
+    baseline = rss_bytes()
+
+    for i in range(count):
+        message = discord.Message(state=state, channel=channel, data=message_payload(i))
+        if scenario == "stock":
+            state._messages.append(message)
+        else:
+            store.put(MessageSummary.from_message(message))
+
+    gc.collect()
+    return {
+        "scenario": scenario,
+        "count": count,
+        "rss_delta": rss_bytes() - baseline,
+        "store_bytes": store.bytes_used if scenario == "raw" else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--scenario", choices=("stock", "raw"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(run_scenario(args.scenario, args.counts[0])))
+        return
+
+    for count in args.counts:
+        for scenario in ("stock", "raw"):
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.bench_message_memory",
+                    "--scenario",
+                    scenario,
+                    "--counts",
+                    str(count),
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            rss = result["rss_delta"] / 2**20
+            line = f"{scenario:>5} {count:>8,} messages: RSS +{rss:7.1f} MiB"
+            if result["store_bytes"] is not None:
+                line += f" (store accounts {result['store_bytes'] / 2**20:.1f} MiB)"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Per-call overhead of Metrics.instrument on an event handler.
+
+Times the same trivial handler bare and wrapped, awaiting it directly as
+discord.py's ``_run_event`` does, and reports the difference per call.
+
+    python -m benchmarks.bench_metrics [--calls N]
+"""
+
+import argparse
+import asyncio
+import time
+
+from metrics import Metrics
+
+# Instrumentation must stay under this many microseconds per event
+BUDGET_US = 3.0
+
+
+async def on_event(payload):
+    return payload
+
+
+async def bench(handler, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        await handler(i)
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=500_000)
+    args = parser.parse_args()
+
+    metrics = Metrics()
+    instrumented = metrics.instrument(on_event)
+
+    # Best of three to keep scheduler noise out of a sub-microsecond difference
+    bare = min([await bench(on_event, args.calls) for _ in range(3)])
+    wrapped = min([await bench(instrumented, args.calls) for _ in range(3)])
+
+    overhead = (wrapped - bare) / args.calls * 1e6
+    print(f"bare handler:         {bare / args.calls * 1e6:6.3f} µs/call")
+    print(f"instrumented handler: {wrapped / args.calls * 1e6:6.3f} µs/call")
+    print(
+        f"overhead:             {overhead:6.3f} µs/call "
+        f"({'✅' if overhead < BUDGET_US else '❌'} budget {BUDGET_US} µs)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
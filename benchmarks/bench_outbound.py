@@ -0,0 +1,205 @@
+"""OutboundScheduler against a local fake Discord HTTP endpoint.
+
+The fake endpoint enforces a per-channel bucket (``--limit`` requests per
+``--per`` seconds), reports ``X-RateLimit-*`` headers and answers 429 with
+``Retry-After`` when a client overruns it. The harness compares firing every
+request at once with queuing them through the scheduler, whose actions return
+nothing (as discord.py calls do) so rate limits reach it only through the
+session's trace hook. It then checks that
+command-priority work overtakes a backlog of welcome messages.
+
+    python -m benchmarks.bench_outbound [--requests N] [--channels N]
+"""
+
+import argparse
+import asyncio
+import time
+
+import aiohttp
+from aiohttp import web
+
+from outbound import PRIORITY_COMMAND, PRIORITY_WELCOME, OutboundScheduler
+
+
+class FakeHTTPException(Exception):
+    """Shaped like discord.HTTPException: carries .status and .response"""
+
+    def __init__(self, response):
+        super().__init__(f"{response.status} {response.reason}")
+        self.status = response.status
+        self.response = response
+
+
+class FakeDiscord:
+    """aiohttp app with Discord-style per-route rate limiting"""
+
+    def __init__(self, limit: int, per: float):
+        self.limit = limit
+        self.per = per
+        self.windows = {}
+        self.accepted = 0
+        self.rejected = 0
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post("/channels/{channel_id}/messages", self.create_message)
+        return app
+
+    async def create_message(self, request):
+        channel_id = request.match_info["channel_id"]
+        now = time.monotonic()
+        start, count = self.windows.get(channel_id, (now, 0))
+        if now - start >= self.per:
+            start, count = now, 0
+        reset_after = max(0.0, start + self.per - now)
+
+        if count >= self.limit:
+            self.rejected += 1
+            return web.json_response(
+                {"message": "You are being rate limited.", "retry_after": reset_after},
+                status=429,
+                headers={
+                    "Retry-After": f"{reset_after:.3f}",
+                    "X-RateLimit-Remaining": "0",
+                    "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+                },
+            )
+
+        count += 1
+        self.windows[channel_id] = (start, count)
+        self.accepted += 1
+        return web.json_response(
+            {"id": str(self.accepted), "channel_id": channel_id},
+            headers={
+                "X-RateLimit-Limit": str(self.limit),
+                "X-RateLimit-Remaining": str(self.limit - count),
+                "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            },
+        )
+
+
+async def send(session, base_url, channel_id, retries: int = 0):
+    """POST a message; 429s raise (after ``retries`` naive retries)"""
+    while True:
+        response = await session.post(
+            f"{base_url}/channels/{channel_id}/messages", json={"content": "hi"}
+        )
+        await response.read()
+        if response.status != 429:
+            return response
+        if retries == 0:
+            raise FakeHTTPException(response)
+        retries -= 1
+        await asyncio.sleep(float(response.headers["Retry-After"]))
+
+
+async def run_naive(session, base_url, requests, channels):
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(send(session, base_url, i % channels, retries=10) for i in range(requests)),
+        return_exceptions=True,
+    )
+    failures = sum(isinstance(r, Exception) for r in results)
+    return time.perf_counter() - start, failures
+
+
+async def send_quietly(session, base_url, channel_id):
+    """Like a discord.py call: retries 429s itself and returns no response"""
+    await send(session, base_url, channel_id, retries=10)
+
+
+async def run_scheduled(base_url, requests, channels):
+    scheduler = OutboundScheduler(concurrency=8, max_queue=requests)
+    # Rate limits reach the scheduler through the session's trace hook only
+    session = aiohttp.ClientSession(trace_configs=[scheduler.trace_config()])
+    start = time.perf_counter()
+    futures = [
+        scheduler.submit(
+            ("channel", i % channels),
+            lambda i=i: send_quietly(session, base_url, i % channels),
+            PRIORITY_WELCOME,
+        )
+        for i in range(requests)
+    ]
+    results = await asyncio.gather(*futures, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    await scheduler.close()
+    await session.close()
+    failures = sum(isinstance(r, Exception) for r in results)
+    return elapsed, failures, scheduler.stats()
+
+
+async def run_priority(session, base_url, backlog):
+    """Commands queued behind a welcome backlog on one channel"""
+    scheduler = OutboundScheduler(concurrency=1, max_queue=backlog + 10)
+    welcomes = [
+        scheduler.submit(
+            ("channel", 0), lambda: send(session, base_url, 0, 10), PRIORITY_WELCOME
+        )
+        for _ in range(backlog)
+    ]
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    commands = [
+        scheduler.submit(
+            ("channel", 0), lambda: send(session, base_url, 0, 10), PRIORITY_COMMAND
+        )
+        for _ in range(5)
+    ]
+    await asyncio.gather(*commands)
+    command_latency = time.perf_counter() - start
+    await asyncio.gather(*welcomes)
+    backlog_latency = time.perf_counter() - start
+    await scheduler.close()
+    return command_latency, backlog_latency
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--channels", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--per", type=float, default=0.2)
+    args = parser.parse_args()
+
+    async def serve():
+        fake = FakeDiscord(args.limit, args.per)
+        runner = web.AppRunner(fake.app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return fake, runner, f"http://127.0.0.1:{port}"
+
+    async with aiohttp.ClientSession() as session:
+        fake, runner, base_url = await serve()
+        elapsed, failures = await run_naive(
+            session, base_url, args.requests, args.channels
+        )
+        print(
+            f"naive:     {elapsed:6.2f}s, {fake.rejected:4} responses were 429, "
+            f"{failures} failed"
+        )
+        await runner.cleanup()
+
+        fake, runner, base_url = await serve()
+        elapsed, failures, stats = await run_scheduled(
+            base_url, args.requests, args.channels
+        )
+        print(
+            f"scheduler: {elapsed:6.2f}s, {fake.rejected:4} responses were 429, "
+            f"{failures} failed"
+        )
+        print(f"           {stats}")
+
+        command_latency, backlog_latency = await run_priority(session, base_url, 50)
+        print(
+            f"priority:  5 commands done after {command_latency:.2f}s, "
+            f"50-welcome backlog after {backlog_latency:.2f}s"
+        )
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,252 @@
+"""Startup time and memory of the default gateway profile vs per-feature ones.
+
+Each profile runs in a fresh subprocess holding a discord.py client built from
+its ``GatewayProfile``. The process is fed what Discord would send that
+client for one large guild, filtered by its intents:
+
+- GUILD_CREATE, carrying the online members and their presences only with
+  the presences intent
+- with ``chunk_guilds_at_startup``, every member in GUILD_MEMBERS_CHUNK
+  batches of 1,000, kept when the member cache flags allow
+- ``--events`` MESSAGE_CREATE events (content blanked without the message
+  content intent) and as many reaction adds, each only with its intent
+- with the members intent, a join and leave for ``--events`` / 10 new members
+  and a leave for as many members present at startup
+
+The benchmark reports the time to parse the startup payloads and the RSS
+growth after startup and after the events. It also reports how many leaves
+discord.py dispatched as ``member_remove``. It only does that for cached
+members, so the goodbye message depends on the member cache.
+
+    python -m benchmarks.bench_profiles [--members 100000] [--events 20000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import discord
+
+from benchmarks.bench_message_memory import rss_bytes
+from benchmarks.fake_gateway import BOT_USER, guild_payload
+from benchmarks.replay import member_payload, message_payload, user_payload
+from profiles import FEATURES, GatewayProfile
+
+GUILD_ID = 1 << 22
+CHANNEL_ID = GUILD_ID + 1
+
+# profile name -> FEATURES value (None is the default profile)
+PROFILES = {
+    "default": None,
+    "messages": "messages",
+    "commands+questions": "commands,questions",
+    "welcome": "welcome",
+    "no member stats": "commands,messages,questions,welcome,reactions",
+    "all": "all",
+}
+
+# Share of members that are online
+ONLINE = 0.2
+
+
+def presence_payload(user_id: int) -> dict:
+    return {
+        "user": {"id": str(user_id)},
+        "guild_id": str(GUILD_ID),
+        "status": "online",
+        "activities": [],
+        "client_status": {"desktop": "online"},
+    }
+
+
+def startup_payloads(profile: GatewayProfile, members: int):
+    """GUILD_CREATE and GUILD_MEMBERS_CHUNK payloads for the profile's intents"""
+    member_ids = [GUILD_ID + 1000 + i for i in range(members)]
+    online = member_ids[: int(members * ONLINE)]
+    online_ids = set(online)
+
+    guild = guild_payload(GUILD_ID, members=0)
+    guild["member_count"] = members
+    guild["large"] = True
+    guild["members"] = [member_payload(int(BOT_USER["id"]))]
+    if profile.intents.presences:
+        guild["members"] += [member_payload(user_id) for user_id in online]
+        guild["presences"] = [presence_payload(user_id) for user_id in online]
+
+    chunks = []
+    if profile.chunk_guilds_at_startup and profile.intents.members:
+        for start in range(0, members, 1000):
+            ids = member_ids[start : start + 1000]
+            chunk = {
+                "guild_id": str(GUILD_ID),
+                "members": [member_payload(user_id) for user_id in ids],
+            }
+            if profile.intents.presences:
+                chunk["presences"] = [
+                    presence_payload(user_id)
+                    for user_id in ids
+                    if user_id in online_ids
+                ]
+            chunks.append(chunk)
+    return guild, chunks
+
+
+def event_payloads(profile: GatewayProfile, count: int, members: int) -> list:
+    """Message, reaction and member events delivered for the profile's intents"""
+    events = []
+    if profile.intents.guild_messages:
+        for i in range(count):
+            data = message_payload(10**15 + i, CHANNEL_ID, author_id=5000 + i % 300)
+            data["guild_id"] = str(GUILD_ID)
+            if not profile.intents.message_content:
+                data["content"] = ""
+            events.append(("MESSAGE_CREATE", data))
+    if profile.intents.guild_reactions:
+        for i in range(count):
+            events.append(
+                (
+                    "MESSAGE_REACTION_ADD",
+                    {
+                        "user_id": str(5000 + i % 300),
+                        "channel_id": str(CHANNEL_ID),
+                        "message_id": str(10**15 + i),
+                        "guild_id": str(GUILD_ID),
+                        "emoji": {"id": None, "name": "👍"},
+                        "type": 0,
+                        "burst": False,
+                    },
+                )
+            )
+    if profile.intents.members:
+        new_ids = [GUILD_ID + 1000 + members + i for i in range(count // 10)]
+        for user_id in new_ids:
+            data = member_payload(user_id)
+            data["guild_id"] = str(GUILD_ID)
+            events.append(("GUILD_MEMBER_ADD", data))
+        # The new members leave again, then as many members from before startup
+        existing_ids = [GUILD_ID + 1000 + i for i in range(min(count // 10, members))]
+        for user_id in new_ids + existing_ids:
+            events.append(
+                (
+                    "GUILD_MEMBER_REMOVE",
+                    {"guild_id": str(GUILD_ID), "user": user_payload(user_id)},
+                )
+            )
+    return events
+
+
+def run_profile(features, members: int, events: int) -> dict:
+    if features is None:
+        profile = GatewayProfile.default()
+    else:
+        profile = GatewayProfile.resolve(
+            list(FEATURES) if features == "all" else features.split(",")
+        )
+    client = discord.Client(
+        intents=profile.intents,
+        member_cache_flags=profile.member_cache_flags,
+        chunk_guilds_at_startup=profile.chunk_guilds_at_startup,
+        max_messages=10000 if profile.message_cache else None,
+    )
+    state = client._connection
+    # Events are parsed and counted, not dispatched to handlers
+    dispatched = Counter()
+    state.dispatch = lambda event, *args, **kwargs: dispatched.update((event,))
+    state.user = discord.ClientUser(state=state, data=BOT_USER)
+
+    guild_data, chunks = startup_payloads(profile, members)
+    stream = event_payloads(profile, events, members)
+
+    gc.collect()
+    baseline = rss_bytes()
+
+    started = time.perf_counter()
+    guild = state._add_guild_from_data(guild_data)
+    for chunk in chunks:
+        for data in chunk["members"]:
+            member = discord.Member(data=data, guild=guild, state=state)
+            if state.member_cache_flags.joined:
+                guild._add_member(member)
+        for presence in chunk.get("presences", ()):
+            member = guild.get_member(int(presence["user"]["id"]))
+            if member is not None:
+                raw = discord.RawPresenceUpdateEvent(data=presence, state=state)
+                member._presence_update(raw, presence["user"])
+    startup = time.perf_counter() - started
+
+    gc.collect()
+    after_startup = rss_bytes()
+    cached_members = len(guild._members)
+
+    started = time.perf_counter()
+    for event, data in stream:
+        state.parsers[event](data)
+    events_time = time.perf_counter() - started
+
+    gc.collect()
+    return {
+        "intents": profile.intents.value,
+        "cached_members": cached_members,
+        "startup": startup,
+        "startup_rss": after_startup - baseline,
+        "events": len(stream),
+        "events_time": events_time,
+        "total_rss": rss_bytes() - baseline,
+        "leaves": sum(1 for event, _ in stream if event == "GUILD_MEMBER_REMOVE"),
+        "member_remove": dispatched["member_remove"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--features", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.features is not None:
+        features = None if args.features == "default" else args.features
+        print(json.dumps(run_profile(features, args.members, args.events)))
+        return
+
+    print(
+        f"one guild of {args.members:,} members ({ONLINE:.0%} online), "
+        f"{args.events:,} messages and reactions"
+    )
+    for name, features in PROFILES.items():
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.bench_profiles",
+                "--features",
+                features or "default",
+                "--members",
+                str(args.members),
+                "--events",
+                str(args.events),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{name:<20} intents {result['intents']:>8}  "
+            f"{result['cached_members']:>7,} members cached  "
+            f"startup {result['startup'] * 1000:7.1f} ms  "
+            f"RSS +{result['startup_rss'] / 2**20:6.1f} MiB  "
+            f"{result['events']:>6,} events {result['events_time'] * 1000:6.0f} ms  "
+            f"RSS +{result['total_rss'] / 2**20:6.1f} MiB total  "
+            f"member_remove {result['member_remove']:>5,}/{result['leaves']:,} leaves"
+        )
+
+
+if __name__ == "__main__":
+    main()
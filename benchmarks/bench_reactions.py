@@ -0,0 +1,177 @@
+"""Reaction storm: per-event logging vs the windowed ReactionAggregator.
+
+Delivers ``--reactions`` raw reaction adds and removes over ``--burst``
+seconds, most of them on a few giveaway posts that are too old to be in any
+cache. Each event runs in its own task, as discord.py dispatches them.
+
+The per-event path is the bot's old raw-reaction handler: look the message up
+in the reply cache, fetch it over REST on a miss, log one event. The
+aggregated path counts the reaction and logs one rollup per message per
+window. Both log to an ``EventLog`` writing to /dev/null. The benchmark
+reports REST calls, log events and CPU time, including the log's writer
+thread.
+
+    python -m benchmarks.bench_reactions [--reactions 10000] [--burst 5] [--messages 20]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from types import SimpleNamespace
+
+import discord
+
+from dispatch import RAW_REACTION_ADD, RAW_REACTION_REMOVE, TEXT, EventRecord
+from event_log import EventLog
+from reactions import ReactionAggregator
+from reply_cache import ReplyCache
+
+EMOJIS = ("🎉", "👍", "❤️", "😂", "🔥")
+
+
+class FakeChannel:
+    """Text channel whose fetch_message costs a simulated REST round trip"""
+
+    def __init__(self, latency: float):
+        self.id = 2
+        self.name = "giveaways"
+        self.guild = SimpleNamespace(id=1)
+        self.latency = latency
+        self.fetches = 0
+
+    async def fetch_message(self, message_id: int):
+        self.fetches += 1
+        await asyncio.sleep(self.latency)
+        author = SimpleNamespace(id=9, name="host")
+        return SimpleNamespace(
+            id=message_id, author=author, channel=self, content="🎉 Giveaway! React!"
+        )
+
+
+def make_records(count: int, messages: int, channel, rng: random.Random) -> list:
+    records = []
+    for i in range(count):
+        # A few hot posts take most of the traffic
+        message_id = 10**17 + min(int(rng.expovariate(1.0)), messages - 1)
+        kind = RAW_REACTION_REMOVE if rng.random() < 0.2 else RAW_REACTION_ADD
+        payload = SimpleNamespace(emoji=rng.choice(EMOJIS), user_id=10**16 + i)
+        records.append(
+            EventRecord(
+                kind,
+                1,
+                channel.id,
+                TEXT,
+                10**16 + i,
+                None,
+                message_id,
+                channel,
+                payload,
+            )
+        )
+    return records
+
+
+async def deliver(records: list, burst: float, handle) -> list:
+    """Start ``handle(record)`` as a task per record, spread over ``burst`` seconds"""
+    tasks = []
+    step = 100
+    delay = burst * step / len(records)
+    for start in range(0, len(records), step):
+        for record in records[start : start + step]:
+            tasks.append(asyncio.ensure_future(handle(record)))
+        await asyncio.sleep(delay)
+    return tasks
+
+
+async def per_event(records, burst, event_log, cache):
+    async def handle(record):
+        payload = record.source
+        fields = {
+            "emoji": str(payload.emoji),
+            "user_id": record.user_id,
+            "message_id": record.message_id,
+            "guild_id": record.guild_id,
+            "channel": record.channel.name,
+        }
+        message = cache.get(record.message_id)
+        if message is not None:
+            fields["content"] = message.content
+            fields["message_author"] = message.author_name
+        else:
+            try:
+                message = await record.channel.fetch_message(record.message_id)
+                fields["content"] = message.content
+                fields["message_author"] = message.author.name
+            except discord.NotFound:
+                fields["fetch_error"] = "not_found"
+        event_log.emit(record.kind, **fields)
+
+    await asyncio.gather(*await deliver(records, burst, handle))
+
+
+async def aggregated(records, burst, event_log, cache, window):
+    async def resolve(channel, message_id):
+        summary = await cache.lookup(message_id)
+        if summary is None:
+            summary = await cache.fetch(channel, message_id)
+        return summary
+
+    aggregator = ReactionAggregator(resolve, event_log=event_log, window=window)
+
+    async def handle(record):
+        aggregator.add(
+            record,
+            str(record.source.emoji),
+            removed=record.kind == RAW_REACTION_REMOVE,
+        )
+
+    await asyncio.gather(*await deliver(records, burst, handle))
+    await aggregator.drain()
+    return aggregator
+
+
+def run(name: str, bench, records, burst, channel, **kwargs):
+    channel.fetches = 0
+    devnull = open(os.devnull, "w")
+    event_log = EventLog(stream=devnull, max_buffer=len(records) * 2)
+    event_log.start()
+    cache = ReplyCache()
+
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    asyncio.run(bench(records, burst, event_log, cache, **kwargs))
+    event_log.close()
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    devnull.close()
+
+    print(
+        f"{name:<12} {channel.fetches:>6} REST  {event_log.written:>6} log events  "
+        f"{cpu * 1000:7.0f} ms CPU  {wall:5.2f} s wall"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reactions", type=int, default=10_000)
+    parser.add_argument("--burst", type=float, default=5.0)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--window", type=float, default=2.0)
+    parser.add_argument("--rest-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    channel = FakeChannel(args.rest_latency)
+    records = make_records(args.reactions, args.messages, channel, random.Random(1))
+    hot = len({record.message_id for record in records})
+    print(
+        f"{args.reactions:,} reactions on {hot} messages over {args.burst:g} s, "
+        f"{args.window:g} s window, {args.rest_latency * 1000:g} ms REST latency"
+    )
+    run("per event", per_event, records, args.burst, channel)
+    run("aggregated", aggregated, records, args.burst, channel, window=args.window)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""!members spam: rebuilding every reply vs the RenderCache.
+
+Sends ``--requests`` ``!members`` commands over ``--burst`` seconds, spread
+over ``--channels`` channels of one guild with ``--members`` cached members,
+while ``--presence-rate`` presence updates per second change the counters.
+Commands run through the Members cog with a stub reply path that counts
+sends.
+
+The uncached run uses a RenderCache that keeps nothing (no payloads, no
+window), which is the old behaviour: every command renders the embed and
+sends it. The cached run uses the bot's defaults. The benchmark reports CPU
+time per command, embeds rendered, messages sent and the cache's hit rate.
+
+    python -m benchmarks.bench_render [--requests 5000] [--burst 2] [--channels 5]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+
+from cogs.members import Members
+from member_stats import MemberStats
+from render_cache import RenderCache
+
+STATUSES = ("online", "idle", "dnd", "offline")
+
+
+def make_guild(count: int, rng: random.Random):
+    members = {}
+    for i in range(count):
+        member_id = 10**16 + i
+        members[member_id] = SimpleNamespace(
+            id=member_id,
+            guild=None,
+            name=f"member{i}",
+            mention=f"<@{member_id}>",
+            bot=rng.random() < 0.05,
+            raw_status=rng.choice(STATUSES),
+        )
+    guild = SimpleNamespace(
+        id=1, name="Large Guild", _members=members, members=list(members.values())
+    )
+    for member in members.values():
+        member.guild = guild
+    return guild
+
+
+def make_context(guild, channel_id: int, i: int):
+    return SimpleNamespace(
+        guild=guild,
+        channel=SimpleNamespace(id=channel_id),
+        author=SimpleNamespace(name=f"user{i}", mention=f"<@{i}>"),
+        message=SimpleNamespace(id=i),
+    )
+
+
+async def spam(cog, guild, stats, args, rng: random.Random):
+    members = list(guild._members.values())
+    per_tick = max(1, int(args.requests * 0.001 / args.burst))
+    presences_per_tick = args.presence_rate * 0.001
+    presences = 0.0
+    cpu = 0.0
+    for i in range(0, args.requests, per_tick):
+        presences += presences_per_tick
+        while presences >= 1:
+            presences -= 1
+            member = rng.choice(members)
+            before = SimpleNamespace(raw_status=member.raw_status)
+            member.raw_status = rng.choice(STATUSES)
+            stats.presence_changed(before, member)
+
+        started = time.process_time()
+        for j in range(i, min(i + per_tick, args.requests)):
+            ctx = make_context(guild, rng.randrange(args.channels), j)
+            await Members.list_members.callback(cog, ctx, 25)
+        cpu += time.process_time() - started
+        await asyncio.sleep(0.001)
+    return cpu
+
+
+def run(name: str, args, render_cache: RenderCache):
+    rng = random.Random(1)
+    guild = make_guild(args.members, rng)
+    stats = MemberStats()
+    stats.seed(guild)
+
+    sent = 0
+
+    def respond(ctx, content=None, **kwargs):
+        nonlocal sent
+        sent += 1
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+        return future
+
+    services = SimpleNamespace(
+        member_stats=stats,
+        render_cache=render_cache,
+        respond=respond,
+        event_log=SimpleNamespace(emit=lambda *args, **kwargs: None),
+    )
+    cog = Members(SimpleNamespace(services=services))
+
+    cpu = asyncio.run(spam(cog, guild, stats, args, rng))
+    cache_stats = render_cache.stats()
+    print(
+        f"{name:<9} {cpu / args.requests * 1e6:7.1f} µs CPU/command  "
+        f"{cache_stats['misses']:>6} embeds rendered  {sent:>6} sent  "
+        f"hit rate {cache_stats['hit_rate']:.2f}, {cache_stats['coalesced']} coalesced"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--burst", type=float, default=2.0)
+    parser.add_argument("--channels", type=int, default=5)
+    parser.add_argument("--members", type=int, default=50_000)
+    parser.add_argument("--presence-rate", type=float, default=100.0)
+    args = parser.parse_args()
+
+    print(
+        f"{args.requests:,} !members over {args.burst:g} s in {args.channels} "
+        f"channels, {args.members:,} members, {args.presence_rate:g} presence "
+        "updates/s"
+    )
+    run("uncached", args, RenderCache(window=0, max_size=0))
+    run("cached", args, RenderCache())
+
+
+if __name__ == "__main__":
+    main()
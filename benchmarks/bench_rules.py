@@ -0,0 +1,128 @@
+"""Matching throughput of the rule engine with thousands of rules.
+
+Generates keyword and regex auto-response rules plus a stream of chat
+messages in which a few percent contain a trigger. Each message is matched
+with ``RuleEngine`` and with a naive loop that tests every rule against the
+message (keywords precompiled per rule). The rule file's compile (reload) time is reported too.
+
+    python -m benchmarks.bench_rules [--rules 1000 5000] [--regex 50] [--messages 20000]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import tempfile
+import time
+
+from rules import Rule, RuleEngine
+
+WORDS = (
+    "the a to and of is it you that in for on this with be are have not but what "
+    "just can so like do was if my get me at your all we one will about how there "
+    "out up would now know they from when think good time some more really people"
+).split()
+
+
+def make_rules(count: int, regexes: int, rng: random.Random) -> list:
+    rules = []
+    for i in range(count):
+        rules.append(
+            {
+                "id": f"kw{i}",
+                "keywords": [f"trigger{i}", f"{rng.choice(WORDS)} phrase{i}"],
+                "reply": "{mention} matched",
+            }
+        )
+    for i in range(regexes):
+        rules.append({"id": f"re{i}", "regex": rf"\border-{i}-\d+\b", "react": "👀"})
+    return rules
+
+
+def make_messages(count: int, rules: int, regexes: int, rng: random.Random) -> list:
+    messages = []
+    for i in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(4, 30))]
+        roll = rng.random()
+        if roll < 0.03:
+            words.insert(rng.randrange(len(words)), f"trigger{rng.randrange(rules)}")
+        elif roll < 0.04 and regexes:
+            words.append(f"order-{rng.randrange(regexes)}-{i}")
+        messages.append(" ".join(words))
+    return messages
+
+
+def naive_rules(rules: list) -> list:
+    """Each rule with its keywords precompiled, for the one-rule-at-a-time loop"""
+    return [
+        (
+            rule,
+            [re.compile(rf"(?<!\w){re.escape(word)}(?!\w)") for word in rule.keywords],
+        )
+        for rule in rules
+    ]
+
+
+def naive_match(rules: list, content: str) -> list:
+    text = content.casefold()
+    return [
+        rule
+        for rule, patterns in rules
+        if any(pattern.search(text) for pattern in patterns)
+        or (rule.regex is not None and rule.regex.search(content))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--regex", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--naive-messages", type=int, default=200)
+    args = parser.parse_args()
+
+    for count in args.rules:
+        rng = random.Random(count)
+        data = make_rules(count, args.regex, rng)
+        messages = make_messages(args.messages, count, args.regex, rng)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rules.json")
+            with open(path, "w") as f:
+                json.dump({"rules": data}, f)
+            start = time.perf_counter()
+            engine = RuleEngine(path)
+            compile_time = time.perf_counter() - start
+
+        # Cooldowns would hide repeat matches; measure matching alone
+        for rule in engine.rules:
+            rule.cooldown = 0
+
+        start = time.perf_counter()
+        matched = sum(len(engine.match(1, 2, content)) for content in messages)
+        engine_time = time.perf_counter() - start
+
+        rules = naive_rules([Rule(item) for item in data])
+        sample = messages[: args.naive_messages]
+        start = time.perf_counter()
+        naive_matched = sum(len(naive_match(rules, content)) for content in sample)
+        naive_time = time.perf_counter() - start
+
+        # Same answers on the sample
+        engine_sample = sum(len(engine.match(1, 2, content)) for content in sample)
+        assert engine_sample == naive_matched, (engine_sample, naive_matched)
+
+        print(
+            f"{count + args.regex:>6,} rules: compiled in {compile_time * 1000:6.0f} ms, "
+            f"{len(messages) / engine_time:9,.0f} msgs/s "
+            f"({engine_time / len(messages) * 1e6:5.1f} µs/msg, {matched} matches)"
+        )
+        print(
+            f"{'':>13}naive loop {len(sample) / naive_time:9,.0f} msgs/s "
+            f"({naive_time / len(sample) * 1e6:8.1f} µs/msg)"
+        )
+
+
+if __name__ == "__main__":
+    main()
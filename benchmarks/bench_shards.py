@@ -0,0 +1,119 @@
+"""Simulate N shards across worker processes against a local fake gateway.
+
+Starts ``FakeGateway`` in this process, then uses launcher.py's shard split and
+process management to run bot.py workers pointed at it. Each worker reports
+when its shards reached READY and their heartbeat latencies, then shuts down
+cleanly; the harness checks every worker exited with code 0.
+
+    python -m benchmarks.bench_shards [--shards 4] [--processes 1 2 4] [--guilds 40]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import queue
+import threading
+import time
+
+from benchmarks.fake_gateway import FakeGateway, patch_discord
+from launcher import shard_ranges, start_workers, stop_workers
+
+
+def _worker(shard_ids, shard_count, base_url, started_at, results):
+    os.environ.update(
+        SHARDED="1",
+        SHARD_COUNT=str(shard_count),
+        SHARD_IDS=",".join(map(str, shard_ids)),
+        DISCORD_TOKEN="fake-token",
+    )
+    patch_discord(base_url)
+
+    # Keep the workers' JSON event log out of the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        import bot
+
+        async def report():
+            deadline = time.monotonic() + 30
+            while any(latency == float("inf") for _, latency in bot.bot.latencies):
+                if time.monotonic() > deadline:
+                    break
+                await asyncio.sleep(0.1)
+            results.put(
+                {
+                    "shards": shard_ids,
+                    "ready_after": ready_at - started_at,
+                    "latencies": dict(bot.bot.latencies),
+                    "guilds": len(bot.bot.guilds),
+                }
+            )
+            await bot.bot.close()
+
+        async def on_ready():
+            nonlocal ready_at
+            ready_at = time.time()
+            asyncio.create_task(report())
+
+        ready_at = None
+        bot.bot.add_listener(on_ready, "on_ready")
+        bot.main()
+
+
+def run(shards: int, processes: int, guilds: int, base_url: str):
+    import multiprocessing
+
+    results = multiprocessing.get_context("spawn").Queue()
+    ranges = shard_ranges(shards, processes)
+    started_at = time.time()
+    workers = start_workers(_worker, ranges, shards, (base_url, started_at, results))
+
+    reports = []
+    try:
+        for _ in ranges:
+            reports.append(results.get(timeout=60))
+    except queue.Empty:
+        print("❌ timed out waiting for shards")
+    for process in workers:
+        process.join(15)
+    exit_codes = [process.exitcode for process in workers]
+    stop_workers(workers)
+    return reports, exit_codes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--guilds", type=int, default=40)
+    args = parser.parse_args()
+
+    guild_ids = [(i + 1) << 22 for i in range(args.guilds)]
+    gateway = FakeGateway(guild_ids, args.shards, heartbeat_interval=500)
+    loop = asyncio.new_event_loop()
+    base_url = loop.run_until_complete(gateway.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    for processes in args.processes:
+        reports, exit_codes = run(args.shards, processes, args.guilds, base_url)
+        slowest = max((r["ready_after"] for r in reports), default=float("nan"))
+        print(
+            f"{args.shards} shards / {processes} processes: all READY after "
+            f"{slowest:.2f}s, clean exit: {all(code == 0 for code in exit_codes)}"
+        )
+        for report in sorted(reports, key=lambda r: r["shards"]):
+            latencies = ", ".join(
+                f"shard {shard_id}: {latency * 1000:.1f}ms"
+                for shard_id, latency in sorted(report["latencies"].items())
+            )
+            print(
+                f"    shards {report['shards']}: {report['guilds']} guilds, "
+                f"READY after {report['ready_after']:.2f}s ({latencies})"
+            )
+
+    asyncio.run_coroutine_threadsafe(gateway.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+
+
+if __name__ == "__main__":
+    main()
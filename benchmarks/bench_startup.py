@@ -0,0 +1,132 @@
+"""Cold-start time of bot.py against a local fake gateway.
+
+Each run starts a fresh interpreter that imports bot.py, connects to
+``FakeGateway`` and waits for the post-READY warmup to finish. The worker
+reports bot.py's own startup marks (import, READY, warm), the warmup stage
+breakdown and the longest the event loop went without running a ticker task
+between READY and the end of warmup. READY includes discord.py's wait of
+``guild_ready_timeout`` (2s) for further GUILD_CREATE events. Runs are repeated and the median is shown.
+
+    python -m benchmarks.bench_startup [--guilds 500] [--runs 5]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.fake_gateway import FakeGateway, patch_discord
+
+
+def worker(base_url: str):
+    os.environ.setdefault("DISCORD_TOKEN", "fake-token")
+    patch_discord(base_url)
+
+    # Keep the bot's JSON event log out of the report on stdout
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        import bot
+
+        # (time, gap) for every wakeup of a task that only yields to the loop
+        wakeups = []
+
+        async def ticker():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0)
+                now = time.perf_counter()
+                wakeups.append((now, now - last))
+                last = now
+
+        async def report():
+            while "warm" not in bot.startup.marks:
+                await asyncio.sleep(0.001)
+            ticks.cancel()
+            ready = bot.startup.started + bot.startup.marks["ready"]
+            warm = bot.startup.started + bot.startup.marks["warm"]
+            results.update(
+                marks=bot.startup.marks,
+                stages=bot.warmup.report,
+                plugins=bot.plugins.load_times,
+                max_stall=max(
+                    (gap for now, gap in wakeups if now > ready and now - gap < warm),
+                    default=0.0,
+                ),
+                guilds=len(bot.bot.guilds),
+            )
+            await bot.bot.close()
+
+        async def on_connect():
+            nonlocal ticks
+            if ticks is None:
+                ticks = asyncio.create_task(ticker())
+
+        async def on_ready():
+            asyncio.create_task(report())
+
+        ticks = None
+        results = {}
+        bot.bot.add_listener(on_connect, "on_connect")
+        bot.bot.add_listener(on_ready, "on_ready")
+        bot.main()
+    print(json.dumps(results))
+
+
+def run_once(base_url: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--worker", base_url],
+        capture_output=True,
+        text=True,
+        timeout=120,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guilds", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker)
+        return
+
+    guild_ids = [(i + 1) << 22 for i in range(args.guilds)]
+    gateway = FakeGateway(guild_ids)
+    loop = asyncio.new_event_loop()
+    base_url = loop.run_until_complete(gateway.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    runs = [run_once(base_url) for _ in range(args.runs)]
+
+    asyncio.run_coroutine_threadsafe(gateway.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+
+    def median(values):
+        return statistics.median(values) * 1000
+
+    print(f"{runs[0]['guilds']} guilds, median of {len(runs)} cold starts")
+    for mark in runs[0]["marks"]:
+        print(f"  {mark:<10} {median([r['marks'][mark] for r in runs]):8.1f} ms")
+    for stage in runs[0]["stages"]:
+        seconds = median([r["stages"][stage]["seconds"] for r in runs])
+        print(f"    stage {stage:<14} {seconds:8.1f} ms")
+    for plugin in runs[0]["plugins"]:
+        seconds = median([r["plugins"][plugin] for r in runs])
+        print(f"    load {plugin:<15} {seconds:8.1f} ms")
+    print(
+        f"  max loop stall during warmup {median([r['max_stall'] for r in runs]):.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
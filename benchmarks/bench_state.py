@@ -0,0 +1,180 @@
+"""Cross-process hit latency of the shared state backends.
+
+For each backend a separate writer process stores ``--keys`` message
+summaries, then this process reads them back. It measures:
+
+- one ``get_summary`` at a time (one round trip each)
+- ``--batch`` concurrent ``get_summary`` calls, which the read batcher turns
+  into one ``MGET`` / ``SELECT ... IN``
+- ``claim`` of fresh keys
+
+The Redis backend talks to ``benchmarks.fake_redis`` in its own process unless
+``--redis`` names a real server. The memory backend, written and read in this
+process, is the floor.
+
+    python -m benchmarks.bench_state [--keys 5000] [--reads 2000] [--batch 50] [--redis URL]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from reply_cache import MessageSummary
+from state import StateBackend
+
+MESSAGE_BASE = 10**17
+
+
+def summary(i: int) -> MessageSummary:
+    return MessageSummary(
+        MESSAGE_BASE + i, 10**16 + i % 500, f"user{i % 500}", 42, f"message {i} " * 8
+    )
+
+
+def backend(url: str):
+    os.environ["STATE_BACKEND"] = url
+    return StateBackend.from_env()
+
+
+async def write(url: str, keys: int):
+    state = backend(url)
+    state.start()
+    for i in range(keys):
+        state.put_summary(summary(i))
+    # Redis replies in order, so this read returns after every write landed
+    await state.get_summary(MESSAGE_BASE)
+    state.close()
+
+
+def worker(url: str, keys: int):
+    asyncio.run(write(url, keys))
+
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2] * 1e6
+    p99 = samples[int(len(samples) * 0.99)] * 1e6
+    return f"p50 {p50:8.1f} µs  p99 {p99:8.1f} µs"
+
+
+async def measure(state, keys: int, reads: int, batch: int) -> dict:
+    ids = [MESSAGE_BASE + (i * 7919) % keys for i in range(reads)]
+
+    single = []
+    hits = 0
+    for message_id in ids:
+        start = time.perf_counter()
+        found = await state.get_summary(message_id)
+        single.append(time.perf_counter() - start)
+        hits += found is not None
+
+    batches = []
+    for start_index in range(0, reads - batch + 1, batch):
+        chunk = ids[start_index : start_index + batch]
+        start = time.perf_counter()
+        found = await asyncio.gather(*(state.get_summary(i) for i in chunk))
+        batches.append(time.perf_counter() - start)
+        hits += sum(f is not None for f in found)
+
+    claims = []
+    for i in range(min(reads, 1000)):
+        start = time.perf_counter()
+        await state.claim(f"bench:{time.time_ns()}:{i}", 60)
+        claims.append(time.perf_counter() - start)
+
+    return {
+        "single": single,
+        "batches": batches,
+        "claims": claims,
+        "hit_rate": hits / (len(ids) + len(batches) * batch),
+    }
+
+
+def report(name: str, results: dict, batch: int):
+    per_key = statistics.median(results["batches"]) / batch * 1e6
+    print(f"{name} (hit rate {results['hit_rate']:.0%})")
+    print(f"  get, one at a time        {percentiles(results['single'])}")
+    print(
+        f"  get, {batch} concurrent      {percentiles(results['batches'])}"
+        f"  ({per_key:.1f} µs/key)"
+    )
+    print(f"  claim                     {percentiles(results['claims'])}")
+
+
+def start_fake_redis():
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_redis"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    address = process.stdout.readline().strip()
+    return process, f"redis://{address}/0"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=5000)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--redis", help="redis:// URL of a real server")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.keys)
+        return
+
+    async def run(url: str, in_process: bool = False) -> dict:
+        state = backend(url)
+        state.start()
+        if in_process:
+            await write_into(state)
+        else:
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.bench_state",
+                    "--worker",
+                    url,
+                    "--keys",
+                    str(args.keys),
+                ],
+                check=True,
+            )
+        try:
+            return await measure(state, args.keys, args.reads, args.batch)
+        finally:
+            state.close()
+
+    async def write_into(state):
+        for i in range(args.keys):
+            state.put_summary(summary(i))
+
+    print(f"{args.keys:,} summaries written by another process, {args.reads:,} reads")
+    report("memory (same process)", asyncio.run(run("memory", True)), args.batch)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:{os.path.join(tmp, 'state.db')}"
+        report("sqlite", asyncio.run(run(url)), args.batch)
+
+    fake = None
+    url = args.redis
+    if url is None:
+        fake, url = start_fake_redis()
+    try:
+        name = "redis" if args.redis else "redis protocol (benchmarks.fake_redis)"
+        report(name, asyncio.run(run(url)), args.batch)
+    finally:
+        if fake is not None:
+            fake.terminate()
+            fake.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Per-event cost of the old f-string lists vs TemplateStore.
+
+The old path is the questions-channel handler's title and reply selection as
+it was: import random, format every candidate, pick one. The new path renders
+one template from the shipped templates.json. Allocation is the tracemalloc
+peak above the starting point while handling one event, averaged.
+
+    python -m benchmarks.bench_templates [--events N]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from templates import TemplateStore
+
+
+def old_questions(message):
+    import random
+
+    thread_titles = [
+        f"❓ {message.author.name}'s Question",
+        f"🤔 Help Request - {message.author.name}",
+        f"💭 Question from {message.author.display_name}",
+        f"🔍 {message.author.name} needs help",
+        f"❓ Discussion with {message.author.name}",
+        f"🆘 Support for {message.author.display_name}",
+        f"💬 {message.author.name}'s Thread",
+        f"🧠 Question Time - {message.author.name}",
+        f"🤝 Helping {message.author.display_name}",
+        f"❓ {message.author.name}'s Support Thread",
+    ]
+    thread_title = random.choice(thread_titles)
+    responses = [
+        f"Hi {message.author.mention}! 👋 I've created this thread for your question. Let's discuss it here!",
+        f"Hello {message.author.mention}! 🤔 I saw your question and made a thread so we can help you properly!",
+        f"Hey {message.author.mention}! ❓ This thread is dedicated to answering your question. Fire away!",
+        f"Welcome {message.author.mention}! 🆘 I've set up this space for your support request. How can we help?",
+        f"Hi there {message.author.mention}! 💭 Let's dive into your question in this dedicated thread!",
+        f"Hello {message.author.mention}! 🔍 I've created a focused discussion space for your question!",
+    ]
+    return thread_title, random.choice(responses)
+
+
+def new_questions(templates, message):
+    return (
+        templates.render("questions_title", message.guild, message.author),
+        templates.render("questions_reply", message.guild, message.author),
+    )
+
+
+def make_message(i: int):
+    guild = SimpleNamespace(id=1, name="Bench Guild")
+    author = SimpleNamespace(
+        name=f"user{i}", display_name=f"User {i}", mention=f"<@{10**17 + i}>"
+    )
+    return SimpleNamespace(guild=guild, author=author)
+
+
+def measure(handler, messages) -> tuple:
+    start = time.perf_counter()
+    for message in messages:
+        handler(message)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    allocated = 0
+    for message in messages[:10_000]:
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        handler(message)
+        allocated += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+    return elapsed / len(messages), allocated / min(len(messages), 10_000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    args = parser.parse_args()
+
+    templates = TemplateStore()
+    messages = [make_message(i) for i in range(args.events)]
+
+    random.seed(0)
+    old_time, old_alloc = measure(old_questions, messages)
+    random.seed(0)
+    new_time, new_alloc = measure(lambda m: new_questions(templates, m), messages)
+
+    print(f"f-string lists: {old_time * 1e6:6.2f} µs/event, {old_alloc:7.0f} B peak")
+    print(f"templates:      {new_time * 1e6:6.2f} µs/event, {new_alloc:7.0f} B peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Local stand-in for Discord's REST API and gateway.
+
+Serves just enough for discord.py to log in and connect shards:
+``GET /api/v10/users/@me``, ``GET /api/v10/gateway[/bot]`` and a websocket at
+``/gateway`` that answers IDENTIFY with READY plus one GUILD_CREATE per guild
+on that shard, and acknowledges heartbeats.
+
+``patch_discord(base_url)`` points discord.py at a running instance.
+"""
+
+import json
+import time
+
+from aiohttp import WSMsgType, web
+
+BOT_USER = {
+    "id": "100000000000000001",
+    "username": "FakeBot",
+    "discriminator": "0",
+    "avatar": None,
+    "bot": True,
+}
+
+
+def guild_payload(guild_id: int, members: int = 1) -> dict:
+    """Minimal GUILD_CREATE payload with one text channel and ``members`` members"""
+    return {
+        "id": str(guild_id),
+        "name": f"Guild {guild_id}",
+        "unavailable": False,
+        "member_count": members,
+        "roles": [
+            {
+                "id": str(guild_id),
+                "name": "@everyone",
+                "permissions": "0",
+                "position": 0,
+            }
+        ],
+        "channels": [
+            {"id": str(guild_id + 1), "name": "general", "type": 0, "position": 0}
+        ],
+        "members": [
+            {
+                "user": {
+                    "id": str(guild_id + 1000 + i),
+                    "username": f"member{i}",
+                    "discriminator": "0",
+                    "avatar": None,
+                },
+                "roles": [],
+                "joined_at": "2024-01-01T00:00:00+00:00",
+                "flags": 0,
+            }
+            for i in range(members)
+        ],
+        "threads": [],
+        "emojis": [],
+        "stickers": [],
+        "voice_states": [],
+        "presences": [],
+        "features": [],
+    }
+
+
+def json_response(data) -> web.Response:
+    # discord.py only decodes bodies whose content type is exactly application/json
+    return web.Response(body=json.dumps(data).encode(), content_type="application/json")
+
+
+def shard_for(guild_id: int, shard_count: int) -> int:
+    """Discord's guild -> shard mapping"""
+    return (guild_id >> 22) % shard_count
+
+
+class FakeGateway:
+    """aiohttp app emulating the REST and gateway endpoints discord.py needs"""
+
+    def __init__(
+        self, guild_ids=(), shard_count: int = 1, heartbeat_interval: int = 1000
+    ):
+        self.guild_ids = list(guild_ids)
+        self.shard_count = shard_count
+        self.heartbeat_interval = heartbeat_interval
+        self.base_url = None
+
+        self.identified = {}
+        self.heartbeats = 0
+        self._runner = None
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/api/v10/users/@me", self.users_me)
+        app.router.add_get("/api/v10/oauth2/applications/@me", self.application)
+        app.router.add_get("/api/v10/gateway", self.gateway)
+        app.router.add_get("/api/v10/gateway/bot", self.gateway_bot)
+        app.router.add_get("/gateway", self.websocket)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve in the current event loop; returns the base URL"""
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+        return self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def users_me(self, request):
+        return json_response(BOT_USER)
+
+    async def application(self, request):
+        return json_response(
+            {
+                "id": BOT_USER["id"],
+                "name": BOT_USER["username"],
+                "description": "",
+                "icon": None,
+                "bot_public": False,
+                "bot_require_code_grant": False,
+                "owner": BOT_USER,
+                "verify_key": "0" * 64,
+                "flags": 0,
+            }
+        )
+
+    async def gateway(self, request):
+        return json_response({"url": self._ws_url()})
+
+    async def gateway_bot(self, request):
+        return json_response(
+            {
+                "url": self._ws_url(),
+                "shards": self.shard_count,
+                "session_start_limit": {
+                    "total": 1000,
+                    "remaining": 1000,
+                    "reset_after": 0,
+                    "max_concurrency": 1,
+                },
+            }
+        )
+
+    async def websocket(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        seq = 0
+
+        async def dispatch(event, data):
+            nonlocal seq
+            seq += 1
+            await ws.send_str(json.dumps({"op": 0, "t": event, "s": seq, "d": data}))
+
+        await ws.send_str(
+            json.dumps({"op": 10, "d": {"heartbeat_interval": self.heartbeat_interval}})
+        )
+
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            payload = json.loads(msg.data)
+            op = payload.get("op")
+
+            if op == 1:
+                self.heartbeats += 1
+                await ws.send_str(json.dumps({"op": 11}))
+            elif op == 2:
+                shard_id, shard_count = payload["d"].get("shard", [0, 1])
+                self.identified[shard_id] = time.monotonic()
+                guilds = [
+                    guild_id
+                    for guild_id in self.guild_ids
+                    if shard_for(guild_id, shard_count) == shard_id
+                ]
+                await dispatch(
+                    "READY",
+                    {
+                        "v": 10,
+                        "user": BOT_USER,
+                        "guilds": [{"id": str(g), "unavailable": True} for g in guilds],
+                        "session_id": f"session-{shard_id}",
+                        "resume_gateway_url": self._ws_url(),
+                        "shard": [shard_id, shard_count],
+                        "application": {"id": BOT_USER["id"], "flags": 0},
+                    },
+                )
+                for guild_id in guilds:
+                    await dispatch("GUILD_CREATE", guild_payload(guild_id))
+
+        return ws
+
+    def _ws_url(self) -> str:
+        return self.base_url.replace("http://", "ws://") + "/gateway"
+
+
+def patch_discord(base_url: str):
+    """Point discord.py's REST base and default gateway at a FakeGateway"""
+    import discord.gateway
+    import discord.http
+    import yarl
+
+    discord.http.Route.BASE = f"{base_url}/api/v10"
+    discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(
+        base_url.replace("http://", "ws://") + "/gateway"
+    )
@@ -0,0 +1,185 @@
+"""Local stand-in for a Redis server.
+
+Speaks RESP2 over TCP and implements the commands ``RedisBackend`` uses, plus
+a few for inspection: PING, AUTH, SELECT, GET, MGET, SET (with NX/XX and
+EX/PX), DEL, DBSIZE and FLUSHDB. Keys expire lazily on access. Pipelined
+commands are answered in order, as a real server does.
+
+Run it as a separate process so benchmark clients measure a real socket hop
+to a process that doesn't share their interpreter:
+
+    python -m benchmarks.fake_redis [--port 0]
+
+prints ``host:port`` once it is listening.
+"""
+
+import argparse
+import asyncio
+import time
+
+OK = b"+OK\r\n"
+
+
+def bulk(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class FakeRedis:
+    """In-memory key/value server with expiry, one dict per database"""
+
+    def __init__(self, password: str = None):
+        self.password = password
+        self.databases = {}
+        self.commands = 0
+        self._server = None
+        self._clients = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> tuple:
+        self._server = await asyncio.start_server(self.serve, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def disconnect(self):
+        """Drop every client connection, as a server restart would"""
+        for writer in self._clients:
+            writer.close()
+
+    async def serve(self, reader, writer):
+        session = {"db": 0, "authed": self.password is None}
+        self._clients.add(writer)
+        try:
+            while True:
+                command = await self.read_command(reader)
+                if command is None:
+                    break
+                writer.write(self.execute(session, command))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    @staticmethod
+    async def read_command(reader) -> list:
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # Inline command, e.g. from telnet
+            return line.split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int((await reader.readuntil(b"\r\n"))[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def execute(self, session: dict, command: list) -> bytes:
+        self.commands += 1
+        name = command[0].upper().decode()
+        args = command[1:]
+        if name == "AUTH":
+            if args[-1].decode() != self.password:
+                return b"-WRONGPASS invalid password\r\n"
+            session["authed"] = True
+            return OK
+        if not session["authed"]:
+            return b"-NOAUTH Authentication required.\r\n"
+        handler = getattr(self, "cmd_" + name.lower(), None)
+        if handler is None:
+            return b"-ERR unknown command '%s'\r\n" % name.encode()
+        data = self.databases.setdefault(session["db"], {})
+        try:
+            return handler(session, data, *args)
+        except (TypeError, ValueError):
+            return b"-ERR syntax error\r\n"
+
+    @staticmethod
+    def lookup(data: dict, key: bytes):
+        entry = data.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires <= time.monotonic():
+            del data[key]
+            return None
+        return value
+
+    def cmd_ping(self, session, data, message=None):
+        return bulk(message) if message is not None else b"+PONG\r\n"
+
+    def cmd_select(self, session, data, db):
+        session["db"] = int(db)
+        return OK
+
+    def cmd_get(self, session, data, key):
+        return bulk(self.lookup(data, key))
+
+    def cmd_mget(self, session, data, *keys):
+        return b"*%d\r\n" % len(keys) + b"".join(
+            bulk(self.lookup(data, key)) for key in keys
+        )
+
+    def cmd_set(self, session, data, key, value, *options):
+        expires = None
+        condition = None
+        options = [option.upper() for option in options]
+        i = 0
+        while i < len(options):
+            option = options[i]
+            if option in (b"NX", b"XX"):
+                condition = option
+            elif option in (b"EX", b"PX"):
+                i += 1
+                seconds = int(options[i]) / (1 if option == b"EX" else 1000)
+                expires = time.monotonic() + seconds
+            else:
+                raise ValueError(option)
+            i += 1
+        exists = self.lookup(data, key) is not None
+        if (condition == b"NX" and exists) or (condition == b"XX" and not exists):
+            return b"$-1\r\n"
+        data[key] = (value, expires)
+        return OK
+
+    def cmd_del(self, session, data, *keys):
+        removed = sum(
+            1 for key in keys if self.lookup(data, key) is not None and data.pop(key)
+        )
+        return b":%d\r\n" % removed
+
+    def cmd_dbsize(self, session, data):
+        return b":%d\r\n" % len(data)
+
+    def cmd_flushdb(self, session, data):
+        data.clear()
+        return OK
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    async def run():
+        server = FakeRedis(password=args.password)
+        host, port = await server.start(args.host, args.port)
+        print(f"{host}:{port}", flush=True)
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
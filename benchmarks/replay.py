@@ -0,0 +1,295 @@
+"""Replay gateway event streams straight into bot.py's handlers.
+
+``ReplayEnvironment`` imports bot.py, gives its ConnectionState a bot user and
+one synthetic guild, and replaces discord.py's HTTP client with ``FakeHTTP`` so
+handlers that call Discord (fetch_message, create_thread, send) get canned
+responses without a network. Each replayed event goes through discord.py's
+own parser for its type (``MESSAGE_CREATE``, ``MESSAGE_REACTION_ADD``, ...),
+exactly as if it had arrived on the websocket.
+
+Streams are lists of ``{"t": EVENT_NAME, "d": payload}`` dicts, either built
+by the ``*_stream`` helpers here or loaded from a JSONL recording.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import Counter
+
+from benchmarks.fake_gateway import BOT_USER, guild_payload
+
+GUILD_ID = 1 << 22
+GENERAL_ID = GUILD_ID + 1
+QUESTIONS_ID = GUILD_ID + 2
+BOT_ID = int(BOT_USER["id"])
+
+
+def user_payload(user_id: int) -> dict:
+    return {
+        "id": str(user_id),
+        "username": f"user{user_id % 100000}",
+        "discriminator": "0",
+        "avatar": None,
+    }
+
+
+def member_payload(user_id: int) -> dict:
+    return {
+        "user": user_payload(user_id),
+        "roles": [],
+        "joined_at": "2024-01-01T00:00:00+00:00",
+        "flags": 0,
+    }
+
+
+def message_payload(
+    message_id: int,
+    channel_id: int = GENERAL_ID,
+    author_id: int = 5000,
+    content: str = "hello there",
+    mentions=(),
+    reply_to: dict = None,
+) -> dict:
+    data = {
+        "id": str(message_id),
+        "channel_id": str(channel_id),
+        "guild_id": str(GUILD_ID),
+        "author": user_payload(author_id),
+        "member": {k: v for k, v in member_payload(author_id).items() if k != "user"},
+        "content": content,
+        "timestamp": "2024-01-01T00:00:00+00:00",
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": list(mentions),
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+    }
+    if reply_to is not None:
+        data["type"] = 19
+        data["message_reference"] = {
+            "message_id": reply_to["id"],
+            "channel_id": reply_to["channel_id"],
+            "guild_id": str(GUILD_ID),
+        }
+        data["referenced_message"] = reply_to
+    return data
+
+
+def replay_guild() -> dict:
+    """GUILD_CREATE payload with #general and #questions"""
+    data = guild_payload(GUILD_ID, members=50)
+    data["channels"].append(
+        {"id": str(QUESTIONS_ID), "name": "questions", "type": 0, "position": 1}
+    )
+    return data
+
+
+def message_stream(count: int, start_id: int = 10**15) -> list:
+    """MESSAGE_CREATE mix: plain chat, replies, bot mentions and questions"""
+    events = []
+    previous = None
+    for i in range(count):
+        message_id = start_id + i
+        slot = i % 20
+        if slot == 0:
+            data = message_payload(message_id, QUESTIONS_ID, content="how do I?")
+        elif slot == 1:
+            data = message_payload(
+                message_id,
+                content=f"<@{BOT_ID}> hi!",
+                mentions=[dict(BOT_USER)],
+            )
+        elif slot < 8 and previous is not None:
+            data = message_payload(message_id, reply_to=previous, content="agreed")
+        else:
+            data = message_payload(message_id, author_id=5000 + i % 300)
+        previous = data
+        events.append({"t": "MESSAGE_CREATE", "d": data})
+    return events
+
+
+def reaction_stream(count: int, messages: int = 20, start_id: int = 10**15) -> list:
+    """Reaction add/remove burst spread over ``messages`` recent messages"""
+    events = [
+        {"t": "MESSAGE_CREATE", "d": message_payload(start_id + i)}
+        for i in range(messages)
+    ]
+    for i in range(count):
+        user_id = 7000 + i % 500
+        event = "MESSAGE_REACTION_ADD" if i % 4 else "MESSAGE_REACTION_REMOVE"
+        data = {
+            "user_id": str(user_id),
+            "channel_id": str(GENERAL_ID),
+            "message_id": str(start_id + i % messages),
+            "guild_id": str(GUILD_ID),
+            "emoji": {"id": None, "name": "👍"},
+            "burst": False,
+            "type": 0,
+        }
+        if event == "MESSAGE_REACTION_ADD":
+            data["member"] = member_payload(user_id)
+        events.append({"t": event, "d": data})
+    return events
+
+
+def join_stream(count: int, start_id: int = 10**14) -> list:
+    """GUILD_MEMBER_ADD flood"""
+    return [
+        {
+            "t": "GUILD_MEMBER_ADD",
+            "d": {**member_payload(start_id + i), "guild_id": str(GUILD_ID)},
+        }
+        for i in range(count)
+    ]
+
+
+SCENARIOS = {
+    "messages": message_stream,
+    "reactions": reaction_stream,
+    "joins": join_stream,
+}
+
+
+def load_stream(path: str) -> list:
+    """Read a recorded stream (one ``{"t": ..., "d": ...}`` object per line)"""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_stream(events: list, path: str):
+    with open(path, "w") as f:
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+
+class FakeHTTP:
+    """Stands in for discord.py's HTTPClient.request with canned responses"""
+
+    def __init__(self):
+        self.calls = Counter()
+        self._ids = iter(range(10**16, 10**17))
+
+    async def request(self, route, **kwargs):
+        self.calls[f"{route.method} {route.path}"] += 1
+        params = route.__dict__
+        channel_id = params.get("channel_id", GENERAL_ID)
+
+        if route.path.endswith("/threads"):
+            payload = kwargs.get("json") or {}
+            return {
+                "id": str(next(self._ids)),
+                "type": 11,
+                "guild_id": str(GUILD_ID),
+                "parent_id": str(channel_id),
+                "owner_id": str(BOT_ID),
+                "name": payload.get("name", "thread"),
+                "thread_metadata": {
+                    "archived": False,
+                    "auto_archive_duration": 1440,
+                    "archive_timestamp": "2024-01-01T00:00:00+00:00",
+                    "locked": False,
+                },
+                "message_count": 0,
+                "member_count": 0,
+                "rate_limit_per_user": 0,
+                "flags": 0,
+            }
+        if route.method == "GET" and route.path.endswith("{message_id}"):
+            # Route keeps only the channel/guild ids; the message id is in the URL
+            message_id = int(route.url.rsplit("/", 1)[1])
+            return message_payload(message_id, int(channel_id))
+        if route.method == "POST" and route.path.endswith("/messages"):
+            payload = kwargs.get("json") or {}
+            return message_payload(
+                next(self._ids),
+                int(channel_id),
+                author_id=BOT_ID,
+                content=payload.get("content") or "",
+            )
+        return {}
+
+
+class ReplayEnvironment:
+    """bot.py wired to a synthetic guild and a fake HTTP client"""
+
+    def __init__(self, env: dict = None):
+        # bot.py reads its configuration at import time
+        os.environ.setdefault("DISCORD_TOKEN", "fake-token")
+        os.environ.setdefault("GREETING_WINDOW", "0.01")
+        os.environ.setdefault("REACTION_WINDOW", "0.1")
+        os.environ.update(env or {})
+
+        import discord
+
+        import bot
+
+        self.module = bot
+        self.bot = bot.bot
+        self.state = self.bot._connection
+        self.http = FakeHTTP()
+        self.bot.http.request = self.http.request
+        bot.metrics.track_rest(self.bot.http)
+
+        self.state.user = discord.ClientUser(state=self.state, data=BOT_USER)
+
+        # Keep the JSON event log off the terminal
+        bot.event_log.stream = open(os.devnull, "w")
+
+        self._pending = []
+        schedule = self.bot._schedule_event
+
+        def track(*args, **kwargs):
+            task = schedule(*args, **kwargs)
+            self._pending.append(task)
+            return task
+
+        self.bot._schedule_event = track
+
+    async def setup(self):
+        """Bind the client to the running loop, load the event cogs, index the guild"""
+        await self.bot._async_setup_hook()
+        await self.module.plugins.load_events()
+        self.state._add_guild_from_data(replay_guild())
+        self.module.event_log.start()
+        await self.module.on_ready()
+        await self.module.warmup.wait()
+
+    async def feed(self, event: dict):
+        """Parse one gateway event and wait for every handler it triggered"""
+        self.state.parsers[event["t"]](event["d"])
+        pending, self._pending = self._pending, []
+        if pending:
+            await asyncio.gather(*pending)
+
+    async def drain(self):
+        """Wait for queued outbound actions, greetings and reaction rollups"""
+        await self.bot.get_cog("Welcome").greeter.drain()
+        await self.bot.get_cog("Reactions").reactions.drain()
+        await self.module.outbound.drain()
+
+    async def close(self):
+        await self.drain()
+        self.module.event_log.close()
+
+
+async def replay(env: ReplayEnvironment, events: list) -> dict:
+    """Feed ``events`` one at a time; returns per-event latencies and totals"""
+    latencies = []
+    start = time.perf_counter()
+    for event in events:
+        event_start = time.perf_counter()
+        await env.feed(event)
+        latencies.append(time.perf_counter() - event_start)
+    handled = time.perf_counter() - start
+    await env.drain()
+    return {
+        "events": len(events),
+        "handled_seconds": handled,
+        "total_seconds": time.perf_counter() - start,
+        "latencies": latencies,
+    }
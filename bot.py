@@ -1,11 +1,34 @@
-import discord
+import time
+
+# Startup is timed from here; discord.py itself is most of the import cost
+_import_started = time.perf_counter()
+
+import asyncio
 from discord.ext import commands
 from discord.message import Message
-from discord.reaction import Reaction
 import os
+import signal
+from types import SimpleNamespace
 from dotenv import load_dotenv
 import logging
 
+from action_registry import COMMAND_REPLY, ActionRegistry
+from admission import CLASS_COMMAND, AdmissionController
+from event_log import EventLog
+from metrics import Metrics, MetricsServer
+from reply_cache import ReplyCache
+from channel_index import ChannelIndex
+from member_index import MemberIndex
+from member_stats import MemberStats
+from plugins import PluginRegistry
+from profiles import GatewayProfile
+from render_cache import RenderCache
+from rules import RuleEngine
+from startup import StartupTimer, Warmup
+from templates import TemplateStore
+from outbound import PRIORITY_COMMAND, OutboundScheduler
+from dispatch import EventDispatcher
+
 # Load environment variables
 load_dotenv()
 
@@ -13,562 +36,311 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Bot configuration
-intents = discord.Intents.default()
-intents.message_content = True
-intents.guilds = True
-intents.reactions = True
-
-# Enable message cache to help with reaction remove events
-bot = commands.Bot(command_prefix="!", intents=intents, max_messages=10000)
-
-
-@bot.event
-async def on_ready():
-    """Event triggered when the bot is ready"""
-    print(f"🤖 Bot is ready! Logged in as {bot.user.name} (ID: {bot.user.id})")
-    print(f"📊 Connected to {len(bot.guilds)} servers")
-    print(f"🔧 Intents enabled: {bot.intents}")
-    print(f"📋 Reactions intent: {bot.intents.reactions}")
-    print("---" * 20)
-
-
-@bot.event
-async def on_member_join(member):
-    """Event triggered when a new member joins the server"""
-    print(f"👋 New member joined: {member.name} (ID: {member.id})")
-    print(f"🏠 Guild: {member.guild.name}")
-    print(f"📅 Account created: {member.created_at.strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"🔢 Member count: {member.guild.member_count}")
-
-    # Try to find a welcome channel (common names)
-    welcome_channel = None
-    welcome_channel_names = ["welcome", "general", "lobby", "main", "chat"]
-
-    for channel_name in welcome_channel_names:
-        channel = discord.utils.get(member.guild.text_channels, name=channel_name)
-        if channel:
-            welcome_channel = channel
-            print(f"📍 Found welcome channel: {channel.name}")
-            break
-
-    if welcome_channel:
-        import random
-
-        # Random welcome messages
-        welcome_messages = [
-            f"Welcome to {member.guild.name}, {member.mention}! 👋 We're glad you're here!",
-            f"Hey there {member.mention}! 🎉 Welcome to our awesome community!",
-            f"🌟 Welcome {member.mention}! Hope you enjoy your time in {member.guild.name}!",
-            f"Hello {member.mention}! 👋 Welcome to the server! Feel free to introduce yourself!",
-            f"🎊 {member.mention} just joined! Welcome to {member.guild.name}!",
-            f"Welcome aboard {member.mention}! 🚀 You're now part of our community!",
-            f"Hey {member.mention}! 😊 Welcome to {member.guild.name}! Make yourself at home!",
-            f"🎈 A warm welcome to {member.mention}! We're excited to have you here!",
-        ]
-
-        # Pick a random welcome message
-        welcome_message = random.choice(welcome_messages)
-
-        try:
-            await welcome_channel.send(welcome_message)
-            print(f"🤖 Sent welcome message: {welcome_message}")
-        except discord.Forbidden:
-            print("❌ No permission to send welcome message")
-        except Exception as e:
-            print(f"❌ Error sending welcome message: {e}")
-    else:
-        print("❌ No suitable welcome channel found")
-
-    print("---" * 20)
-
-
-@bot.event
-async def on_member_remove(member):
-    """Event triggered when a member leaves the server"""
-    print(f"👋 Member left: {member.name} (ID: {member.id})")
-    print(f"🏠 Guild: {member.guild.name}")
-    print(f"🔢 Member count: {member.guild.member_count}")
-
-    # Try to find a goodbye channel (common names)
-    goodbye_channel = None
-    goodbye_channel_names = ["goodbye", "farewell", "general", "lobby", "main", "chat"]
-
-    for channel_name in goodbye_channel_names:
-        channel = discord.utils.get(member.guild.text_channels, name=channel_name)
-        if channel:
-            goodbye_channel = channel
-            print(f"📍 Found goodbye channel: {channel.name}")
-            break
-
-    if goodbye_channel:
-        import random
-
-        # Random goodbye messages
-        goodbye_messages = [
-            f"Goodbye {member.name}! 👋 Thanks for being part of our community!",
-            f"Farewell {member.name}! 🌟 Hope to see you again someday!",
-            f"See you later {member.name}! 👋 You'll be missed!",
-            f"{member.name} has left the server. Thanks for the memories! 💫",
-            f"Goodbye {member.name}! 🚪 The door is always open if you want to return!",
-            f"Farewell {member.name}! 👋 Wishing you all the best!",
-            f"{member.name} just left. Thanks for being awesome! ✨",
-        ]
-
-        # Pick a random goodbye message
-        goodbye_message = random.choice(goodbye_messages)
-
-        try:
-            await goodbye_channel.send(goodbye_message)
-            print(f"🤖 Sent goodbye message: {goodbye_message}")
-        except discord.Forbidden:
-            print("❌ No permission to send goodbye message")
-        except Exception as e:
-            print(f"❌ Error sending goodbye message: {e}")
-    else:
-        print("❌ No suitable goodbye channel found")
-
-    print("---" * 20)
-
+# Structured event log; handlers only enqueue, a background thread writes
+event_log = EventLog.from_env()
+
+# Import time, time to READY and time to warm, reported once warmup finishes
+startup = StartupTimer(_import_started)
+
+# Optional SQLite history of messages, deletes, edits, reactions and joins/leaves;
+# sqlite3 is only imported when it is enabled
+if os.getenv("EVENT_STORE_PATH"):
+    from event_store import EventStore
+
+    event_store = EventStore.from_env(event_log=event_log)
+else:
+    event_store = None
+
+# Optional state shared with the other bot processes (message summaries and
+# action claims) in SQLite or a Redis-protocol server; see state.py
+if os.getenv("STATE_BACKEND"):
+    from state import StateBackend
+
+    state = StateBackend.from_env(event_log=event_log)
+else:
+    state = None
+
+# Per-handler call counts, latency histograms, errors and REST calls
+metrics = Metrics()
+
+# Per-guild member counters for !members, kept current by member/presence events
+member_stats = MemberStats()
+
+# Finished !members/!ping replies by version, and identical replies coalesced
+# per channel
+render_cache = RenderCache.from_env()
+
+# Name-sorted member index for !members search and export; a guild is indexed on
+# its first search and kept current from then on
+member_index = MemberIndex()
+
+# Thread creation and replies are queued here so gateway handlers return at once
+outbound = OutboundScheduler.from_env(event_log=event_log)
+
+# Bounded handler concurrency per class of event; commands are admitted first
+# and low-value work is shed under load
+admission = AdmissionController.from_env(event_log=event_log)
+
+# Threads and command replies run once per message, even if an event repeats
+actions = ActionRegistry.from_env(shared=state)
+
+# Raw mode drops discord.py's message cache; reactions, deletes and edits are
+# handled from raw payloads with context from a byte-bounded message store
+RAW_MODE = os.getenv("RAW_MODE", "").lower() in ("1", "true", "yes")
+if RAW_MODE:
+    from message_store import MessageStore
+
+    message_store = MessageStore.from_env()
+else:
+    message_store = None
+
+# Summaries of recently seen messages, so replies rarely need fetch_message
+reply_cache = ReplyCache.from_env(store=message_store, shared=state)
+
+# Welcome/goodbye/questions channels per guild, kept current by channel events
+channel_index = ChannelIndex.from_env()
+
+# Greeting, reply and thread-title templates; reloaded on SIGHUP or !reloadtemplates
+templates = TemplateStore.from_env(event_log=event_log)
+
+# Keyword/regex auto-responses; reloaded on SIGHUP or !reloadrules
+rules = RuleEngine.from_env(event_log=event_log)
+
+# Intents, member caching and chunking for the features in FEATURES (all of the
+# old configuration when unset)
+profile = GatewayProfile.from_env()
+
+# The message cache helps with reaction remove events (not needed in raw mode)
+MAX_MESSAGES = 10000 if profile.message_cache and not RAW_MODE else None
+
+# Sharding: SHARDED=1 uses AutoShardedBot; SHARD_COUNT/SHARD_IDS pin this process
+# to a range of shards (set per worker by launcher.py)
+SHARD_COUNT = int(os.getenv("SHARD_COUNT")) if os.getenv("SHARD_COUNT") else None
+SHARD_IDS = (
+    [int(shard_id) for shard_id in os.getenv("SHARD_IDS").split(",")]
+    if os.getenv("SHARD_IDS")
+    else None
+)
+SHARDED = os.getenv("SHARDED", "").lower() in ("1", "true", "yes") or bool(SHARD_COUNT)
+
+# http_trace lets the outbound scheduler see rate-limit headers on every response
+if SHARDED:
+    bot = commands.AutoShardedBot(
+        command_prefix="!",
+        intents=profile.intents,
+        member_cache_flags=profile.member_cache_flags,
+        chunk_guilds_at_startup=profile.chunk_guilds_at_startup,
+        max_messages=MAX_MESSAGES,
+        http_trace=outbound.trace_config(),
+        shard_count=SHARD_COUNT,
+        shard_ids=SHARD_IDS,
+    )
+else:
+    bot = commands.Bot(
+        command_prefix="!",
+        intents=profile.intents,
+        member_cache_flags=profile.member_cache_flags,
+        chunk_guilds_at_startup=profile.chunk_guilds_at_startup,
+        max_messages=MAX_MESSAGES,
+        http_trace=outbound.trace_config(),
+    )
 
-@bot.event
-async def on_message(message: Message):
-    """Event triggered when a message is sent in channels or threads"""
-    # Don't respond to bot messages
-    if message.author.bot:
+# Attribute every REST request to the handler that made it
+metrics.track_rest(bot.http)
+metrics.add_source("event_log", event_log.stats)
+metrics.add_source("outbound", outbound.stats)
+metrics.add_source("admission", admission.stats)
+metrics.add_source("reply_cache", reply_cache.stats)
+metrics.add_source("render_cache", render_cache.stats)
+metrics.add_source("actions", actions.stats)
+metrics.add_source("rules", rules.stats)
+if event_store is not None:
+    metrics.add_source("event_store", event_store.stats)
+if state is not None:
+    metrics.add_source("state", state.stats)
+
+# Prometheus-style /metrics endpoint, only served when METRICS_PORT is set
+metrics_server = MetricsServer.from_env(metrics) if os.getenv("METRICS_PORT") else None
+
+# Event cogs, loaded before connecting, and command cogs, loaded during warmup or
+# by the first command that arrives before it
+plugins = PluginRegistry.from_env(bot, metrics=metrics, event_log=event_log)
+metrics.add_source("plugins", plugins.stats)
+
+# Per-guild indexing and plugin loading run after READY in time-sliced stages;
+# anything a stage skips is built on first use instead
+warmup = Warmup.from_env(startup=startup, event_log=event_log)
+warmup.add_stage("channel_index", channel_index.build, lambda: bot.guilds)
+warmup.add_stage("member_stats", member_stats.seed, lambda: bot.guilds)
+warmup.add_stage("plugins", plugins.load, lambda: plugins.pending)
+
+
+# Gateway events are normalised once and fanned out to the consumers the event
+# cogs register. Bookkeeping consumers (event store, reaction counts, message
+# summaries) run for every record; the others (logging, replies, threads) only
+# once the handler is admitted.
+bookkeeping = EventDispatcher()
+dispatcher = EventDispatcher()
+
+
+async def dispatch_admitted(record, admission_class: str):
+    """Run a record's bookkeeping, then its other consumers unless shed"""
+    await bookkeeping.dispatch(record)
+    # Nothing else consumes the kind: don't take a slot for it
+    if not dispatcher.handles(record.kind):
         return
-
-    # Only process messages from text channels, threads, forum channels, and announcement channels
-    if isinstance(
-        message.channel,
-        (
-            discord.TextChannel,
-            discord.Thread,
-            discord.ForumChannel,
-        ),
-    ):
-        print(f"📝 Message: {message.content}")
-        print(f"👤 Author: {message.author.name} (ID: {message.author.id})")
-        print(f"🏠 Guild: {message.guild.name}")
-
-        # Check if message is in "questions" channel
-        if message.channel.name.lower() == "questions":
-            print(f"❓ Message in questions channel detected!")
-            # Handle questions channel message (create thread)
-            await handle_questions_channel(message)
-
-        # Check if the bot is mentioned in the message
-        if bot.user in message.mentions:
-            print(f"🏷️ Bot was mentioned!")
-            print(f"🔗 Mention by: {message.author.name}")
-            print(f"📄 Message with mention: {message.content}")
-
-            # You can also check for specific mention patterns
-            if message.content.startswith(
-                f"<@{bot.user.id}>"
-            ) or message.content.startswith(f"<@!{bot.user.id}>"):
-                print(f"💬 Bot was mentioned at the start of the message!")
-
-            # Check if it's a reply that mentions the bot
-            if message.reference:
-                print(f"💬 Bot mentioned in a reply!")
-
-            # Handle the mention (respond to it)
-            await handle_bot_mention(message)
-
-        # Check if this message is a reply to another message
-        if message.reference:
-            print(f"💬 This is a reply!")
-            print(f"🔗 Reply to message ID: {message.reference.message_id}")
-
-            # Get the original message being replied to
-            try:
-                original_message = await message.channel.fetch_message(
-                    message.reference.message_id
-                )
-                print(f"📄 Original message: {original_message.content}")
-                print(f"👤 Original author: {original_message.author.name}")
-            except discord.NotFound:
-                print("❌ Original message not found (might be deleted)")
-            except discord.Forbidden:
-                print("❌ No permission to fetch the original message")
-
-        if isinstance(message.channel, discord.Thread):
-            print(f"🧵 Thread: {message.channel.name}")
-            if hasattr(message.channel.parent, "name"):
-                print(f"📍 Parent Channel: {message.channel.parent.name}")
-        elif isinstance(message.channel, discord.ForumChannel):
-            print(f"🗂️ Forum Channel: {message.channel.name}")
-        else:
-            print(f"📍 Channel: {message.channel.name}")
-
-        print("---" * 20)
-
-    # Process commands
-    await bot.process_commands(message)
-
-
-@bot.event
-async def on_message_delete(message: Message):
-    """Event triggered when a message is deleted"""
-    # Don't log bot message deletions
-    if message.author.bot:
+    if not await admission.acquire(admission_class):
         return
-
-    # Only process deletions from text channels, threads, forum channels, and announcement channels
-    if isinstance(
-        message.channel,
-        (
-            discord.TextChannel,
-            discord.Thread,
-            discord.ForumChannel,
+    try:
+        await dispatcher.dispatch(record)
+    finally:
+        admission.release(admission_class)
+
+
+def respond(ctx, content=None, **kwargs):
+    """Queue a command response ahead of thread and welcome traffic, once per message
+
+    Replies are numbered per invocation, so a command's second reply is not
+    taken for a duplicate of its first, while a redelivered message's replies
+    still match the original's one for one.
+    """
+    sequence = ctx.reply_sequence = getattr(ctx, "reply_sequence", -1) + 1
+    return actions.once(
+        ctx.message.id,
+        f"{COMMAND_REPLY}:{sequence}" if sequence else COMMAND_REPLY,
+        lambda: outbound.submit(
+            ("channel", ctx.channel.id),
+            lambda: ctx.send(content, **kwargs),
+            PRIORITY_COMMAND,
         ),
-    ):
-        print(f"🗑️ Message deleted: {message.content}")
-        print(f"👤 Author: {message.author.name} (ID: {message.author.id})")
-        print(f"🏠 Guild: {message.guild.name}")
+    )
 
-        if isinstance(message.channel, discord.Thread):
-            print(f"🧵 Thread: {message.channel.name}")
-            if hasattr(message.channel.parent, "name"):
-                print(f"📍 Parent Channel: {message.channel.parent.name}")
-        elif isinstance(message.channel, discord.ForumChannel):
-            print(f"🗂️ Forum Channel: {message.channel.name}")
-        else:
-            print(f"📍 Channel: {message.channel.name}")
 
-        print("---" * 20)
+# Everything the cogs use; they can't import this module (it runs as __main__)
+bot.services = SimpleNamespace(
+    event_log=event_log,
+    event_store=event_store,
+    state=state,
+    metrics=metrics,
+    admission=admission,
+    outbound=outbound,
+    bookkeeping=bookkeeping,
+    dispatcher=dispatcher,
+    dispatch=dispatch_admitted,
+    channel_index=channel_index,
+    member_stats=member_stats,
+    member_index=member_index,
+    render_cache=render_cache,
+    actions=actions,
+    reply_cache=reply_cache,
+    templates=templates,
+    rules=rules,
+    startup=startup,
+    warmup=warmup,
+    plugins=plugins,
+    respond=respond,
+    sharded=SHARDED,
+    raw_mode=RAW_MODE,
+)
 
 
 @bot.event
-async def on_reaction_add(reaction: Reaction, user):
-    """Event triggered when a reaction is added to a message"""
-    print(f"🔍 DEBUG: Reaction event triggered!")
-    print(f"🔍 DEBUG: User: {user.name}, Bot: {user.bot}")
-    print(f"🔍 DEBUG: Channel type: {type(reaction.message.channel)}")
-    print(
-        f"🔍 DEBUG: Guild: {reaction.message.guild.name if reaction.message.guild else 'DM'}"
-    )
-
-    # Don't log bot reactions
-    if user.bot:
-        return
-
-    # Only process reactions from text channels, threads, forum channels, and announcement channels
-    if isinstance(
-        reaction.message.channel,
-        (
-            discord.TextChannel,
-            discord.Thread,
-            discord.ForumChannel,
-        ),
-    ):
-        print(f"👍 Reaction added: {reaction.emoji}")
-        print(f"👤 User: {user.name} (ID: {user.id})")
-        print(f"📝 Message: {reaction.message.content}")
-        print(f"✍️ Original Author: {reaction.message.author.name}")
-        print(f"🏠 Guild: {reaction.message.guild.name}")
+async def setup_hook():
+    """Start background services and load the event cogs before connecting"""
+    await plugins.load_events()
 
-        if isinstance(reaction.message.channel, discord.Thread):
-            print(f"🧵 Thread: {reaction.message.channel.name}")
-            if hasattr(reaction.message.channel.parent, "name"):
-                print(f"📍 Parent Channel: {reaction.message.channel.parent.name}")
-        elif isinstance(reaction.message.channel, discord.ForumChannel):
-            print(f"🗂️ Forum Channel: {reaction.message.channel.name}")
-        else:
-            print(f"📍 Channel: {reaction.message.channel.name}")
+    if metrics_server is not None:
+        await metrics_server.start()
 
-        print("---" * 20)
+    # SIGHUP reloads templates and rules from the event loop
+    if hasattr(signal, "SIGHUP"):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, _reload_config)
 
 
 @bot.event
-async def on_reaction_remove(reaction: Reaction, user):
-    """Event triggered when a reaction is removed from a message"""
-    print(f"🔍 DEBUG: Reaction REMOVE event triggered!")
-    print(f"🔍 DEBUG: User: {user.name}, Bot: {user.bot}")
-    print(f"🔍 DEBUG: Channel type: {type(reaction.message.channel)}")
-    print(
-        f"🔍 DEBUG: Guild: {reaction.message.guild.name if reaction.message.guild else 'DM'}"
+@metrics.instrument
+async def on_ready():
+    """Event triggered when the bot is ready"""
+    startup.mark("ready")
+    event_log.emit(
+        "ready",
+        user=bot.user.name,
+        user_id=bot.user.id,
+        guilds=len(bot.guilds),
+        intents=bot.intents.value,
+        reactions_intent=bot.intents.reactions,
+        member_cache_flags=profile.member_cache_flags.value,
+        chunk_guilds=profile.chunk_guilds_at_startup,
     )
 
-    # Don't log bot reaction removals
-    if user.bot:
-        return
-
-    # Only process reaction removals from text channels, threads, forum channels, and announcement channels
-    if isinstance(
-        reaction.message.channel,
-        (
-            discord.TextChannel,
-            discord.Thread,
-            discord.ForumChannel,
-        ),
-    ):
-        print(f"👎 Reaction removed: {reaction.emoji}")
-        print(f"👤 User: {user.name} (ID: {user.id})")
-        print(f"📝 Message: {reaction.message.content}")
-        print(f"✍️ Original Author: {reaction.message.author.name}")
-        print(f"🏠 Guild: {reaction.message.guild.name}")
-
-        if isinstance(reaction.message.channel, discord.Thread):
-            print(f"🧵 Thread: {reaction.message.channel.name}")
-            if hasattr(reaction.message.channel.parent, "name"):
-                print(f"📍 Parent Channel: {reaction.message.channel.parent.name}")
-        elif isinstance(reaction.message.channel, discord.ForumChannel):
-            print(f"🗂️ Forum Channel: {reaction.message.channel.name}")
-        else:
-            print(f"📍 Channel: {reaction.message.channel.name}")
-
-        print("---" * 20)
+    # Guild indexes and cogs are built in the background; reconnects restart it
+    warmup.start()
 
 
 @bot.event
-async def on_raw_reaction_remove(payload):
-    """Event triggered when a reaction is removed (works even if message isn't cached)"""
-    print(f"🔍 DEBUG: RAW Reaction REMOVE event triggered!")
-    print(f"🔍 DEBUG: User ID: {payload.user_id}")
-    print(f"🔍 DEBUG: Message ID: {payload.message_id}")
-    print(f"🔍 DEBUG: Channel ID: {payload.channel_id}")
-    print(f"🔍 DEBUG: Guild ID: {payload.guild_id}")
-    print(f"🔍 DEBUG: Emoji: {payload.emoji}")
-
-    # Don't log bot reaction removals
-    if payload.user_id == bot.user.id:
-        return
-
-    # Get the guild and channel
-    guild = bot.get_guild(payload.guild_id)
-    if not guild:
-        print("❌ Guild not found")
-        return
-
-    channel = guild.get_channel(payload.channel_id)
-    if not channel:
-        print("❌ Channel not found")
-        return
-
-    # Get the user who removed the reaction
-    user = guild.get_member(payload.user_id)
-    if not user:
-        print("❌ User not found")
+@metrics.instrument
+async def on_message(message: Message):
+    """Run prefix commands; everything else about messages is in cogs/messages.py"""
+    if message.author.bot or not message.content.startswith(bot.command_prefix):
         return
 
-    # Only process reactions from text channels, threads, forum channels
-    if isinstance(channel, (discord.TextChannel, discord.Thread, discord.ForumChannel)):
-        print(f"👎 RAW Reaction removed: {payload.emoji}")
-        print(f"👤 User: {user.name} (ID: {user.id})")
-        print(f"📍 Channel: {channel.name}")
-        print(f"🏠 Guild: {guild.name}")
-
-        # Try to get the message (might fail if not cached)
-        try:
-            message = await channel.fetch_message(payload.message_id)
-            print(f"📝 Message: {message.content}")
-            print(f"✍️ Original Author: {message.author.name}")
-        except discord.NotFound:
-            print("❌ Message not found (might be deleted)")
-        except discord.Forbidden:
-            print("❌ No permission to fetch the message")
-
-        print("---" * 20)
-
-
-# Simple command for testing
-@bot.command(name="ping")
-async def ping(ctx):
-    """Simple ping command"""
-    await ctx.send(f"Pong! Latency: {round(bot.latency * 1000)}ms")
-    print(f"🏓 Ping command used by {ctx.author.name}")
-
-
-@bot.command(name="members")
-async def list_members(ctx, limit: int = 10):
-    """List all members in the server"""
-    if not ctx.guild:
-        await ctx.send("❌ This command can only be used in a server")
+    # Commands are admitted ahead of other handlers; a shed command is dropped
+    if not await admission.acquire(CLASS_COMMAND):
         return
+    try:
+        # A command that beats warmup loads the remaining cogs itself
+        if plugins.pending:
+            await plugins.load_all()
 
-    # Get all members
-    members = ctx.guild.members
-    total_members = len(members)
-
-    print(f"📊 Total members in {ctx.guild.name}: {total_members}")
-
-    # Create embed with member info
-    embed = discord.Embed(
-        title=f"Members in {ctx.guild.name}",
-        description=f"Total: {total_members} members\nRequested by {ctx.author.mention}",
-        color=0x00FF00,
-    )
-
-    # Show limited number of members (to avoid embed size limits)
-    display_limit = min(limit, 25)  # Discord embed field limit
-    member_list = []
-
-    for i, member in enumerate(members[:display_limit]):
-        status_emoji = (
-            "🟢"
-            if member.status == discord.Status.online
-            else (
-                "🟡"
-                if member.status == discord.Status.idle
-                else "🔴" if member.status == discord.Status.dnd else "⚫"
-            )
-        )
-
-        bot_indicator = "🤖" if member.bot else "👤"
-
-        member_info = f"{status_emoji} {bot_indicator} {member.mention} ({member.name})"
-        member_list.append(member_info)
-
-    # Add members to embed
-    if member_list:
-        embed.add_field(
-            name=f"First {display_limit} Members:",
-            value="\n".join(member_list),
-            inline=False,
-        )
-
-    # Add statistics
-    bots = sum(1 for member in members if member.bot)
-    humans = total_members - bots
-    online = sum(1 for member in members if member.status != discord.Status.offline)
-
-    embed.add_field(name="👤 Humans", value=str(humans), inline=True)
-    embed.add_field(name="🤖 Bots", value=str(bots), inline=True)
-    embed.add_field(name="🟢 Online", value=str(online), inline=True)
-
-    await ctx.send(embed=embed)
-    print(f"🤖 Listed {display_limit} members for {ctx.author.name}")
+        # Process commands
+        await bot.process_commands(message)
+    finally:
+        admission.release(CLASS_COMMAND)
 
 
-@bot.event
-async def on_mention():
-    """Handle bot mentions - this will be triggered from on_message"""
-    pass
-
-
-async def handle_questions_channel(message: Message):
-    """Handle messages in the questions channel by creating a thread"""
-    import random
-
-    # Random thread titles for questions
-    thread_titles = [
-        f"❓ {message.author.name}'s Question",
-        f"🤔 Help Request - {message.author.name}",
-        f"💭 Question from {message.author.display_name}",
-        f"🔍 {message.author.name} needs help",
-        f"❓ Discussion with {message.author.name}",
-        f"🆘 Support for {message.author.display_name}",
-        f"💬 {message.author.name}'s Thread",
-        f"🧠 Question Time - {message.author.name}",
-        f"🤝 Helping {message.author.display_name}",
-        f"❓ {message.author.name}'s Support Thread",
-    ]
-
-    # Pick a random thread title
-    thread_title = random.choice(thread_titles)
+def _reload_config():
+    # Called from the event loop, not a signal handler, so the event log lock
+    # that reload() takes is never held by interrupted code. Parsing happens
+    # here; renders and matches switch over in one reference swap
+    templates.reload()
+    rules.reload()
 
-    try:
-        # Create a new thread from the message
-        thread = await message.create_thread(name=thread_title)
-
-        # Random responses for questions channel
-        responses = [
-            f"Hi {message.author.mention}! 👋 I've created this thread for your question. Let's discuss it here!",
-            f"Hello {message.author.mention}! 🤔 I saw your question and made a thread so we can help you properly!",
-            f"Hey {message.author.mention}! ❓ This thread is dedicated to answering your question. Fire away!",
-            f"Welcome {message.author.mention}! 🆘 I've set up this space for your support request. How can we help?",
-            f"Hi there {message.author.mention}! 💭 Let's dive into your question in this dedicated thread!",
-            f"Hello {message.author.mention}! 🔍 I've created a focused discussion space for your question!",
-        ]
-
-        # Pick a random response
-        response = random.choice(responses)
-
-        # Send the response in the new thread
-        await thread.send(response)
-
-        print(f"🧵 Created questions thread '{thread_title}' for {message.author.name}")
-        print(f"🤖 Bot responded in questions thread: {response}")
-
-    except discord.Forbidden:
-        # If we can't create a thread, fall back to regular reply
-        print("❌ Cannot create thread in questions channel - insufficient permissions")
-        fallback_response = f"Hi {message.author.mention}! 👋 I'd love to create a thread for your question, but I don't have permission to do so."
-        await message.reply(fallback_response)
-        print(f"🤖 Bot replied with fallback in questions: {fallback_response}")
-    except Exception as e:
-        print(f"❌ Error creating thread in questions channel: {e}")
-        # Fallback to regular reply
-        fallback_response = f"Hi {message.author.mention}! 👋 I see your question! Something went wrong creating a thread, but I'm here to help!"
-        await message.reply(fallback_response)
-        print(f"🤖 Bot replied with fallback in questions: {fallback_response}")
-
-
-async def handle_bot_mention(message: Message):
-    """Handle when the bot is mentioned"""
-    import random
-
-    # Random thread titles
-    thread_titles = [
-        f"Chat with {message.author.name}",
-        f"Discussion with {message.author.display_name}",
-        f"{message.author.name}'s Help Thread",
-        f"Conversation - {message.author.name}",
-        f"Support Thread for {message.author.name}",
-        f"Chat Room - {message.author.display_name}",
-        f"{message.author.name}'s Discussion",
-        f"Help Desk - {message.author.name}",
-        f"Thread for {message.author.display_name}",
-        f"Private Chat with {message.author.name}",
-    ]
-
-    # Pick a random thread title
-    thread_title = random.choice(thread_titles)
 
-    try:
-        # Create a new thread from the message
-        thread = await message.create_thread(name=thread_title)
-
-        # Random responses to send in the thread
-        responses = [
-            f"Hey {message.author.mention}! 👋 I've created this thread for our conversation!",
-            f"Hello there, {message.author.mention}! How can I help you in this thread?",
-            f"You called, {message.author.mention}? 🤖 Let's chat here!",
-            f"What's up, {message.author.mention}? 😊 This is our private discussion space!",
-            f"Hi {message.author.mention}! I've made a thread just for us to talk! 💬",
-        ]
-
-        # Pick a random response
-        response = random.choice(responses)
-
-        # Send the response in the new thread (as a reply to the original message)
-        await thread.send(response)
-
-        print(f"🧵 Created thread '{thread_title}' for {message.author.name}")
-        print(f"🤖 Bot responded in thread: {response}")
-
-    except discord.Forbidden:
-        # If we can't create a thread, fall back to regular reply
-        print("❌ Cannot create thread - insufficient permissions")
-        fallback_response = f"Hey {message.author.mention}! 👋 I'd love to create a thread for us, but I don't have permission to do so."
-        await message.reply(fallback_response)
-        print(f"🤖 Bot replied with fallback: {fallback_response}")
-    except Exception as e:
-        print(f"❌ Error creating thread: {e}")
-        # Fallback to regular reply
-        fallback_response = f"Hey {message.author.mention}! 👋 Something went wrong, but I'm here to help!"
-        await message.reply(fallback_response)
-        print(f"🤖 Bot replied with fallback: {fallback_response}")
+def _terminate(signum, frame):
+    # bot.run() treats KeyboardInterrupt as a request to close cleanly
+    raise KeyboardInterrupt
 
 
-if __name__ == "__main__":
+def main():
+    """Run the bot until interrupted or terminated"""
     token = os.getenv("DISCORD_TOKEN")
     if not token:
         print("❌ Error: DISCORD_TOKEN not found in environment variables!")
         print("Please set your Discord bot token in the .env file")
         exit(1)
 
-    print("🚀 Starting Discord bot...")
-    bot.run(token)
+    if SHARD_IDS:
+        print(f"🚀 Starting Discord bot (shards {SHARD_IDS} of {SHARD_COUNT})...")
+    else:
+        print("🚀 Starting Discord bot...")
+    signal.signal(signal.SIGTERM, _terminate)
+    event_log.start()
+    if event_store is not None:
+        event_store.start()
+    if state is not None:
+        state.start()
+    try:
+        bot.run(token)
+    finally:
+        if state is not None:
+            state.close()
+        if event_store is not None:
+            event_store.close()
+        event_log.close()
+
+
+startup.mark("imported")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Per-guild channel routing index.
+
+Resolves the welcome, goodbye and questions channels once per guild instead of
+scanning ``guild.text_channels`` for every candidate name on every event. The
+index is built by the post-READY warmup, on guild join or on a guild's first
+lookup, and a guild's entry is rebuilt whenever one of its channels is
+created, renamed, moved or deleted.
+"""
+
+import os
+
+import discord
+
+WELCOME_CHANNEL_NAMES = ("welcome", "general", "lobby", "main", "chat")
+GOODBYE_CHANNEL_NAMES = ("goodbye", "farewell", "general", "lobby", "main", "chat")
+QUESTIONS_CHANNEL_NAMES = ("questions",)
+
+
+def _names_from_env(key: str, default: tuple) -> tuple:
+    value = os.getenv(key)
+    if not value:
+        return default
+    return tuple(name.strip() for name in value.split(",") if name.strip())
+
+
+class GuildRoutes:
+    """Resolved routing targets for one guild"""
+
+    __slots__ = ("names", "welcome_id", "goodbye_id", "questions_ids")
+
+    def __init__(self, names, welcome_id, goodbye_id, questions_ids):
+        self.names = names
+        self.welcome_id = welcome_id
+        self.goodbye_id = goodbye_id
+        self.questions_ids = questions_ids
+
+
+class ChannelIndex:
+    """Maps guilds to their routing channels with O(1) lookups"""
+
+    def __init__(
+        self,
+        welcome_names=WELCOME_CHANNEL_NAMES,
+        goodbye_names=GOODBYE_CHANNEL_NAMES,
+        questions_names=QUESTIONS_CHANNEL_NAMES,
+    ):
+        self.welcome_names = tuple(welcome_names)
+        self.goodbye_names = tuple(goodbye_names)
+        self.questions_names = frozenset(name.lower() for name in questions_names)
+
+        self._routes = {}
+        # Union of every guild's questions channels, so on_message needs no guild lookup
+        self.questions_ids = set()
+
+    @classmethod
+    def from_env(cls):
+        """Build an index with channel names from *_CHANNELS environment variables"""
+        return cls(
+            welcome_names=_names_from_env("WELCOME_CHANNELS", WELCOME_CHANNEL_NAMES),
+            goodbye_names=_names_from_env("GOODBYE_CHANNELS", GOODBYE_CHANNEL_NAMES),
+            questions_names=_names_from_env(
+                "QUESTIONS_CHANNELS", QUESTIONS_CHANNEL_NAMES
+            ),
+        )
+
+    def build(self, guild) -> GuildRoutes:
+        """(Re)index one guild's channels"""
+        names = {}
+        # text_channels is sorted by position, so the first channel with a name wins,
+        # matching discord.utils.get(guild.text_channels, name=...)
+        for channel in guild.text_channels:
+            names.setdefault(channel.name, channel.id)
+
+        questions_ids = frozenset(
+            channel.id
+            for channel in guild.channels
+            if isinstance(channel, (discord.TextChannel, discord.ForumChannel))
+            and channel.name.lower() in self.questions_names
+        )
+
+        routes = GuildRoutes(
+            names,
+            self._first(names, self.welcome_names),
+            self._first(names, self.goodbye_names),
+            questions_ids,
+        )
+
+        old = self._routes.get(guild.id)
+        if old is not None:
+            self.questions_ids.difference_update(old.questions_ids)
+        self.questions_ids.update(questions_ids)
+        self._routes[guild.id] = routes
+        return routes
+
+    def remove(self, guild_id: int):
+        """Forget a guild the bot left"""
+        old = self._routes.pop(guild_id, None)
+        if old is not None:
+            self.questions_ids.difference_update(old.questions_ids)
+
+    def routes(self, guild) -> GuildRoutes:
+        routes = self._routes.get(guild.id)
+        if routes is None:
+            routes = self.build(guild)
+        return routes
+
+    def channel_named(self, guild, name: str):
+        """Text channel with exactly this name, or None"""
+        channel_id = self.routes(guild).names.get(name)
+        return guild.get_channel(channel_id) if channel_id is not None else None
+
+    def welcome_channel(self, guild):
+        """Channel to greet new members in, or None"""
+        channel_id = self.routes(guild).welcome_id
+        return guild.get_channel(channel_id) if channel_id is not None else None
+
+    def goodbye_channel(self, guild):
+        """Channel to announce departures in, or None"""
+        channel_id = self.routes(guild).goodbye_id
+        return guild.get_channel(channel_id) if channel_id is not None else None
+
+    def is_questions(self, channel) -> bool:
+        if channel.id in self.questions_ids:
+            return True
+        # Guilds the warmup hasn't reached yet are indexed on first use
+        guild = channel.guild
+        return (
+            guild.id not in self._routes
+            and channel.id in self.build(guild).questions_ids
+        )
+
+    @staticmethod
+    def _first(names: dict, candidates: tuple):
+        for name in candidates:
+            channel_id = names.get(name)
+            if channel_id is not None:
+                return channel_id
+        return None
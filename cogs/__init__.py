@@ -0,0 +1,8 @@
+"""Event and command extensions loaded by ``plugins.PluginRegistry``.
+
+Each module defines ``async def setup(bot)`` which adds one Cog. Event cogs
+register listeners and ``EventDispatcher`` consumers; command cogs add
+commands. Cogs reach the
+bot's shared services through ``bot.services`` rather than importing bot.py,
+which runs as ``__main__``.
+"""
@@ -0,0 +1,83 @@
+"""Event store writes: messages, edits, deletes, reactions and member joins/leaves.
+
+Only loaded into the bot when EVENT_STORE_PATH enables the store.
+"""
+
+from discord.ext import commands
+
+from dispatch import (
+    MESSAGE,
+    MESSAGE_DELETE,
+    RAW_MESSAGE_DELETE,
+    RAW_MESSAGE_EDIT,
+    RAW_REACTION_ADD,
+    RAW_REACTION_REMOVE,
+)
+
+
+class History(commands.Cog):
+    """Records every observed event in the event store
+
+    Recording is bookkeeping: it runs before admission, so shed handlers
+    still leave a complete history for !deleted and !history.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.services = bot.services
+        self.event_store = bot.services.event_store
+
+        # Reactions are stored from the raw events only; discord.py also fires
+        # the cached events for a cached message, which would store them twice
+        bot.services.bookkeeping.consumer(
+            MESSAGE,
+            MESSAGE_DELETE,
+            RAW_REACTION_ADD,
+            RAW_REACTION_REMOVE,
+            RAW_MESSAGE_DELETE,
+            RAW_MESSAGE_EDIT,
+        )(self.store_event)
+
+    def cog_unload(self):
+        self.services.bookkeeping.remove(self.store_event)
+
+    async def store_event(self, record):
+        """Persist a normalised event; raw kinds are stored under their plain names"""
+        source = record.source
+        if record.kind in (MESSAGE, MESSAGE_DELETE):
+            content, data = source.content, {}
+        elif record.kind == RAW_MESSAGE_EDIT:
+            content, data = source.message.content, {}
+        elif record.kind == RAW_MESSAGE_DELETE:
+            content, data = None, {}
+        else:
+            content, data = None, {"emoji": str(source.emoji)}
+
+        self.event_store.record(
+            record.kind.removeprefix("raw_"),
+            guild_id=record.guild_id,
+            channel_id=record.channel_id,
+            user_id=record.user_id,
+            message_id=record.message_id,
+            content=content,
+            **data,
+        )
+
+    @commands.Cog.listener("on_member_join")
+    async def store_member_join(self, member):
+        """Record a join"""
+        self.event_store.record(
+            "member_join", guild_id=member.guild.id, user_id=member.id
+        )
+
+    @commands.Cog.listener("on_member_remove")
+    async def store_member_remove(self, member):
+        """Record a leave"""
+        self.event_store.record(
+            "member_remove", guild_id=member.guild.id, user_id=member.id
+        )
+
+
+async def setup(bot):
+    if bot.services.event_store is not None:
+        await bot.add_cog(History(bot))
@@ -0,0 +1,282 @@
+"""Member listing, search and export commands."""
+
+import asyncio
+import csv
+import datetime
+import gzip
+import io
+import itertools
+import json
+import tempfile
+from typing import Optional
+
+import discord
+from discord.ext import commands
+
+from member_index import cached_members, decode_cursor, member_filter
+
+STATUS_EMOJIS = {"online": "🟢", "idle": "🟡", "dnd": "🔴"}
+
+# Results per !members search page
+SEARCH_PAGE_SIZE = 20
+
+# Members formatted per chunk of an export before yielding to the event loop
+EXPORT_CHUNK = 1000
+
+# Exports spill from memory to a temporary file past this size
+EXPORT_SPOOL_BYTES = 1 << 20
+
+EXPORT_FIELDS = (
+    "id",
+    "name",
+    "display_name",
+    "bot",
+    "status",
+    "joined_at",
+    "created_at",
+)
+
+
+def _date(argument: str) -> datetime.datetime:
+    """YYYY-MM-DD as midnight UTC"""
+    try:
+        day = datetime.date.fromisoformat(argument)
+    except ValueError:
+        raise commands.BadArgument(f"{argument!r} is not a YYYY-MM-DD date")
+    return datetime.datetime.combine(day, datetime.time(), datetime.timezone.utc)
+
+
+class MemberQuery(commands.FlagConverter, delimiter=":", prefix=""):
+    """``[name prefix] [bot:yes|no] [status:...] [joined_after:] [joined_before:]``"""
+
+    name: str = commands.flag(positional=True, default="")
+    bot: Optional[bool] = None
+    status: Optional[str] = None
+    joined_after: Optional[_date] = None
+    joined_before: Optional[_date] = None
+    cursor: Optional[str] = None
+    format: str = "csv"
+    gzip: bool = False
+
+    def where(self):
+        return member_filter(
+            bot=self.bot,
+            status=self.status.lower() if self.status else None,
+            joined_after=self.joined_after,
+            joined_before=self.joined_before,
+        )
+
+
+def export_row(member) -> tuple:
+    return (
+        member.id,
+        member.name,
+        member.display_name,
+        member.bot,
+        member.raw_status,
+        member.joined_at.isoformat() if member.joined_at else "",
+        member.created_at.isoformat(),
+    )
+
+
+async def write_export(pages, fp, fmt: str = "csv", compress: bool = False) -> int:
+    """Write pages of members to a binary file as CSV or JSON lines; returns rows
+
+    Every page is formatted and written before the next one is read, and the
+    loop yields between pages, so memory use depends on the page size only.
+    """
+    raw = gzip.GzipFile(fileobj=fp, mode="wb") if compress else fp
+    text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    rows = 0
+    try:
+        if fmt == "csv":
+            writer = csv.writer(text)
+            writer.writerow(EXPORT_FIELDS)
+        for members in pages:
+            if fmt == "csv":
+                writer.writerows(map(export_row, members))
+            else:
+                text.write(
+                    "".join(
+                        json.dumps(dict(zip(EXPORT_FIELDS, export_row(member)))) + "\n"
+                        for member in members
+                    )
+                )
+            rows += len(members)
+            await asyncio.sleep(0)
+    finally:
+        text.flush()
+        text.detach()
+        if compress:
+            raw.close()
+    return rows
+
+
+class Members(commands.Cog):
+    """!members, !members search and !members export"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.services = bot.services
+
+    @commands.group(name="members", invoke_without_command=True)
+    async def list_members(self, ctx, limit: int = 10):
+        """List all members in the server"""
+        if not ctx.guild:
+            self.services.respond(ctx, "❌ This command can only be used in a server")
+            return
+
+        # Counters are maintained incrementally, no member list scan needed
+        counters = self.services.member_stats.get(ctx.guild)
+        total_members = counters.total
+
+        # Show limited number of members (to avoid embed size limits)
+        display_limit = min(limit, 25)  # Discord embed field limit
+
+        render_cache = self.services.render_cache
+        key = ("members", ctx.guild.id, display_limit)
+
+        def send():
+            # The embed is rebuilt only after member, presence or name changes
+            cached = render_cache.get(
+                key,
+                counters.version,
+                lambda: self.render_members(ctx.guild, counters, display_limit),
+                guild_id=ctx.guild.id,
+            )
+            embed = cached.copy()
+            embed.description += f"\nRequested by {ctx.author.mention}"
+            return self.services.respond(ctx, embed=embed)
+
+        # Identical requests in one channel within the cooldown share a reply
+        render_cache.share(ctx.channel.id, key, send)
+        self.services.event_log.emit(
+            "command",
+            command="members",
+            user=ctx.author.name,
+            guild_id=ctx.guild.id,
+            total=total_members,
+            listed=display_limit,
+        )
+
+    @staticmethod
+    def render_members(guild, counters, display_limit: int) -> discord.Embed:
+        """The !members embed, without the requester"""
+        embed = discord.Embed(
+            title=f"Members in {guild.name}",
+            description=f"Total: {counters.total} members",
+            color=0x00FF00,
+        )
+
+        member_list = []
+
+        # Slice the member cache directly; guild.members would copy it whole
+        for member in itertools.islice(cached_members(guild), display_limit):
+            status_emoji = STATUS_EMOJIS.get(member.raw_status, "⚫")
+
+            bot_indicator = "🤖" if member.bot else "👤"
+
+            member_info = (
+                f"{status_emoji} {bot_indicator} {member.mention} ({member.name})"
+            )
+            member_list.append(member_info)
+
+        # Add members to embed
+        if member_list:
+            embed.add_field(
+                name=f"First {display_limit} Members:",
+                value="\n".join(member_list),
+                inline=False,
+            )
+
+        # Add statistics
+        embed.add_field(name="👤 Humans", value=str(counters.humans), inline=True)
+        embed.add_field(name="🤖 Bots", value=str(counters.bots), inline=True)
+        embed.add_field(name="🟢 Online", value=str(counters.online), inline=True)
+        return embed
+
+    @list_members.command(name="search")
+    async def search_members(self, ctx, *, query: MemberQuery):
+        """Find members by name prefix, bot flag, status and join date, a page at a time"""
+        if not ctx.guild:
+            self.services.respond(ctx, "❌ This command can only be used in a server")
+            return
+        try:
+            after = decode_cursor(query.cursor) if query.cursor else None
+        except ValueError:
+            self.services.respond(ctx, "❌ That page cursor is not valid")
+            return
+
+        members, cursor = self.services.member_index.search(
+            ctx.guild, query.name, query.where(), after, SEARCH_PAGE_SIZE
+        )
+        if not members:
+            self.services.respond(ctx, "🔎 No matching members")
+        else:
+            lines = [
+                f"{STATUS_EMOJIS.get(member.raw_status, '⚫')} "
+                f"{'🤖' if member.bot else '👤'} {member.mention} ({member.name})"
+                for member in members
+            ]
+            if cursor is not None:
+                lines.append(f"Next page: add `cursor:{cursor}`")
+            self.services.respond(
+                ctx,
+                "🔎 Members:\n" + "\n".join(lines),
+                allowed_mentions=discord.AllowedMentions.none(),
+            )
+        self.services.event_log.emit(
+            "command",
+            command="members_search",
+            user=ctx.author.name,
+            guild_id=ctx.guild.id,
+            results=len(members),
+        )
+
+    @list_members.command(name="export")
+    @commands.has_permissions(manage_guild=True)
+    async def export_members(self, ctx, *, query: MemberQuery):
+        """Upload matching members as a CSV or JSON-lines file"""
+        if not ctx.guild:
+            self.services.respond(ctx, "❌ This command can only be used in a server")
+            return
+        fmt = query.format.lower()
+        if fmt not in ("csv", "jsonl"):
+            self.services.respond(ctx, "❌ Export format must be csv or jsonl")
+            return
+
+        pages = self.services.member_index.pages(
+            ctx.guild, query.name, query.where(), size=EXPORT_CHUNK
+        )
+        with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES) as fp:
+            rows = await write_export(pages, fp, fmt, query.gzip)
+            size = fp.tell()
+            if size > ctx.guild.filesize_limit:
+                self.services.respond(
+                    ctx,
+                    f"❌ The export is {size / 2**20:.1f} MiB, over this server's "
+                    "upload limit; add filters or `gzip:yes`",
+                )
+            else:
+                fp.seek(0)
+                filename = f"members-{ctx.guild.id}.{fmt}" + (
+                    ".gz" if query.gzip else ""
+                )
+                # The file must stay open until the queued upload has been sent
+                await self.services.respond(
+                    ctx,
+                    f"📄 {rows} members",
+                    file=discord.File(fp, filename=filename),
+                )
+        self.services.event_log.emit(
+            "command",
+            command="members_export",
+            user=ctx.author.name,
+            guild_id=ctx.guild.id,
+            rows=rows,
+            bytes=size,
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(Members(bot))
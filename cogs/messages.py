@@ -0,0 +1,372 @@
+"""Message logging, questions threads, mention replies and auto-response rules."""
+
+import discord
+from discord.ext import commands
+
+from action_registry import RULE, THREAD
+from admission import CLASS_MESSAGE, DEBUG_LOG, REPLY_LOOKUP
+from dispatch import (
+    MESSAGE,
+    MESSAGE_DELETE,
+    RAW_MESSAGE_DELETE,
+    RAW_MESSAGE_EDIT,
+    channel_fields,
+    from_message,
+    from_raw_message,
+)
+from outbound import PRIORITY_THREAD
+from reply_cache import UNRESOLVED
+
+
+class Messages(commands.Cog):
+    """Turns message events into records and consumes them
+
+    Summaries for the reply cache are bookkeeping and run for every message.
+    Logging, threads and rule replies run only once the handler is admitted.
+    Prefix commands are run by bot.py's ``on_message``.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.services = bot.services
+
+        # Thread creation and rule replies are timed like the handlers
+        metrics = bot.services.metrics
+        self.handle_questions_channel = metrics.instrument(
+            self.handle_questions_channel
+        )
+        self.handle_bot_mention = metrics.instrument(self.handle_bot_mention)
+        self.run_rule = metrics.instrument(self.run_rule)
+
+        bookkeeping = bot.services.bookkeeping
+        dispatcher = bot.services.dispatcher
+        bookkeeping.consumer(MESSAGE)(self.remember_message)
+        dispatcher.consumer(MESSAGE)(self.route_message)
+        dispatcher.consumer(MESSAGE)(self.apply_rules)
+        dispatcher.consumer(MESSAGE_DELETE)(self.log_message_delete)
+        dispatcher.consumer(RAW_MESSAGE_DELETE)(self.log_raw_message_delete)
+        dispatcher.consumer(RAW_MESSAGE_EDIT)(self.log_raw_message_edit)
+
+    def cog_unload(self):
+        self.services.bookkeeping.remove(self.remember_message)
+        dispatcher = self.services.dispatcher
+        for consumer in (
+            self.route_message,
+            self.apply_rules,
+            self.log_message_delete,
+            self.log_raw_message_delete,
+            self.log_raw_message_edit,
+        ):
+            dispatcher.remove(consumer)
+        # Added by setup() in raw mode, outside the cog's own listeners
+        self.bot.remove_listener(self.on_raw_message_delete)
+        self.bot.remove_listener(self.on_raw_message_edit)
+
+    # Named apart from bot.py's command handler so each has its own metrics
+    @commands.Cog.listener("on_message")
+    async def dispatch_message(self, message: discord.Message):
+        """Event triggered when a message is sent in channels or threads"""
+        # Bot messages and unsupported channels produce no record
+        record = from_message(MESSAGE, message)
+        if record is not None:
+            await self.services.dispatch(record, CLASS_MESSAGE)
+
+    @commands.Cog.listener()
+    async def on_message_delete(self, message: discord.Message):
+        """Event triggered when a message is deleted"""
+        self.services.reply_cache.forget(message.id)
+
+        record = from_message(MESSAGE_DELETE, message)
+        if record is not None:
+            await self.services.dispatch(record, CLASS_MESSAGE)
+
+    async def on_raw_message_delete(self, payload):
+        """Raw-mode event triggered when any message is deleted"""
+        record = from_raw_message(
+            RAW_MESSAGE_DELETE, payload, self.bot.get_guild(payload.guild_id)
+        )
+        try:
+            if record is not None:
+                await self.services.dispatch(record, CLASS_MESSAGE)
+        finally:
+            # Forgotten last: the delete log reads the summary, shed or not
+            self.services.reply_cache.forget(payload.message_id)
+
+    async def on_raw_message_edit(self, payload):
+        """Raw-mode event triggered when any message is edited"""
+        record = from_raw_message(
+            RAW_MESSAGE_EDIT, payload, self.bot.get_guild(payload.guild_id)
+        )
+        if record is None:
+            return
+        try:
+            await self.services.dispatch(record, CLASS_MESSAGE)
+        finally:
+            # Remembered last: the edit log reads the previous content first
+            self.services.reply_cache.remember(payload.message)
+
+    @commands.Cog.listener()
+    async def on_mention(self):
+        """Handle bot mentions - this will be triggered from on_message"""
+        pass
+
+    async def remember_message(self, record):
+        """Keep a summary of every message for reply and raw-event lookups"""
+        self.services.reply_cache.remember(record.source)
+
+    async def route_message(self, record):
+        """Create threads for questions and bot mentions, then log the message"""
+        services = self.services
+        bot = self.bot
+        message = record.source
+        fields = {
+            "message_id": record.message_id,
+            "content": message.content,
+            "author": record.user.name,
+            "author_id": record.user_id,
+            "guild_id": record.guild_id,
+            **channel_fields(record),
+        }
+
+        # Check if message is in "questions" channel
+        if services.channel_index.is_questions(record.channel):
+            fields["questions"] = True
+            # Handle questions channel message (create thread)
+            services.actions.once(
+                message.id,
+                THREAD,
+                lambda: services.outbound.submit(
+                    ("channel", record.channel_id),
+                    lambda: self.handle_questions_channel(message),
+                    PRIORITY_THREAD,
+                ),
+            )
+
+        # Check if the bot is mentioned in the message
+        if bot.user in message.mentions:
+            fields["mention"] = True
+
+            # You can also check for specific mention patterns
+            if message.content.startswith(
+                f"<@{bot.user.id}>"
+            ) or message.content.startswith(f"<@!{bot.user.id}>"):
+                fields["mention_at_start"] = True
+
+            # Handle the mention (respond to it); a question already got its thread
+            services.actions.once(
+                message.id,
+                THREAD,
+                lambda: services.outbound.submit(
+                    ("channel", record.channel_id),
+                    lambda: self.handle_bot_mention(message),
+                    PRIORITY_THREAD,
+                ),
+            )
+
+        # Check if this message is a reply to another message
+        if message.reference:
+            fields["reply_to"] = message.reference.message_id
+
+            # Get the original message being replied to; under load only from caches
+            reply_cache = services.reply_cache
+            try:
+                if services.admission.allow(REPLY_LOOKUP):
+                    original_message = await reply_cache.resolve(message)
+                else:
+                    original_message = reply_cache.resolve_local(message)
+                if original_message is UNRESOLVED:
+                    fields["reply_error"] = "shed"
+                elif original_message is None:
+                    fields["reply_error"] = "deleted"
+                else:
+                    fields["reply_content"] = original_message.content
+                    fields["reply_author"] = original_message.author_name
+            except discord.NotFound:
+                fields["reply_error"] = "not_found"
+            except discord.Forbidden:
+                fields["reply_error"] = "forbidden"
+
+        services.event_log.emit(MESSAGE, **fields)
+
+    async def apply_rules(self, record):
+        """Send the replies and reactions of every auto-response rule the message hits"""
+        services = self.services
+        message = record.source
+        # Threads follow their parent channel's rules
+        channel = record.channel
+        channel_id = (
+            channel.parent_id if isinstance(channel, discord.Thread) else channel.id
+        )
+        for rule in services.rules.match(record.guild_id, channel_id, message.content):
+            if services.admission.allow(DEBUG_LOG):
+                services.event_log.emit(
+                    "rule_matched",
+                    rule=rule.id,
+                    message_id=record.message_id,
+                    guild_id=record.guild_id,
+                    channel_id=record.channel_id,
+                )
+            services.actions.once(
+                message.id,
+                f"{RULE}:{rule.id}",
+                lambda rule=rule: services.outbound.submit(
+                    ("channel", record.channel_id),
+                    lambda: self.run_rule(rule, message),
+                    PRIORITY_THREAD,
+                ),
+            )
+
+    async def run_rule(self, rule, message: discord.Message):
+        """Reply and/or react to a message that triggered ``rule``"""
+        if rule.react:
+            await message.add_reaction(rule.react)
+        if rule.replies:
+            await message.reply(
+                rule.render_reply(message.guild, message.author),
+                mention_author=False,
+            )
+
+    async def log_message_delete(self, record):
+        """Log a deleted message"""
+        message = record.source
+        self.services.event_log.emit(
+            MESSAGE_DELETE,
+            message_id=record.message_id,
+            content=message.content,
+            author=record.user.name,
+            author_id=record.user_id,
+            guild_id=record.guild_id,
+            **channel_fields(record),
+        )
+
+    async def log_raw_message_delete(self, record):
+        """Log a deleted message using its stored summary, if any"""
+        fields = {
+            "message_id": record.message_id,
+            "guild_id": record.guild_id,
+            **channel_fields(record),
+        }
+
+        message = await self.services.reply_cache.lookup(record.message_id)
+        if message is not None:
+            fields["content"] = message.content
+            fields["author"] = message.author_name
+            fields["author_id"] = message.author_id
+
+        self.services.event_log.emit(MESSAGE_DELETE, **fields)
+
+    async def log_raw_message_edit(self, record):
+        """Log an edited message with its previous content, if stored"""
+        message = record.source.message
+        fields = {
+            "message_id": record.message_id,
+            "content": message.content,
+            "author": record.user.name,
+            "author_id": record.user_id,
+            "guild_id": record.guild_id,
+            **channel_fields(record),
+        }
+
+        previous = await self.services.reply_cache.lookup(record.message_id)
+        if previous is not None:
+            fields["previous_content"] = previous.content
+
+        self.services.event_log.emit("message_edit", **fields)
+
+    async def handle_questions_channel(self, message: discord.Message):
+        """Handle messages in the questions channel by creating a thread"""
+        templates = self.services.templates
+        event_log = self.services.event_log
+        author = message.author
+        thread_title = templates.render("questions_title", message.guild, author)
+
+        try:
+            # Create a new thread from the message
+            thread = await message.create_thread(name=thread_title)
+
+            # Send the response in the new thread
+            await thread.send(
+                templates.render("questions_reply", message.guild, author)
+            )
+
+            event_log.emit(
+                "thread_created",
+                source="questions",
+                title=thread_title,
+                author=author.name,
+                message_id=message.id,
+            )
+
+        except discord.Forbidden:
+            # If we can't create a thread, fall back to regular reply
+            event_log.emit(
+                "thread_failed",
+                source="questions",
+                message_id=message.id,
+                error="forbidden",
+            )
+            await message.reply(
+                templates.render("questions_forbidden", message.guild, author)
+            )
+        except Exception as e:
+            event_log.emit(
+                "thread_failed",
+                source="questions",
+                message_id=message.id,
+                error=repr(e),
+            )
+            # Fallback to regular reply
+            await message.reply(
+                templates.render("questions_error", message.guild, author)
+            )
+
+    async def handle_bot_mention(self, message: discord.Message):
+        """Handle when the bot is mentioned"""
+        templates = self.services.templates
+        event_log = self.services.event_log
+        author = message.author
+        thread_title = templates.render("mention_title", message.guild, author)
+
+        try:
+            # Create a new thread from the message
+            thread = await message.create_thread(name=thread_title)
+
+            # Send the response in the new thread
+            await thread.send(templates.render("mention_reply", message.guild, author))
+
+            event_log.emit(
+                "thread_created",
+                source="mention",
+                title=thread_title,
+                author=author.name,
+                message_id=message.id,
+            )
+
+        except discord.Forbidden:
+            # If we can't create a thread, fall back to regular reply
+            event_log.emit(
+                "thread_failed",
+                source="mention",
+                message_id=message.id,
+                error="forbidden",
+            )
+            await message.reply(
+                templates.render("mention_forbidden", message.guild, author)
+            )
+        except Exception as e:
+            event_log.emit(
+                "thread_failed", source="mention", message_id=message.id, error=repr(e)
+            )
+            # Fallback to regular reply
+            await message.reply(
+                templates.render("mention_error", message.guild, author)
+            )
+
+
+async def setup(bot):
+    cog = Messages(bot)
+    await bot.add_cog(cog)
+    # Raw mode drops the message cache; deletes and edits come from raw payloads
+    if bot.services.raw_mode:
+        bot.add_listener(cog.on_raw_message_delete)
+        bot.add_listener(cog.on_raw_message_edit)
@@ -0,0 +1,114 @@
+"""Moderator commands: deleted-message and history lookups, template and rule reloads."""
+
+import asyncio
+import os
+
+import discord
+from discord.ext import commands
+
+
+class Moderation(commands.Cog):
+    """!deleted, !history, !reloadtemplates and !reloadrules"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.services = bot.services
+
+    @commands.command(name="reloadtemplates")
+    @commands.has_permissions(manage_guild=True)
+    async def reload_templates(self, ctx):
+        """Re-read the template file without restarting"""
+        templates = self.services.templates
+        if templates.reload():
+            self.services.respond(
+                ctx, f"✅ Templates reloaded from {os.path.basename(templates.path)}"
+            )
+        else:
+            self.services.respond(
+                ctx, "❌ Template file is invalid, keeping the current templates"
+            )
+        self.services.event_log.emit(
+            "command", command="reloadtemplates", user=ctx.author.name
+        )
+
+    @commands.command(name="reloadrules")
+    @commands.has_permissions(manage_guild=True)
+    async def reload_rules(self, ctx):
+        """Re-read the auto-response rules without restarting"""
+        rules = self.services.rules
+        if rules.reload():
+            self.services.respond(
+                ctx,
+                f"✅ {len(rules.rules)} rules reloaded from {os.path.basename(rules.path)}",
+            )
+        else:
+            self.services.respond(
+                ctx, "❌ Rules file is invalid, keeping the current rules"
+            )
+        self.services.event_log.emit(
+            "command", command="reloadrules", user=ctx.author.name
+        )
+
+    @commands.command(name="deleted")
+    @commands.has_permissions(manage_messages=True)
+    async def deleted_messages(self, ctx, limit: int = 5):
+        """Show recently deleted messages in this channel with their stored text"""
+        event_store = self.services.event_store
+        if event_store is None:
+            self.services.respond(
+                ctx, "❌ The event store is disabled (set EVENT_STORE_PATH)"
+            )
+            return
+
+        # SQLite reads block, so they run off the event loop
+        rows = await asyncio.to_thread(
+            event_store.deleted, ctx.channel.id, min(limit, 20)
+        )
+        if not rows:
+            self.services.respond(
+                ctx, "🗑️ No deleted messages recorded in this channel"
+            )
+        else:
+            lines = [
+                f"<t:{int(deleted_at)}:R> {f'<@{author_id}>' if author_id else 'unknown'}: "
+                f"{(content or '*not recorded*')[:150]}"
+                for deleted_at, message_id, author_id, content in rows
+            ]
+            self.services.respond(
+                ctx,
+                "🗑️ Recently deleted:\n" + "\n".join(lines),
+                allowed_mentions=discord.AllowedMentions.none(),
+            )
+        self.services.event_log.emit("command", command="deleted", user=ctx.author.name)
+
+    @commands.command(name="history")
+    @commands.has_permissions(manage_messages=True)
+    async def message_history(self, ctx, message_id: int):
+        """Show every stored event for one message id"""
+        event_store = self.services.event_store
+        if event_store is None:
+            self.services.respond(
+                ctx, "❌ The event store is disabled (set EVENT_STORE_PATH)"
+            )
+            return
+
+        rows = await asyncio.to_thread(event_store.history, message_id)
+        if not rows:
+            self.services.respond(ctx, f"📜 Nothing recorded for message {message_id}")
+        else:
+            lines = [
+                f"<t:{int(ts)}:f> {kind} by <@{user_id}>"
+                + (f": {content[:150]}" if content else "")
+                + (f" {data}" if data else "")
+                for ts, kind, user_id, content, data in rows[:20]
+            ]
+            self.services.respond(
+                ctx,
+                f"📜 Message {message_id}:\n" + "\n".join(lines),
+                allowed_mentions=discord.AllowedMentions.none(),
+            )
+        self.services.event_log.emit("command", command="history", user=ctx.author.name)
+
+
+async def setup(bot):
+    await bot.add_cog(Moderation(bot))
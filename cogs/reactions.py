@@ -0,0 +1,86 @@
+"""Reaction rollups: counted per message and emoji, logged once per window."""
+
+from discord.ext import commands
+
+from admission import CLASS_REACTION, REACTION_LOOKUP
+from dispatch import RAW_REACTION_ADD, RAW_REACTION_REMOVE, from_raw_reaction
+from reactions import ReactionAggregator
+
+
+class Reactions(commands.Cog):
+    """Counts reactions from the raw gateway events
+
+    Reactions are counted from the raw events only: they fire for cached and
+    uncached messages alike, so counting the cached events too would double
+    them. Counting is bookkeeping and is never shed.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.services = bot.services
+
+        metrics = bot.services.metrics
+        self.resolve_reacted = metrics.instrument(self.resolve_reacted)
+        self.reactions = ReactionAggregator.from_env(
+            self.resolve_reacted, event_log=bot.services.event_log
+        )
+        metrics.add_source("reactions", self.reactions.stats)
+
+        bot.services.bookkeeping.consumer(RAW_REACTION_ADD, RAW_REACTION_REMOVE)(
+            self.count_raw_reaction
+        )
+
+    async def cog_unload(self):
+        self.services.bookkeeping.remove(self.count_raw_reaction)
+        # Log what was counted so far rather than losing it with the cog
+        await self.reactions.flush()
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload):
+        """Event triggered when a reaction is added (works even if message isn't cached)"""
+        # Don't log bot reactions
+        if payload.user_id == self.bot.user.id:
+            return
+
+        record = from_raw_reaction(
+            RAW_REACTION_ADD, payload, self.bot.get_guild(payload.guild_id)
+        )
+        if record is not None:
+            await self.services.dispatch(record, CLASS_REACTION)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload):
+        """Event triggered when a reaction is removed (works even if message isn't cached)"""
+        # Don't log bot reaction removals
+        if payload.user_id == self.bot.user.id:
+            return
+
+        record = from_raw_reaction(
+            RAW_REACTION_REMOVE, payload, self.bot.get_guild(payload.guild_id)
+        )
+        if record is not None:
+            await self.services.dispatch(record, CLASS_REACTION)
+
+    async def resolve_reacted(self, channel, message_id: int):
+        """Summary of a reacted-to message; outside raw mode fall back to REST"""
+        reply_cache = self.services.reply_cache
+        summary = await reply_cache.lookup(message_id)
+        if (
+            summary is None
+            and not self.services.raw_mode
+            and self.services.admission.allow(REACTION_LOOKUP)
+        ):
+            summary = await reply_cache.fetch(channel, message_id)
+        return summary
+
+    async def count_raw_reaction(self, record):
+        """Count a reaction on a message that may not be in discord.py's cache"""
+        self.reactions.add(
+            record,
+            str(record.source.emoji),
+            removed=record.kind == RAW_REACTION_REMOVE,
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(Reactions(bot))
@@ -0,0 +1,111 @@
+"""Latency, cache, handler and startup status commands."""
+
+from discord.ext import commands
+
+
+class Status(commands.Cog):
+    """!ping, !cachestats, !stats and !startup"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.services = bot.services
+
+    # Simple command for testing
+    @commands.command(name="ping")
+    async def ping(self, ctx):
+        """Simple ping command"""
+        bot = self.bot
+        current = ctx.guild.shard_id if ctx.guild else 0
+
+        render_cache = self.services.render_cache
+        key = ("ping", current)
+
+        def send():
+            # Latencies change once per heartbeat; rebuild the text only then
+            latencies = tuple(bot.latencies) if self.services.sharded else bot.latency
+            content = render_cache.get(
+                key, latencies, lambda: self.render_ping(current)
+            )
+            return self.services.respond(ctx, content)
+
+        # Identical requests in one channel within the cooldown share a reply
+        render_cache.share(ctx.channel.id, key, send)
+        self.services.event_log.emit("command", command="ping", user=ctx.author.name)
+
+    def render_ping(self, current: int) -> str:
+        """!ping text, with a line per shard when sharded"""
+        bot = self.bot
+        content = f"Pong! Latency: {round(bot.latency * 1000)}ms"
+
+        # With sharding, show every shard this process runs
+        if self.services.sharded:
+            content += "".join(
+                f"\n{'➡️' if shard_id == current else '▫️'} Shard {shard_id}: "
+                f"{round(latency * 1000)}ms"
+                for shard_id, latency in bot.latencies
+            )
+        return content
+
+    @commands.command(name="cachestats")
+    async def cache_stats(self, ctx):
+        """Show reply-target and render cache hit/miss counters"""
+        stats = self.services.reply_cache.stats()
+        render_stats = self.services.render_cache.stats()
+        self.services.respond(
+            ctx,
+            "📦 Reply cache: "
+            + ", ".join(f"{key}={value}" for key, value in stats.items())
+            + "\n🖼️ Render cache: "
+            + ", ".join(f"{key}={value}" for key, value in render_stats.items()),
+        )
+        self.services.event_log.emit(
+            "command", command="cachestats", user=ctx.author.name
+        )
+
+    @commands.command(name="stats")
+    async def handler_stats(self, ctx, limit: int = 10):
+        """Show call counts, latency, errors and REST calls of the busiest handlers"""
+        metrics = self.services.metrics
+        handlers = sorted(
+            metrics.handlers.values(), key=lambda m: m.calls, reverse=True
+        )
+        rows = [
+            f"{m.name[:24]:<24} {m.calls:>7} {m.latency.quantile(0.5) * 1000:>7g} "
+            f"{m.latency.quantile(0.99) * 1000:>7g} {sum(m.errors.values()):>5} "
+            f"{m.in_flight:>4} {m.rest_calls:>6}"
+            for m in handlers[: min(limit, 20)]
+            if m.calls
+        ]
+        header = f"{'handler':<24} {'calls':>7} {'p50 ms':>7} {'p99 ms':>7} {'errs':>5} {'busy':>4} {'rest':>6}"
+        self.services.respond(
+            ctx,
+            "📊 Handler stats\n```\n"
+            + "\n".join([header, *rows])
+            + f"\n```\n🔁 Duplicate actions suppressed: {self.services.actions.suppressed}",
+        )
+        self.services.event_log.emit("command", command="stats", user=ctx.author.name)
+
+    @commands.command(name="startup")
+    async def startup_report(self, ctx):
+        """Show import, READY and warmup times and how long each plugin took"""
+        marks = self.services.startup.marks
+        lines = [
+            f"{name:<10} {seconds * 1000:>9.1f} ms" for name, seconds in marks.items()
+        ]
+        for name, stage in self.services.warmup.report.items():
+            lines.append(
+                f"  {name:<18} {stage['seconds'] * 1000:>7.1f} ms "
+                f"{stage['done']}/{stage['total']}"
+                + (" (budget hit)" if stage["truncated"] else "")
+            )
+        plugins = self.services.plugins
+        for name, seconds in plugins.load_times.items():
+            lines.append(f"  {name:<18} {seconds * 1000:>7.1f} ms loaded")
+        for name in plugins.failed:
+            lines.append(f"  {name:<18} failed to load")
+        self.services.respond(ctx, "⏱️ Startup\n```\n" + "\n".join(lines) + "\n```")
+        self.services.event_log.emit("command", command="startup", user=ctx.author.name)
+
+
+async def setup(bot):
+    await bot.add_cog(Status(bot))
@@ -0,0 +1,84 @@
+"""Guild, channel and member bookkeeping: the channel index and member counters."""
+
+from discord.ext import commands
+
+
+class Tracking(commands.Cog):
+    """Keeps the channel index, member counters and member index current
+
+    These listeners take no admission slot: counts and lookups must stay
+    correct even when the bot sheds work.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.services = bot.services
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        """Event triggered when the bot joins a new server"""
+        services = self.services
+        services.channel_index.build(guild)
+        services.member_stats.seed(guild)
+        services.event_log.emit("guild_join", guild_id=guild.id, guild=guild.name)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        """Event triggered when the bot leaves a server"""
+        services = self.services
+        services.channel_index.remove(guild.id)
+        services.member_stats.drop(guild.id)
+        services.member_index.drop(guild.id)
+        services.render_cache.drop(guild.id)
+        services.event_log.emit("guild_remove", guild_id=guild.id, guild=guild.name)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        """Event triggered when a channel is created"""
+        self.services.channel_index.build(channel.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        """Event triggered when a channel is deleted"""
+        self.services.channel_index.build(channel.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        """Event triggered when a channel is renamed, moved or otherwise edited"""
+        if before.name != after.name or before.position != after.position:
+            self.services.channel_index.build(after.guild)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        """Event triggered when a new member joins the server"""
+        self.services.member_stats.member_joined(member)
+        self.services.member_index.member_joined(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        """Event triggered when a member leaves the server"""
+        self.services.member_stats.member_left(member)
+        self.services.member_index.member_left(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        """Event triggered when a member's nickname, roles or similar change"""
+        self.services.member_index.member_updated(after)
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before, after):
+        """Event triggered when a user's username or global name changes"""
+        for guild in after.mutual_guilds:
+            member = guild.get_member(after.id)
+            if member is not None:
+                self.services.member_index.member_updated(member)
+                self.services.member_stats.member_updated(member)
+
+    @commands.Cog.listener()
+    async def on_presence_update(self, before, after):
+        """Event triggered when a member's status changes (needs the presences intent)"""
+        self.services.member_stats.presence_changed(before, after)
+
+
+async def setup(bot):
+    await bot.add_cog(Tracking(bot))
@@ -0,0 +1,108 @@
+"""Welcome and goodbye messages, batched per channel."""
+
+from discord.ext import commands
+
+from admission import CLASS_MEMBER, DEBUG_LOG
+from greeter import GOODBYE, WELCOME, GreetingDispatcher
+
+
+class Welcome(commands.Cog):
+    """Greets members who join and announces members who leave
+
+    Member counters and the index are updated by the tracking cog whether or
+    not these listeners are admitted; only the log line and greeting are shed.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.services = bot.services
+
+        # Welcome/goodbye messages are collected per channel for a short window
+        self.greeter = GreetingDispatcher.from_env(
+            self.render_greeting,
+            event_log=bot.services.event_log,
+            scheduler=bot.services.outbound,
+        )
+        bot.services.metrics.add_source("greeter", self.greeter.stats)
+
+    async def cog_unload(self):
+        # Greetings still waiting for their window go out now
+        await self.greeter.flush()
+
+    @commands.Cog.listener("on_member_join")
+    async def greet_member(self, member):
+        """Log a join and greet the member in the welcome channel"""
+        admission = self.services.admission
+        if not await admission.acquire(CLASS_MEMBER):
+            return
+        try:
+            self.services.event_log.emit(
+                "member_join",
+                member=member.name,
+                member_id=member.id,
+                guild_id=member.guild.id,
+                created_at=member.created_at,
+                member_count=member.guild.member_count,
+            )
+
+            # Find the welcome channel (first configured name that exists)
+            welcome_channel = self.services.channel_index.welcome_channel(member.guild)
+
+            if welcome_channel:
+                # Greetings are batched so join floods don't hit the channel rate limit
+                self.greeter.submit(WELCOME, welcome_channel, member)
+            elif admission.allow(DEBUG_LOG):
+                self.services.event_log.emit(
+                    "welcome_no_channel", guild_id=member.guild.id
+                )
+        finally:
+            admission.release(CLASS_MEMBER)
+
+    @commands.Cog.listener("on_member_remove")
+    async def bid_farewell(self, member):
+        """Log a leave and announce it in the goodbye channel"""
+        admission = self.services.admission
+        if not await admission.acquire(CLASS_MEMBER):
+            return
+        try:
+            self.services.event_log.emit(
+                "member_remove",
+                member=member.name,
+                member_id=member.id,
+                guild_id=member.guild.id,
+                member_count=member.guild.member_count,
+            )
+
+            # Find the goodbye channel (first configured name that exists)
+            goodbye_channel = self.services.channel_index.goodbye_channel(member.guild)
+
+            if goodbye_channel:
+                self.greeter.submit(GOODBYE, goodbye_channel, member)
+            elif admission.allow(DEBUG_LOG):
+                self.services.event_log.emit(
+                    "goodbye_no_channel", guild_id=member.guild.id
+                )
+        finally:
+            admission.release(CLASS_MEMBER)
+
+    def render_greeting(self, kind: str, members: list, overflow: int) -> str:
+        """Build the welcome/goodbye text for a batch of members"""
+        templates = self.services.templates
+        member = members[0]
+
+        if len(members) == 1 and not overflow:
+            return templates.render(kind, member.guild, member)
+
+        # Several members in one window: one combined message
+        if kind == WELCOME:
+            names = ", ".join(m.mention for m in members)
+        else:
+            names = ", ".join(m.name for m in members)
+        more = f" and {overflow} more" if overflow else ""
+        return templates.render(
+            kind + "_batch", member.guild, member, names=names, more=more
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(Welcome(bot))
@@ -0,0 +1,226 @@
+"""Event normalisation and fan-out.
+
+Each gateway event is turned into one compact ``EventRecord`` with the ids the
+bot's features need. Cheap rejects (bot authors, DMs, unsupported channel
+kinds) happen here before any string formatting, then the record is handed
+to every consumer registered for its event kind.
+"""
+
+from collections import defaultdict
+
+import discord
+
+# Event kinds
+MESSAGE = "message"
+MESSAGE_DELETE = "message_delete"
+REACTION_ADD = "reaction_add"
+REACTION_REMOVE = "reaction_remove"
+RAW_REACTION_ADD = "raw_reaction_add"
+RAW_REACTION_REMOVE = "raw_reaction_remove"
+RAW_MESSAGE_DELETE = "raw_message_delete"
+RAW_MESSAGE_EDIT = "raw_message_edit"
+
+# Channel kinds
+TEXT = "text"
+THREAD = "thread"
+FORUM = "forum"
+
+# Exact-type lookup is a single dict probe; none of these classes are subclassed
+CHANNEL_KINDS = {
+    discord.TextChannel: TEXT,
+    discord.Thread: THREAD,
+    discord.ForumChannel: FORUM,
+}
+
+
+class EventRecord:
+    """Normalised view of one gateway event"""
+
+    __slots__ = (
+        "kind",
+        "guild_id",
+        "channel_id",
+        "channel_kind",
+        "user_id",
+        "user",
+        "message_id",
+        "channel",
+        "source",
+    )
+
+    def __init__(
+        self,
+        kind,
+        guild_id,
+        channel_id,
+        channel_kind,
+        user_id,
+        user,
+        message_id,
+        channel,
+        source,
+    ):
+        self.kind = kind
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.channel_kind = channel_kind
+        self.user_id = user_id
+        # Author or reacting user; None when the payload doesn't carry one
+        self.user = user
+        self.message_id = message_id
+        self.channel = channel
+        # The discord.py object the record came from (message, reaction or payload)
+        self.source = source
+
+    def __repr__(self):
+        return (
+            f"<EventRecord {self.kind} guild={self.guild_id} "
+            f"channel={self.channel_id} ({self.channel_kind}) user={self.user_id}>"
+        )
+
+
+def from_message(kind: str, message):
+    """Record for a message event, or None if it should be ignored"""
+    author = message.author
+    if author.bot:
+        return None
+    channel = message.channel
+    channel_kind = CHANNEL_KINDS.get(type(channel))
+    if channel_kind is None:
+        return None
+    return EventRecord(
+        kind,
+        message.guild.id,
+        channel.id,
+        channel_kind,
+        author.id,
+        author,
+        message.id,
+        channel,
+        message,
+    )
+
+
+def from_reaction(kind: str, reaction, user):
+    """Record for a cached reaction event, or None if it should be ignored"""
+    if user.bot:
+        return None
+    message = reaction.message
+    channel = message.channel
+    channel_kind = CHANNEL_KINDS.get(type(channel))
+    if channel_kind is None:
+        return None
+    return EventRecord(
+        kind,
+        message.guild.id,
+        channel.id,
+        channel_kind,
+        user.id,
+        user,
+        message.id,
+        channel,
+        reaction,
+    )
+
+
+def from_raw_reaction(kind: str, payload, guild):
+    """Record for a raw reaction payload, or None if it should be ignored
+
+    ``guild`` is the cached guild for ``payload.guild_id`` (None for DMs).
+    """
+    if guild is None:
+        return None
+    # Only reaction adds carry the member
+    member = payload.member
+    if member is not None and member.bot:
+        return None
+    channel = guild.get_channel_or_thread(payload.channel_id)
+    channel_kind = CHANNEL_KINDS.get(type(channel))
+    if channel_kind is None:
+        return None
+    return EventRecord(
+        kind,
+        guild.id,
+        channel.id,
+        channel_kind,
+        payload.user_id,
+        member,
+        payload.message_id,
+        channel,
+        payload,
+    )
+
+
+def from_raw_message(kind: str, payload, guild):
+    """Record for a raw message delete/edit payload, or None if it should be ignored"""
+    if guild is None:
+        return None
+    # Only edits carry the (updated) message, and with it the author
+    message = getattr(payload, "message", None)
+    author = message.author if message is not None else None
+    if author is not None and author.bot:
+        return None
+    channel = guild.get_channel_or_thread(payload.channel_id)
+    channel_kind = CHANNEL_KINDS.get(type(channel))
+    if channel_kind is None:
+        return None
+    return EventRecord(
+        kind,
+        guild.id,
+        channel.id,
+        channel_kind,
+        author.id if author is not None else None,
+        author,
+        payload.message_id,
+        channel,
+        payload,
+    )
+
+
+def channel_fields(record: EventRecord) -> dict:
+    """Log fields naming the record's channel (thread/forum/channel)"""
+    channel = record.channel
+    if record.channel_kind == THREAD:
+        fields = {"thread": channel.name}
+        parent = channel.parent
+        if hasattr(parent, "name"):
+            fields["channel"] = parent.name
+        return fields
+    if record.channel_kind == FORUM:
+        return {"forum": channel.name}
+    return {"channel": channel.name}
+
+
+class EventDispatcher:
+    """Fans normalised records out to the consumers registered for their kind"""
+
+    def __init__(self):
+        self._consumers = defaultdict(list)
+
+    def consumer(self, *kinds: str):
+        """Decorator registering an async ``consumer(record)`` for event kinds"""
+
+        def decorator(func):
+            for kind in kinds:
+                self._consumers[kind].append(func)
+            return func
+
+        return decorator
+
+    def remove(self, func):
+        """Unregister ``func`` from every kind, e.g. when its cog unloads"""
+        for kind, consumers in list(self._consumers.items()):
+            if func in consumers:
+                consumers.remove(func)
+                # ``handles`` is only true while a consumer is left
+                if not consumers:
+                    del self._consumers[kind]
+
+    def handles(self, kind: str) -> bool:
+        """Whether any consumer is registered for ``kind``"""
+        return kind in self._consumers
+
+    async def dispatch(self, record: EventRecord):
+        """Run the record's consumers in registration order"""
+        for consumer in self._consumers.get(record.kind, ()):
+            await consumer(record)
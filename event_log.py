@@ -0,0 +1,95 @@
+"""Non-blocking, batched JSON-lines event log.
+
+Handlers call ``EventLog.emit`` which only appends a small tuple to an
+in-memory buffer. A background thread serialises the buffered records and
+writes them to the output stream in batches, so a slow stdout pipe or log
+driver never stalls the event loop.
+"""
+
+import json
+import os
+import sys
+import time
+
+from batch_writer import DROP_OLDEST, BatchWriter
+
+
+class EventLog:
+    """Queue-backed structured log sink flushed by a background thread"""
+
+    def __init__(
+        self,
+        stream=None,
+        max_buffer: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        policy: str = DROP_OLDEST,
+    ):
+        self.stream = stream if stream is not None else sys.stdout
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+
+        self.emitted = 0
+
+        self._writer = BatchWriter(
+            self._write,
+            "event-log-writer",
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            max_queue=max_buffer,
+            policy=policy,
+        )
+
+    @classmethod
+    def from_env(cls, stream=None):
+        """Build an event log configured from EVENT_LOG_* environment variables"""
+        return cls(
+            stream=stream,
+            max_buffer=int(os.getenv("EVENT_LOG_MAX_BUFFER", "10000")),
+            batch_size=int(os.getenv("EVENT_LOG_BATCH_SIZE", "256")),
+            flush_interval=float(os.getenv("EVENT_LOG_FLUSH_INTERVAL", "0.5")),
+            policy=os.getenv("EVENT_LOG_POLICY", DROP_OLDEST),
+        )
+
+    @property
+    def written(self) -> int:
+        return self._writer.written
+
+    @property
+    def dropped(self) -> int:
+        return self._writer.dropped
+
+    def emit(self, event: str, **fields):
+        """Queue a record; never blocks on I/O"""
+        if self._writer.put((time.time(), event, fields)):
+            self.emitted += 1
+
+    def start(self):
+        """Start the background writer thread"""
+        self._writer.start()
+
+    def close(self, timeout: float = 5.0):
+        """Stop the writer thread after flushing everything still buffered"""
+        if self._writer.running:
+            self._writer.close(timeout)
+        else:
+            self._writer.drain()
+
+    def stats(self) -> dict:
+        """Counters describing the sink's throughput and losses"""
+        return {
+            "emitted": self.emitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "buffered": len(self._writer),
+        }
+
+    def _write(self, _, batch):
+        lines = []
+        for ts, event, fields in batch:
+            record = {"ts": round(ts, 3), "event": event, **fields}
+            lines.append(json.dumps(record, default=str, ensure_ascii=False))
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
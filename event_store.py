@@ -0,0 +1,228 @@
+"""Append-only SQLite store of observed events.
+
+Handlers call ``EventStore.record`` which only appends a tuple to an in-memory
+queue. A background thread owns the SQLite connection (WAL mode) and inserts
+queued rows in one transaction per batch, so handlers never wait on disk. The
+same thread deletes rows older than the retention period once per compaction
+interval and returns the freed pages to the filesystem.
+
+Queries open their own short-lived read connection; WAL lets them run while
+the writer is inserting.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+from batch_writer import BatchWriter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    guild_id INTEGER,
+    channel_id INTEGER,
+    user_id INTEGER,
+    message_id INTEGER,
+    content TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS events_guild ON events (guild_id, ts);
+CREATE INDEX IF NOT EXISTS events_channel ON events (channel_id, ts);
+CREATE INDEX IF NOT EXISTS events_user ON events (user_id, ts);
+CREATE INDEX IF NOT EXISTS events_message ON events (message_id);
+"""
+
+INSERT = (
+    "INSERT INTO events (ts, kind, guild_id, channel_id, user_id, message_id,"
+    " content, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Rows deleted per statement during compaction, so the writer never holds
+# the database for long
+DELETE_CHUNK = 10000
+
+
+class EventStore:
+    """Queue-backed SQLite event sink flushed by a background thread"""
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue: int = 100000,
+        retention_days: float = 30.0,
+        compaction_interval: float = 3600.0,
+        event_log=None,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.retention = retention_days * 86400
+        self.compaction_interval = compaction_interval
+        self.event_log = event_log
+
+        self.recorded = 0
+        self.expired = 0
+
+        self._writer = BatchWriter(
+            self._write,
+            "event-store-writer",
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            max_queue=max_queue,
+            connect=self._connect,
+            disconnect=lambda connection: connection.close(),
+            maintain=self._compact,
+            maintain_interval=compaction_interval,
+            on_error=self._write_failed,
+        )
+
+    @classmethod
+    def from_env(cls, event_log=None):
+        """Build a store configured from EVENT_STORE_* environment variables"""
+        return cls(
+            os.getenv("EVENT_STORE_PATH", "events.db"),
+            batch_size=int(os.getenv("EVENT_STORE_BATCH_SIZE", "500")),
+            flush_interval=float(os.getenv("EVENT_STORE_FLUSH_INTERVAL", "1.0")),
+            max_queue=int(os.getenv("EVENT_STORE_MAX_QUEUE", "100000")),
+            retention_days=float(os.getenv("EVENT_STORE_RETENTION_DAYS", "30")),
+            event_log=event_log,
+        )
+
+    @property
+    def written(self) -> int:
+        return self._writer.written
+
+    @property
+    def dropped(self) -> int:
+        return self._writer.dropped
+
+    @property
+    def batches(self) -> int:
+        return self._writer.batches
+
+    def record(
+        self,
+        kind: str,
+        guild_id: int = None,
+        channel_id: int = None,
+        user_id: int = None,
+        message_id: int = None,
+        content: str = None,
+        **data,
+    ):
+        """Queue one event; never blocks on disk"""
+        row = (
+            time.time(),
+            kind,
+            guild_id,
+            channel_id,
+            user_id,
+            message_id,
+            content,
+            json.dumps(data, default=str, ensure_ascii=False) if data else None,
+        )
+        # Newest rows are dropped; the backlog is already on its way to disk
+        if self._writer.put(row):
+            self.recorded += 1
+
+    def start(self):
+        """Start the background writer thread (which creates the schema)"""
+        self._writer.start()
+
+    def close(self, timeout: float = 10.0):
+        """Stop the writer thread after writing everything still queued"""
+        self._writer.close(timeout)
+
+    def stats(self) -> dict:
+        """Counters describing the store's throughput and losses"""
+        return {
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "queued": len(self._writer),
+            "batches": self.batches,
+            "expired": self.expired,
+        }
+
+    def history(self, message_id: int) -> list:
+        """Every stored event for one message, oldest first (blocking)"""
+        return self._query(
+            "SELECT ts, kind, user_id, content, data FROM events"
+            " WHERE message_id = ? ORDER BY ts",
+            (message_id,),
+        )
+
+    def deleted(self, channel_id: int, limit: int = 10) -> list:
+        """Recent deletions in a channel with the deleted message's author and text
+
+        Rows are ``(deleted_at, message_id, author_id, content)``; author and
+        content come from the delete event itself when discord.py had the message
+        cached, otherwise from the stored message (None if it was never seen).
+        """
+        return self._query(
+            "SELECT d.ts, d.message_id,"
+            " COALESCE(d.user_id, (SELECT user_id FROM events m"
+            "  WHERE m.message_id = d.message_id AND m.kind = 'message' LIMIT 1)),"
+            " COALESCE(d.content, (SELECT content FROM events m"
+            "  WHERE m.message_id = d.message_id AND m.kind IN ('message', 'message_edit')"
+            "  ORDER BY m.ts DESC LIMIT 1))"
+            " FROM events d WHERE d.channel_id = ? AND d.kind = 'message_delete'"
+            " ORDER BY d.ts DESC LIMIT ?",
+            (channel_id, limit),
+        )
+
+    def _query(self, sql: str, params: tuple) -> list:
+        connection = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            return connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        # auto_vacuum only takes effect before the first table is created
+        connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.execute("PRAGMA journal_mode = WAL")
+        # WAL + NORMAL: a crash can lose the last batch, never corrupt the file
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def _write(self, connection, batch):
+        try:
+            connection.execute("BEGIN")
+            connection.executemany(INSERT, batch)
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+
+    def _write_failed(self, error: Exception, rows: int):
+        if self.event_log is not None:
+            self.event_log.emit("event_store_failed", error=repr(error), rows=rows)
+
+    def _compact(self, connection):
+        cutoff = time.time() - self.retention
+        try:
+            while True:
+                deleted = connection.execute(
+                    "DELETE FROM events WHERE id IN"
+                    " (SELECT id FROM events WHERE ts < ? LIMIT ?)",
+                    (cutoff, DELETE_CHUNK),
+                ).rowcount
+                self.expired += deleted
+                if deleted < DELETE_CHUNK:
+                    break
+            connection.execute("PRAGMA incremental_vacuum")
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e:
+            if self.event_log is not None:
+                self.event_log.emit("event_store_compaction_failed", error=repr(e))
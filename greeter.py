@@ -0,0 +1,159 @@
+"""Burst-coalescing welcome/goodbye dispatcher.
+
+Joins and leaves are collected per (channel, kind) for a short window. A window
+with a single member gets the usual individual message; a busier window is sent
+as one combined message mentioning up to ``max_mentions`` members, so a join
+flood costs one send per window instead of one per member.
+"""
+
+import asyncio
+import os
+
+import discord
+
+from outbound import PRIORITY_WELCOME
+
+WELCOME = "welcome"
+GOODBYE = "goodbye"
+
+
+class _Batch:
+    """Members waiting to be greeted in one channel"""
+
+    __slots__ = ("kind", "channel", "members", "overflow")
+
+    def __init__(self, kind, channel):
+        self.kind = kind
+        self.channel = channel
+        self.members = []
+        self.overflow = 0
+
+
+class GreetingDispatcher:
+    """Collects member joins/leaves and sends them in per-window batches
+
+    ``render(kind, members, overflow)`` builds the message text; ``overflow`` is
+    the number of members beyond ``max_mentions`` that are counted but not named.
+    Sends go through ``scheduler`` (an ``OutboundScheduler``) at welcome priority
+    when one is given.
+    """
+
+    def __init__(
+        self,
+        render,
+        event_log=None,
+        scheduler=None,
+        window: float = 2.0,
+        max_mentions: int = 20,
+    ):
+        self.render = render
+        self.event_log = event_log
+        self.scheduler = scheduler
+        self.window = window
+        self.max_mentions = max_mentions
+
+        self._batches = {}
+        self._tasks = set()
+
+        self.individual_sends = 0
+        self.coalesced_sends = 0
+        self.members_coalesced = 0
+        self.failed_sends = 0
+
+    @classmethod
+    def from_env(cls, render, event_log=None, scheduler=None):
+        """Build a dispatcher configured from GREETING_* environment variables"""
+        return cls(
+            render,
+            event_log=event_log,
+            scheduler=scheduler,
+            window=float(os.getenv("GREETING_WINDOW", "2.0")),
+            max_mentions=int(os.getenv("GREETING_MAX_MENTIONS", "20")),
+        )
+
+    def submit(self, kind: str, channel, member):
+        """Queue a member to be greeted (or seen off) in ``channel``"""
+        key = (channel.id, kind)
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _Batch(kind, channel)
+            self._spawn(self._flush_later(key))
+
+        # Only the members that will be mentioned are kept, so memory stays bounded
+        if len(batch.members) < self.max_mentions:
+            batch.members.append(member)
+        else:
+            batch.overflow += 1
+
+    async def flush(self):
+        """Send every pending batch now"""
+        batches = list(self._batches.values())
+        self._batches.clear()
+        for batch in batches:
+            await self._send(batch)
+
+    async def drain(self):
+        """Wait for every scheduled batch to be sent"""
+        while self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    def stats(self) -> dict:
+        """Counters for individual vs coalesced sends"""
+        return {
+            "pending": sum(len(b.members) + b.overflow for b in self._batches.values()),
+            "individual_sends": self.individual_sends,
+            "coalesced_sends": self.coalesced_sends,
+            "members_coalesced": self.members_coalesced,
+            "failed_sends": self.failed_sends,
+        }
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush_later(self, key):
+        await asyncio.sleep(self.window)
+        batch = self._batches.pop(key, None)
+        if batch is not None:
+            await self._send(batch)
+
+    async def _send(self, batch: _Batch):
+        count = len(batch.members) + batch.overflow
+        content = self.render(batch.kind, batch.members, batch.overflow)
+        channel = batch.channel
+
+        try:
+            if self.scheduler is not None:
+                await self.scheduler.submit(
+                    ("channel", channel.id),
+                    lambda: channel.send(content),
+                    PRIORITY_WELCOME,
+                )
+            else:
+                await channel.send(content)
+        except discord.Forbidden:
+            self.failed_sends += 1
+            self._emit(f"{batch.kind}_failed", batch, count, error="forbidden")
+            return
+        except Exception as e:
+            self.failed_sends += 1
+            self._emit(f"{batch.kind}_failed", batch, count, error=repr(e))
+            return
+
+        if count == 1:
+            self.individual_sends += 1
+        else:
+            self.coalesced_sends += 1
+            self.members_coalesced += count
+        self._emit(f"{batch.kind}_sent", batch, count)
+
+    def _emit(self, event, batch, count, **fields):
+        if self.event_log is not None:
+            self.event_log.emit(
+                event,
+                guild_id=batch.channel.guild.id,
+                channel=batch.channel.name,
+                members=count,
+                **fields,
+            )
@@ -0,0 +1,131 @@
+"""Multi-process shard launcher.
+
+Splits ``--shards`` shards into contiguous ranges and runs each range in its own
+worker process (an AutoShardedBot limited to those shard ids), so guild events
+are spread over several cores. SIGINT/SIGTERM are forwarded to the workers,
+which close their gateway connections and flush their event logs before exiting.
+
+    python launcher.py --shards 8 --processes 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+
+def shard_ranges(shard_count: int, processes: int) -> list:
+    """Split shard ids 0..shard_count-1 into ``processes`` contiguous ranges"""
+    processes = max(1, min(processes, shard_count))
+    base, extra = divmod(shard_count, processes)
+    ranges = []
+    start = 0
+    for index in range(processes):
+        size = base + (1 if index < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+def run_worker(shard_ids: list, shard_count: int):
+    """Worker process entry point: run bot.py for one shard range"""
+    os.environ["SHARDED"] = "1"
+    os.environ["SHARD_COUNT"] = str(shard_count)
+    os.environ["SHARD_IDS"] = ",".join(map(str, shard_ids))
+
+    # Each worker serves its own metrics endpoint at the base port + first shard id
+    if os.getenv("METRICS_PORT"):
+        os.environ["METRICS_PORT"] = str(int(os.environ["METRICS_PORT"]) + shard_ids[0])
+
+    # bot.py reads its configuration at import time, so import after the env is set
+    import bot
+
+    bot.main()
+
+
+def start_workers(target, ranges: list, shard_count: int, args=()) -> list:
+    """Start one process per shard range running ``target(shard_ids, shard_count, *args)``"""
+    context = multiprocessing.get_context("spawn")
+    workers = []
+    for shard_ids in ranges:
+        process = context.Process(
+            target=target,
+            args=(shard_ids, shard_count, *args),
+            name=f"shards-{shard_ids[0]}-{shard_ids[-1]}",
+        )
+        process.start()
+        workers.append(process)
+    return workers
+
+
+def stop_workers(workers: list, timeout: float = 15.0):
+    """Ask workers to shut down, killing any that don't exit within ``timeout``"""
+    for process in workers:
+        if process.is_alive():
+            process.terminate()
+
+    deadline = time.monotonic() + timeout
+    for process in workers:
+        process.join(max(0.0, deadline - time.monotonic()))
+        if process.is_alive():
+            print(f"❌ {process.name} did not exit in time, killing it")
+            process.kill()
+            process.join()
+
+
+def supervise(workers: list) -> int:
+    """Wait for the workers; on SIGINT/SIGTERM or a crashed worker, stop them all"""
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    while not stopping and all(process.is_alive() for process in workers):
+        time.sleep(0.5)
+
+    for process in workers:
+        if not process.is_alive() and process.exitcode:
+            print(f"❌ {process.name} exited with code {process.exitcode}")
+
+    stop_workers(workers)
+    return max((process.exitcode or 0) for process in workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the bot as sharded worker processes"
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=int(os.getenv("SHARD_COUNT", "0")) or None,
+        help="total shard count (default: SHARD_COUNT)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes (default: CPU count)",
+    )
+    args = parser.parse_args()
+
+    if not args.shards:
+        parser.error("--shards (or SHARD_COUNT) is required")
+
+    ranges = shard_ranges(args.shards, args.processes)
+    print(f"🚀 Launching {args.shards} shards across {len(ranges)} processes")
+    for shard_ids in ranges:
+        print(f"   shards {shard_ids[0]}-{shard_ids[-1]}")
+
+    workers = start_workers(run_worker, ranges, args.shards)
+    sys.exit(supervise(workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Incrementally maintained, name-sorted member index per guild.
+
+Each guild keeps a sorted list of ``(casefolded name, member id)`` entries,
+with one entry for the username and one for the display name when it differs.
+A name-prefix lookup is a bisect followed by a contiguous slice. Joins,
+leaves and renames update the list with ``insort`` and a bisect-delete, so
+the index is never rebuilt after the first pass over the member cache.
+
+Results are paged by cursor: the last ``(name, member id)`` entry a page
+returned. The next page bisects past it. No iterator or offset is held
+between pages, so members who join or leave between pages don't shift the
+results.
+"""
+
+import base64
+import binascii
+from bisect import bisect_left, bisect_right, insort
+
+
+def member_keys(member) -> tuple:
+    """Casefolded names a member can be found under"""
+    name = member.name.casefold()
+    display = member.display_name.casefold()
+    return (name,) if display == name else (name, display)
+
+
+def cached_members(guild):
+    """A guild's cached members, without copying them when possible
+
+    ``guild.members`` builds a new list on every call. discord.py 2.0 through
+    2.5 (pinned in requirements.txt) keeps the members in ``Guild._members``,
+    a dict of member id to Member, so its values are used directly. If a
+    later release drops or changes that attribute, ``guild.members`` is used.
+    """
+    members = getattr(guild, "_members", None)
+    if isinstance(members, dict):
+        return members.values()
+    return guild.members
+
+
+def encode_cursor(entry: tuple) -> str:
+    """Compact, command-safe token for a ``(name, member id)`` entry"""
+    key, member_id = entry
+    encoded = base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+    return f"{member_id}.{encoded}"
+
+
+def decode_cursor(token: str) -> tuple:
+    """Inverse of ``encode_cursor``; raises ValueError for malformed tokens"""
+    member_id, _, encoded = token.partition(".")
+    try:
+        key = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(f"invalid cursor {token!r}") from e
+    return key, int(member_id)
+
+
+def member_filter(bot=None, status=None, joined_after=None, joined_before=None):
+    """Predicate over members for the given criteria, or None to accept all"""
+    checks = []
+    if bot is not None:
+        checks.append(lambda member: member.bot == bot)
+    if status is not None:
+        checks.append(lambda member: member.raw_status == status)
+    if joined_after is not None:
+        checks.append(
+            lambda member: member.joined_at is not None
+            and member.joined_at >= joined_after
+        )
+    if joined_before is not None:
+        checks.append(
+            lambda member: member.joined_at is not None
+            and member.joined_at < joined_before
+        )
+    if not checks:
+        return None
+    return lambda member: all(check(member) for check in checks)
+
+
+class GuildMemberIndex:
+    """Sorted name entries and the keys each member is indexed under"""
+
+    __slots__ = ("entries", "keys")
+
+    def __init__(self, members=()):
+        self.keys = {member.id: member_keys(member) for member in members}
+        self.entries = sorted(
+            (key, member_id) for member_id, keys in self.keys.items() for key in keys
+        )
+
+    def add(self, member):
+        if member.id in self.keys:
+            self.remove(member.id)
+        keys = member_keys(member)
+        for key in keys:
+            insort(self.entries, (key, member.id))
+        self.keys[member.id] = keys
+
+    def remove(self, member_id: int):
+        entries = self.entries
+        for key in self.keys.pop(member_id, ()):
+            i = bisect_left(entries, (key, member_id))
+            if i < len(entries) and entries[i] == (key, member_id):
+                del entries[i]
+
+    def update(self, member):
+        if self.keys.get(member.id) != member_keys(member):
+            self.add(member)
+
+    def page(self, prefix: str = "", after: tuple = None, limit: int = 100) -> list:
+        """Up to ``limit`` entries whose name starts with ``prefix``, past ``after``
+
+        A member matching under both names is only returned for the smaller
+        one, so every member appears once across pages.
+        """
+        entries = self.entries
+        start = bisect_left(entries, (prefix,))
+        if after is not None:
+            start = max(start, bisect_right(entries, after))
+
+        found = []
+        for i in range(start, len(entries)):
+            key, member_id = entry = entries[i]
+            if not key.startswith(prefix):
+                break
+            keys = self.keys[member_id]
+            if len(keys) > 1 and min(k for k in keys if k.startswith(prefix)) != key:
+                continue
+            found.append(entry)
+            if len(found) >= limit:
+                break
+        return found
+
+
+class MemberIndex:
+    """GuildMemberIndex for every guild the bot is in"""
+
+    def __init__(self):
+        self._guilds = {}
+
+    def build(self, guild) -> GuildMemberIndex:
+        """Index a guild's cached members from scratch"""
+        index = self._guilds[guild.id] = GuildMemberIndex(cached_members(guild))
+        return index
+
+    def drop(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
+
+    def get(self, guild) -> GuildMemberIndex:
+        index = self._guilds.get(guild.id)
+        if index is None:
+            index = self.build(guild)
+        return index
+
+    def member_joined(self, member):
+        index = self._guilds.get(member.guild.id)
+        # Without the members intent joins aren't cached; index only what is
+        if index is not None and member.guild.get_member(member.id) is not None:
+            index.add(member)
+
+    def member_left(self, member):
+        index = self._guilds.get(member.guild.id)
+        if index is not None:
+            index.remove(member.id)
+
+    def member_updated(self, member):
+        """Re-index a member whose username, global name or nickname changed"""
+        index = self._guilds.get(member.guild.id)
+        if index is not None:
+            index.update(member)
+
+    def pages(self, guild, prefix: str = "", where=None, after=None, size=100):
+        """Yield lists of matching members in name order, ``size`` entries at a time
+
+        Each page re-bisects from the previous cursor, so the caller may await
+        between pages while members join and leave.
+        """
+        prefix = prefix.casefold()
+        while True:
+            entries = self.get(guild).page(prefix, after, size)
+            if not entries:
+                return
+            after = entries[-1]
+            members = []
+            for _, member_id in entries:
+                member = guild.get_member(member_id)
+                if member is not None and (where is None or where(member)):
+                    members.append(member)
+            if members:
+                yield members
+            if len(entries) < size:
+                return
+
+    def search(self, guild, prefix: str = "", where=None, after=None, limit=20):
+        """One page of matches and the cursor for the next page (None if last)
+
+        The cursor is the entry of the last member returned, as a token for
+        ``decode_cursor``.
+        """
+        results = []
+        # One extra match tells whether there is a next page
+        size = limit + 1 if where is None else max(limit + 1, 100)
+        for members in self.pages(guild, prefix, where, after, size):
+            results.extend(members)
+            if len(results) > limit:
+                break
+        if len(results) <= limit:
+            return results, None
+        last = results[limit - 1]
+        keys = [
+            key
+            for key in self.get(guild).keys[last.id]
+            if key.startswith(prefix.casefold())
+        ]
+        return results[:limit], encode_cursor((min(keys), last.id))
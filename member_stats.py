@@ -0,0 +1,101 @@
+"""Incrementally maintained per-guild member counters.
+
+Counts are seeded with one pass over the member cache when a guild becomes
+available, then kept current from member join/remove and presence events, so
+``!members`` reads them in O(1) instead of rescanning every member.
+
+Every change bumps the guild's ``version``, so a rendered ``!members`` reply
+stays valid until the next join, leave, presence or name change.
+"""
+
+from collections import Counter
+
+
+class GuildCounters:
+    """Member totals for one guild"""
+
+    __slots__ = ("total", "bots", "statuses", "version")
+
+    def __init__(self):
+        self.total = 0
+        self.bots = 0
+        # raw status string ("online", "idle", "dnd", "offline") -> count
+        self.statuses = Counter()
+        # Bumped on every change to the counts or a listed member
+        self.version = 0
+
+    @property
+    def humans(self) -> int:
+        return self.total - self.bots
+
+    @property
+    def online(self) -> int:
+        """Members whose status is anything but offline"""
+        return self.total - self.statuses["offline"]
+
+    def add(self, member):
+        self.version += 1
+        self.total += 1
+        if member.bot:
+            self.bots += 1
+        self.statuses[member.raw_status] += 1
+
+    def remove(self, member):
+        self.version += 1
+        self.total -= 1
+        if member.bot:
+            self.bots -= 1
+        self.statuses[member.raw_status] -= 1
+
+
+class MemberStats:
+    """GuildCounters for every guild the bot is in"""
+
+    def __init__(self):
+        self._guilds = {}
+
+    def seed(self, guild) -> GuildCounters:
+        """Count a guild's cached members from scratch"""
+        counters = GuildCounters()
+        previous = self._guilds.get(guild.id)
+        if previous is not None:
+            # Keep versions increasing across a reseed
+            counters.version = previous.version + 1
+        for member in guild.members:
+            counters.add(member)
+        self._guilds[guild.id] = counters
+        return counters
+
+    def drop(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
+
+    def get(self, guild) -> GuildCounters:
+        counters = self._guilds.get(guild.id)
+        if counters is None:
+            counters = self.seed(guild)
+        return counters
+
+    def member_joined(self, member):
+        counters = self._guilds.get(member.guild.id)
+        if counters is not None:
+            counters.add(member)
+
+    def member_left(self, member):
+        counters = self._guilds.get(member.guild.id)
+        if counters is not None:
+            counters.remove(member)
+
+    def member_updated(self, member):
+        """A member's name changed; only the version moves"""
+        counters = self._guilds.get(member.guild.id)
+        if counters is not None:
+            counters.version += 1
+
+    def presence_changed(self, before, after):
+        if before.raw_status == after.raw_status:
+            return
+        counters = self._guilds.get(after.guild.id)
+        if counters is not None:
+            counters.version += 1
+            counters.statuses[before.raw_status] -= 1
+            counters.statuses[after.raw_status] += 1
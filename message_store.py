@@ -0,0 +1,103 @@
+"""Byte-bounded store of message summaries.
+
+Used in raw mode instead of discord.py's message cache. Each message is kept as
+one packed ``bytes`` blob (ids + truncated author name and content), and the
+store evicts least recently used entries once its byte budget is exceeded.
+"""
+
+import os
+import struct
+from collections import OrderedDict
+
+from reply_cache import MessageSummary
+
+# author_id, channel_id, author name length
+_HEADER = struct.Struct("<QQB")
+
+# Rough per-entry cost of the dict slot, key int and bytes object header
+ENTRY_OVERHEAD = 120
+
+
+def pack_summary(summary: MessageSummary, prefix: int = 200) -> bytes:
+    """Summary as one blob: ids, author name (max 255 bytes), content prefix"""
+    name = summary.author_name.encode()[:255]
+    return (
+        _HEADER.pack(summary.author_id, summary.channel_id, len(name))
+        + name
+        + summary.content[:prefix].encode()
+    )
+
+
+def unpack_summary(message_id: int, blob: bytes) -> MessageSummary:
+    """Inverse of ``pack_summary``"""
+    author_id, channel_id, name_length = _HEADER.unpack_from(blob)
+    start = _HEADER.size
+    return MessageSummary(
+        message_id,
+        author_id,
+        blob[start : start + name_length].decode(errors="replace"),
+        channel_id,
+        blob[start + name_length :].decode(errors="replace"),
+    )
+
+
+class MessageStore:
+    """LRU map of message id -> packed summary, sized in bytes"""
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, prefix: int = 200):
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+
+        self._entries = OrderedDict()
+        self.bytes_used = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build a store sized by MESSAGE_STORE_BYTES"""
+        return cls(
+            max_bytes=int(os.getenv("MESSAGE_STORE_BYTES", str(16 * 1024 * 1024)))
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, summary: MessageSummary):
+        """Store (or replace) a summary, evicting old entries to fit the budget"""
+        blob = pack_summary(summary, self.prefix)
+
+        old = self._entries.pop(summary.id, None)
+        if old is not None:
+            self.bytes_used -= len(old) + ENTRY_OVERHEAD
+
+        self._entries[summary.id] = blob
+        self.bytes_used += len(blob) + ENTRY_OVERHEAD
+
+        while self.bytes_used > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes_used -= len(evicted) + ENTRY_OVERHEAD
+            self.evictions += 1
+
+    def get(self, message_id: int):
+        """Unpacked summary for a message, or None"""
+        blob = self._entries.get(message_id)
+        if blob is None:
+            return None
+        self._entries.move_to_end(message_id)
+        return unpack_summary(message_id, blob)
+
+    def pop(self, message_id: int):
+        """Remove a message and return its summary, or None"""
+        summary = self.get(message_id)
+        if summary is not None:
+            blob = self._entries.pop(message_id)
+            self.bytes_used -= len(blob) + ENTRY_OVERHEAD
+        return summary
+
+    def stats(self) -> dict:
+        return {
+            "messages": len(self._entries),
+            "bytes_used": self.bytes_used,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,242 @@
+"""Per-handler call, latency, error and REST-call metrics.
+
+``Metrics.instrument`` wraps an event handler or command callback. Each call
+costs two ``perf_counter`` reads, a bisect into fixed histogram buckets and a
+context variable set/reset, so instrumentation stays in the low microseconds.
+The context variable lets ``track_rest`` attribute every Discord REST request
+to the handler that issued it.
+
+``MetricsServer`` exposes everything in the Prometheus text format on a local
+HTTP port. aiohttp's server side is only imported when the server starts.
+"""
+
+import contextvars
+import functools
+import os
+import time
+from bisect import bisect_left
+from collections import Counter
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+# Handler whose call is currently running in this task
+_current = contextvars.ContextVar("metrics_handler", default=None)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                break
+        return self.bounds[index] if index < len(self.bounds) else float("inf")
+
+
+class HandlerMetrics:
+    """Counters for one handler or command"""
+
+    __slots__ = ("name", "calls", "in_flight", "rest_calls", "errors", "latency")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.in_flight = 0
+        self.rest_calls = 0
+        # exception class name -> count
+        self.errors = Counter()
+        self.latency = Histogram()
+
+
+class Metrics:
+    """Registry of HandlerMetrics plus stats() sources from other components"""
+
+    def __init__(self):
+        self.handlers = {}
+        # REST requests issued outside any instrumented handler
+        self.untracked_rest_calls = 0
+        self._sources = {}
+
+    def handler(self, name: str) -> HandlerMetrics:
+        metrics = self.handlers.get(name)
+        if metrics is None:
+            metrics = self.handlers[name] = HandlerMetrics(name)
+        return metrics
+
+    def instrument(self, func):
+        """Wrap an async handler so every call is counted and timed"""
+        metrics = self.handler(func.__name__)
+        clock = time.perf_counter
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            metrics.calls += 1
+            metrics.in_flight += 1
+            token = _current.set(metrics)
+            start = clock()
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                metrics.errors[type(e).__name__] += 1
+                raise
+            finally:
+                metrics.latency.observe(clock() - start)
+                metrics.in_flight -= 1
+                _current.reset(token)
+
+        return wrapper
+
+    def track_rest(self, http):
+        """Count each request made through a discord.py HTTPClient"""
+        request = http.request
+
+        async def counted_request(route, **kwargs):
+            metrics = _current.get()
+            if metrics is not None:
+                metrics.rest_calls += 1
+            else:
+                self.untracked_rest_calls += 1
+            return await request(route, **kwargs)
+
+        http.request = counted_request
+
+    def add_source(self, name: str, stats):
+        """Include the numeric values of ``stats()`` as ``bot_<name>_<key>`` gauges"""
+        self._sources[name] = stats
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        handlers = sorted(self.handlers.values(), key=lambda m: m.name)
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        family("bot_handler_calls_total", "counter", "Handler invocations")
+        for m in handlers:
+            lines.append(f'bot_handler_calls_total{{handler="{m.name}"}} {m.calls}')
+
+        family("bot_handler_errors_total", "counter", "Exceptions raised by handlers")
+        for m in handlers:
+            for error, count in sorted(m.errors.items()):
+                lines.append(
+                    f'bot_handler_errors_total{{handler="{m.name}",error="{error}"}} {count}'
+                )
+
+        family("bot_handler_in_flight", "gauge", "Handler calls currently running")
+        for m in handlers:
+            lines.append(f'bot_handler_in_flight{{handler="{m.name}"}} {m.in_flight}')
+
+        family("bot_handler_rest_calls_total", "counter", "Discord REST requests")
+        for m in handlers:
+            lines.append(
+                f'bot_handler_rest_calls_total{{handler="{m.name}"}} {m.rest_calls}'
+            )
+        lines.append(
+            f'bot_handler_rest_calls_total{{handler=""}} {self.untracked_rest_calls}'
+        )
+
+        family("bot_handler_latency_seconds", "histogram", "Handler latency")
+        for m in handlers:
+            cumulative = 0
+            for bound, count in zip(m.latency.bounds, m.latency.counts):
+                cumulative += count
+                lines.append(
+                    f'bot_handler_latency_seconds_bucket{{handler="{m.name}",le="{bound}"}} {cumulative}'
+                )
+            lines.append(
+                f'bot_handler_latency_seconds_bucket{{handler="{m.name}",le="+Inf"}} {m.latency.count}'
+            )
+            lines.append(
+                f'bot_handler_latency_seconds_sum{{handler="{m.name}"}} {m.latency.sum:.6f}'
+            )
+            lines.append(
+                f'bot_handler_latency_seconds_count{{handler="{m.name}"}} {m.latency.count}'
+            )
+
+        for source, stats in sorted(self._sources.items()):
+            for key, value in stats().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"bot_{source}_{key} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves ``Metrics.render()`` at ``/metrics`` on a local port"""
+
+    def __init__(self, metrics: Metrics, host: str = "127.0.0.1", port: int = 9100):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    @classmethod
+    def from_env(cls, metrics: Metrics):
+        """Build a server configured from METRICS_* environment variables"""
+        return cls(
+            metrics,
+            host=os.getenv("METRICS_HOST", "127.0.0.1"),
+            port=int(os.getenv("METRICS_PORT", "9100")),
+        )
+
+    async def start(self):
+        if self._runner is not None:
+            return
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def handle(self, request):
+        from aiohttp import web
+
+        return web.Response(
+            body=self.metrics.render().encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
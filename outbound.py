@@ -0,0 +1,255 @@
+"""Prioritised, rate-limit-aware scheduler for outbound Discord actions.
+
+Gateway handlers enqueue actions (zero-argument callables returning an
+awaitable) and return immediately. A fixed pool of workers runs them in
+priority order. Actions on the same route run one at a time and wait out any
+rate limit that route has reported through ``X-RateLimit-*`` / ``Retry-After``
+headers.
+
+discord.py returns parsed objects and retries 429s itself, so the headers are
+read where the HTTP responses arrive: ``trace_config()`` is passed to the
+client as ``http_trace``, and every response received while an action runs is
+applied to that action's route. An action that returns a response, or raises
+an exception carrying one, is applied as well.
+
+Each action runs in a copy of the context it was submitted from, so context
+variables (such as the handler that REST calls are attributed to) carry over.
+"""
+
+import asyncio
+import contextvars
+import itertools
+import os
+import time
+
+# Lower runs first
+PRIORITY_COMMAND = 0
+PRIORITY_THREAD = 1
+PRIORITY_WELCOME = 2
+
+# Bucket of the action running in this context, for the HTTP trace hook
+_current_bucket = contextvars.ContextVar("outbound_bucket", default=None)
+
+
+class OutboundQueueFull(Exception):
+    """Raised (through the returned future) when the scheduler queue is full"""
+
+
+class RouteBucket:
+    """Rate-limit state and serialisation for one route"""
+
+    __slots__ = ("remaining", "reset_at", "lock", "pending")
+
+    def __init__(self):
+        self.remaining = None
+        self.reset_at = 0.0
+        self.lock = asyncio.Lock()
+        self.pending = 0
+
+    def update(self, headers, status: int = None):
+        """Apply rate-limit headers from a response"""
+        if headers is None:
+            return
+        now = time.monotonic()
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is not None:
+            self.remaining = int(remaining)
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if reset_after is not None:
+            self.reset_at = now + float(reset_after)
+        retry_after = headers.get("Retry-After")
+        if status == 429 and retry_after is not None:
+            self.remaining = 0
+            self.reset_at = max(self.reset_at, now + float(retry_after))
+
+    def delay(self) -> float:
+        """Seconds to wait before this route may be used again"""
+        if self.remaining == 0:
+            return max(0.0, self.reset_at - time.monotonic())
+        return 0.0
+
+
+class OutboundScheduler:
+    """Bounded priority queue of outbound actions drained by worker tasks"""
+
+    def __init__(self, concurrency: int = 4, max_queue: int = 1000, event_log=None):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.event_log = event_log
+
+        self._queue = None
+        self._workers = []
+        self._buckets = {}
+        self._seq = itertools.count()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.rate_limited = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    @classmethod
+    def from_env(cls, event_log=None):
+        """Build a scheduler configured from OUTBOUND_* environment variables"""
+        return cls(
+            concurrency=int(os.getenv("OUTBOUND_CONCURRENCY", "4")),
+            max_queue=int(os.getenv("OUTBOUND_MAX_QUEUE", "1000")),
+            event_log=event_log,
+        )
+
+    def submit(self, route, action, priority: int = PRIORITY_THREAD) -> asyncio.Future:
+        """Queue ``action`` for ``route``; the future resolves to its result"""
+        if self._queue is None:
+            self._start()
+
+        future = asyncio.get_running_loop().create_future()
+        self.submitted += 1
+        try:
+            self._queue.put_nowait(
+                (
+                    priority,
+                    next(self._seq),
+                    route,
+                    action,
+                    contextvars.copy_context(),
+                    time.monotonic(),
+                    future,
+                )
+            )
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self._fail(
+                future, OutboundQueueFull(f"outbound queue full ({self.max_queue})")
+            )
+            return future
+
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        return future
+
+    async def drain(self):
+        """Wait until every queued action has run"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self):
+        """Stop the workers; queued actions are cancelled"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._queue is not None:
+            while not self._queue.empty():
+                *_, future = self._queue.get_nowait()
+                future.cancel()
+            self._queue = None
+
+    def trace_config(self):
+        """Trace config applying response headers to the running action's route"""
+        import aiohttp
+
+        async def on_request_end(session, trace_context, params):
+            bucket = _current_bucket.get()
+            if bucket is not None:
+                bucket.update(params.response.headers, params.response.status)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
+
+    def stats(self) -> dict:
+        """Queue depth, throughput and latency metrics"""
+        finished = self.completed + self.failed
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_depth": self.max_depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "rate_limited": self.rate_limited,
+            "routes": len(self._buckets),
+            "avg_wait_ms": (
+                round(self.total_wait / finished * 1000, 2) if finished else 0
+            ),
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "avg_run_ms": round(self.total_run / finished * 1000, 2) if finished else 0,
+        }
+
+    def _start(self):
+        self._queue = asyncio.PriorityQueue(self.max_queue)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+
+    def _fail(self, future, error):
+        future.set_exception(error)
+        # Fire-and-forget callers never await; don't let asyncio report it
+        future.exception()
+
+    async def _worker(self):
+        while True:
+            priority, _, route, action, context, enqueued_at, future = (
+                await self._queue.get()
+            )
+            try:
+                if future.cancelled():
+                    continue
+                await self._run(priority, route, action, context, enqueued_at, future)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, priority, route, action, context, enqueued_at, future):
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            bucket = self._buckets[route] = RouteBucket()
+        bucket.pending += 1
+
+        try:
+            async with bucket.lock:
+                delay = bucket.delay()
+                if delay:
+                    self.rate_limited += 1
+                    await asyncio.sleep(delay)
+
+                started = time.monotonic()
+                wait = started - enqueued_at
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+
+                try:
+                    # The action's task inherits the bucket for the trace hook
+                    context.run(_current_bucket.set, bucket)
+                    result = await context.run(asyncio.ensure_future, action())
+                except Exception as e:
+                    response = getattr(e, "response", None)
+                    bucket.update(
+                        getattr(response, "headers", None), getattr(e, "status", None)
+                    )
+                    self.failed += 1
+                    self.total_run += time.monotonic() - started
+                    if self.event_log is not None:
+                        self.event_log.emit(
+                            "outbound_failed",
+                            route=route,
+                            priority=priority,
+                            error=repr(e),
+                        )
+                    if not future.done():
+                        self._fail(future, e)
+                    return
+
+                bucket.update(
+                    getattr(result, "headers", None), getattr(result, "status", None)
+                )
+                self.completed += 1
+                self.total_run += time.monotonic() - started
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            bucket.pending -= 1
+            if bucket.pending == 0 and bucket.delay() == 0:
+                del self._buckets[route]
@@ -0,0 +1,154 @@
+"""Registry of the extensions that hold the bot's event handlers and commands.
+
+Event handlers and commands live in extension modules (``cogs/``) instead of
+bot.py. Event extensions are loaded by ``load_events`` in ``setup_hook``,
+before the gateway connects, so no event arrives without its listeners.
+Nothing else is imported at start: command extensions are loaded during the
+post-READY warmup, or right away when a command arrives before warmup gets to
+them. Each newly added command and listener is wrapped with
+``Metrics.instrument`` like the handlers left in bot.py, and an extension that
+fails to load is logged and skipped instead of stopping the bot. A cog
+listener's wrapper also replaces the method on the cog, so discord.py finds
+and removes it when the extension is unloaded.
+"""
+
+import asyncio
+import os
+import time
+
+from discord.ext import commands
+
+BUILTIN_PLUGINS = ("cogs.status", "cogs.members", "cogs.moderation")
+
+# Loaded before connecting; their listeners must see the first events
+EVENT_PLUGINS = (
+    "cogs.tracking",
+    "cogs.history",
+    "cogs.messages",
+    "cogs.reactions",
+    "cogs.welcome",
+)
+
+
+def _names_from_env(key: str, default: tuple) -> tuple:
+    value = os.getenv(key)
+    if not value:
+        return default
+    return tuple(name.strip() for name in value.split(",") if name.strip())
+
+
+class PluginRegistry:
+    """Loads a list of discord.py extensions once, on demand"""
+
+    def __init__(
+        self,
+        bot,
+        names=BUILTIN_PLUGINS,
+        events=EVENT_PLUGINS,
+        metrics=None,
+        event_log=None,
+    ):
+        self.bot = bot
+        self.events = list(dict.fromkeys(events))
+        self.names = [name for name in dict.fromkeys(names) if name not in events]
+        self.metrics = metrics
+        self.event_log = event_log
+
+        # extension name -> seconds spent importing and setting it up
+        self.load_times = {}
+        # extension name -> error text
+        self.failed = {}
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_env(cls, bot, metrics=None, event_log=None):
+        """Build a registry with extensions from PLUGINS and EVENT_PLUGINS"""
+        return cls(
+            bot,
+            _names_from_env("PLUGINS", BUILTIN_PLUGINS),
+            _names_from_env("EVENT_PLUGINS", EVENT_PLUGINS),
+            metrics=metrics,
+            event_log=event_log,
+        )
+
+    @property
+    def pending(self) -> list:
+        """Command extensions neither loaded nor failed yet"""
+        return [
+            name
+            for name in self.names
+            if name not in self.load_times and name not in self.failed
+        ]
+
+    async def load_events(self):
+        """Load every event extension; call before the gateway connects"""
+        for name in self.events:
+            await self.load(name)
+
+    async def load_all(self):
+        """Load every pending extension"""
+        for name in self.pending:
+            await self.load(name)
+
+    async def load(self, name: str) -> bool:
+        """Load one extension; True if it is loaded afterwards"""
+        # Warmup and an early command may both ask for the same extension
+        async with self._lock:
+            if name in self.load_times:
+                return True
+            if name in self.failed:
+                return False
+
+            start = time.perf_counter()
+            try:
+                await self.bot.load_extension(name)
+            except commands.ExtensionError as e:
+                self.failed[name] = repr(e.__cause__ or e)
+                if self.event_log is not None:
+                    self.event_log.emit(
+                        "plugin_failed", plugin=name, error=self.failed[name]
+                    )
+                return False
+            self.load_times[name] = elapsed = time.perf_counter() - start
+
+            if self.metrics is not None:
+                for command in self.bot.walk_commands():
+                    if command.module == name:
+                        command.callback = self.metrics.instrument(command.callback)
+                for listeners in self.bot.extra_events.values():
+                    for i, listener in enumerate(listeners):
+                        if listener.__module__ == name:
+                            listeners[i] = self._instrument_listener(listener)
+
+            if self.event_log is not None:
+                self.event_log.emit(
+                    "plugin_loaded", plugin=name, seconds=round(elapsed, 4)
+                )
+            return True
+
+    async def unload(self, name: str) -> bool:
+        """Unload one extension; ``load`` brings it back. True if it was loaded"""
+        async with self._lock:
+            if name not in self.load_times:
+                return False
+            await self.bot.unload_extension(name)
+            del self.load_times[name]
+            if self.event_log is not None:
+                self.event_log.emit("plugin_unloaded", plugin=name)
+            return True
+
+    def _instrument_listener(self, listener):
+        wrapper = self.metrics.instrument(listener)
+        cog = getattr(listener, "__self__", None)
+        if isinstance(cog, commands.Cog):
+            # Unloading removes ``getattr(cog, method)`` from the listeners,
+            # so that attribute must be the wrapper that was registered
+            setattr(cog, listener.__func__.__name__, wrapper)
+        return wrapper
+
+    def stats(self) -> dict:
+        return {
+            "loaded": len(self.load_times),
+            "failed": len(self.failed),
+            "pending": len(self.pending),
+        }
@@ -0,0 +1,119 @@
+"""Gateway intents and caches computed from the features the bot runs.
+
+Each feature declares the gateway intents it needs to receive its events, the
+member cache flags it reads from, whether it needs every guild's member list
+chunked at startup, and whether it needs discord.py's message cache. The bot
+combines the features enabled in FEATURES into one ``GatewayProfile`` and
+builds its client from that, so a deployment that only logs messages does not
+receive, parse and keep reactions, member lists or presences.
+
+Without FEATURES the bot keeps the configuration it always had: the default
+intents plus message content, default member caching and the message cache.
+"""
+
+import os
+from typing import NamedTuple
+
+import discord
+
+
+class Feature(NamedTuple):
+    """What one feature needs from the gateway"""
+
+    intents: frozenset = frozenset()
+    member_cache: frozenset = frozenset()
+    chunk: bool = False
+    message_cache: bool = False
+
+
+FEATURES = {
+    # Prefix commands in servers and DMs
+    "commands": Feature(
+        intents=frozenset(
+            {"guilds", "guild_messages", "dm_messages", "message_content"}
+        )
+    ),
+    # Message, edit, delete and reply logging, auto-response rules
+    "messages": Feature(
+        intents=frozenset({"guilds", "guild_messages", "message_content"}),
+        message_cache=True,
+    ),
+    # Threads for questions-channel posts and mentions
+    "questions": Feature(
+        intents=frozenset({"guilds", "guild_messages", "message_content"})
+    ),
+    # Welcome/goodbye messages; join and leave events need the members intent,
+    # and discord.py only dispatches a leave for a member it has cached
+    "welcome": Feature(
+        intents=frozenset({"guilds", "members"}), member_cache=frozenset({"joined"})
+    ),
+    # Reaction rollups; counted from raw events, so no message cache
+    "reactions": Feature(intents=frozenset({"guilds", "guild_reactions"})),
+    # !members counts, search and export need every member and their status
+    "member_stats": Feature(
+        intents=frozenset({"guilds", "members", "presences"}),
+        member_cache=frozenset({"joined"}),
+        chunk=True,
+    ),
+}
+
+
+class GatewayProfile(NamedTuple):
+    """Client configuration for a set of features"""
+
+    intents: discord.Intents
+    member_cache_flags: discord.MemberCacheFlags
+    chunk_guilds_at_startup: bool
+    message_cache: bool
+
+    @classmethod
+    def default(cls):
+        """The configuration the bot used before profiles"""
+        intents = discord.Intents.default()
+        intents.message_content = True
+        intents.guilds = True
+        intents.reactions = True
+        return cls(
+            intents=intents,
+            member_cache_flags=discord.MemberCacheFlags.from_intents(intents),
+            chunk_guilds_at_startup=intents.members,
+            message_cache=True,
+        )
+
+    @classmethod
+    def resolve(cls, names):
+        """The smallest configuration that serves every feature in ``names``
+
+        Raises ``ValueError`` for an unknown feature name.
+        """
+        unknown = [name for name in names if name not in FEATURES]
+        if unknown:
+            raise ValueError(
+                f"Unknown features: {', '.join(unknown)} "
+                f"(known: {', '.join(FEATURES)})"
+            )
+        features = [FEATURES[name] for name in names]
+
+        intents = discord.Intents.none()
+        member_cache_flags = discord.MemberCacheFlags.none()
+        for feature in features:
+            for flag in feature.intents:
+                setattr(intents, flag, True)
+            for flag in feature.member_cache:
+                setattr(member_cache_flags, flag, True)
+        return cls(
+            intents=intents,
+            member_cache_flags=member_cache_flags,
+            chunk_guilds_at_startup=any(feature.chunk for feature in features),
+            message_cache=any(feature.message_cache for feature in features),
+        )
+
+    @classmethod
+    def from_env(cls):
+        """Profile for FEATURES (comma-separated, or ``all``); unset means ``default``"""
+        value = os.getenv("FEATURES")
+        if not value:
+            return cls.default()
+        if value.strip().lower() == "all":
+            return cls.resolve(list(FEATURES))
+        return cls.resolve([name.strip() for name in value.split(",") if name.strip()])
@@ -0,0 +1,165 @@
+"""Windowed reaction counters with one rolled-up log event per message.
+
+Reaction adds and removes are counted per message and emoji for ``window``
+seconds, then each message that saw reactions gets one ``reactions`` event
+with its per-emoji totals. A giveaway post taking thousands of reactions in a
+few seconds thus costs a handful of log lines instead of one per reaction.
+
+Counters are kept in one ``array`` per message (added/removed pairs indexed by
+emoji slot), so an event is a dict probe and two integer updates. The text and
+author of a message are looked up once per window, when it is flushed, rather
+than once per reaction. Concurrent lookups of the same message share one
+REST request through the reply cache.
+"""
+
+import asyncio
+import os
+from array import array
+
+import discord
+
+from dispatch import channel_fields
+
+
+class _MessageReactions:
+    """Counters for one message during a window"""
+
+    __slots__ = ("record", "emojis", "counts")
+
+    def __init__(self, record):
+        # First record of the window, for the guild and channel fields
+        self.record = record
+        # emoji -> slot; counts[2 * slot] added, counts[2 * slot + 1] removed
+        self.emojis = {}
+        self.counts = array("I")
+
+
+class ReactionAggregator:
+    """Counts reactions per message and emoji and logs them once per window
+
+    ``resolve(channel, message_id)`` returns the ``MessageSummary`` of a
+    message, or None, and may raise
+    ``discord.NotFound`` / ``discord.Forbidden``.
+    """
+
+    def __init__(
+        self,
+        resolve,
+        event_log=None,
+        window: float = 2.0,
+        max_messages: int = 5000,
+        max_emojis: int = 50,
+    ):
+        self.resolve = resolve
+        self.event_log = event_log
+        self.window = window
+        self.max_messages = max_messages
+        self.max_emojis = max_emojis
+
+        self._messages = {}
+        self._tasks = set()
+
+        self.reactions = 0
+        self.rollups = 0
+        self.lookups = 0
+        self.emojis_dropped = 0
+
+    @classmethod
+    def from_env(cls, resolve, event_log=None):
+        """Build an aggregator configured from REACTION_* environment variables"""
+        return cls(
+            resolve,
+            event_log=event_log,
+            window=float(os.getenv("REACTION_WINDOW", "2.0")),
+            max_messages=int(os.getenv("REACTION_MAX_MESSAGES", "5000")),
+        )
+
+    def add(self, record, emoji: str, removed: bool = False):
+        """Count one reaction added to (or removed from) ``record``'s message"""
+        messages = self._messages
+        entry = messages.get(record.message_id)
+        if entry is None:
+            if not messages:
+                self._spawn(self._flush_later())
+            elif len(messages) >= self.max_messages:
+                # A window spanning too many messages is flushed early; the
+                # pending timer flushes the new batch at the old window's end
+                self._messages = {}
+                self._spawn(self._emit_all(messages))
+                messages = self._messages
+            entry = messages[record.message_id] = _MessageReactions(record)
+
+        slot = entry.emojis.get(emoji)
+        if slot is None:
+            if len(entry.emojis) >= self.max_emojis:
+                self.emojis_dropped += 1
+                return
+            slot = entry.emojis[emoji] = len(entry.emojis)
+            entry.counts.extend((0, 0))
+        entry.counts[2 * slot + removed] += 1
+        self.reactions += 1
+
+    async def flush(self):
+        """Log every message counted so far"""
+        messages = self._messages
+        if messages:
+            self._messages = {}
+            await self._emit_all(messages)
+
+    async def drain(self):
+        """Wait for every scheduled flush to finish"""
+        while self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    def stats(self) -> dict:
+        return {
+            "pending_messages": len(self._messages),
+            "reactions": self.reactions,
+            "rollups": self.rollups,
+            "lookups": self.lookups,
+            "emojis_dropped": self.emojis_dropped,
+        }
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        await self.flush()
+
+    async def _emit_all(self, messages: dict):
+        # Lookups for different messages run concurrently
+        await asyncio.gather(*(self._emit(entry) for entry in messages.values()))
+
+    async def _emit(self, entry: _MessageReactions):
+        record = entry.record
+        counts = entry.counts
+        fields = {
+            "message_id": record.message_id,
+            "guild_id": record.guild_id,
+            **channel_fields(record),
+            "added": sum(counts[0::2]),
+            "removed": sum(counts[1::2]),
+            "emojis": {
+                emoji: [counts[2 * slot], counts[2 * slot + 1]]
+                for emoji, slot in entry.emojis.items()
+            },
+        }
+
+        self.lookups += 1
+        try:
+            summary = await self.resolve(record.channel, record.message_id)
+        except discord.NotFound:
+            fields["fetch_error"] = "not_found"
+        except discord.Forbidden:
+            fields["fetch_error"] = "forbidden"
+        else:
+            if summary is not None:
+                fields["content"] = summary.content
+                fields["message_author"] = summary.author_name
+
+        self.rollups += 1
+        if self.event_log is not None:
+            self.event_log.emit("reactions", **fields)
@@ -0,0 +1,104 @@
+"""Rendered command replies cached by version, and per-channel reply coalescing.
+
+``!members`` and ``!ping`` replies depend on a little state that changes far
+less often than users ask for them. ``get`` keeps the finished payload (an
+embed, a string) per key together with the version it was built from; a
+request at the same version reuses it, a newer version rebuilds it. For
+``!members`` the version is the guild's member counter version, which member
+join/leave, presence and name events bump.
+
+``share`` coalesces identical requests in one channel: the first one in a
+``window`` sends the reply, later ones within the window get that same reply's
+future instead of sending another message.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
+
+class RenderCache:
+    """Payloads by key and version, and recent replies by channel and key"""
+
+    def __init__(self, window: float = 3.0, max_size: int = 1000):
+        self.window = window
+        self.max_size = max_size
+
+        # key -> (version, payload, guild id or None), least recently used first
+        self._payloads = OrderedDict()
+        # (channel id, key) -> (expires at, future)
+        self._replies = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build a cache configured from RENDER_* environment variables"""
+        return cls(
+            window=float(os.getenv("RENDER_COOLDOWN", "3.0")),
+            max_size=int(os.getenv("RENDER_CACHE_SIZE", "1000")),
+        )
+
+    def get(self, key, version, render, guild_id: int = None):
+        """Payload for ``key`` built at ``version``, calling ``render()`` if stale
+
+        ``guild_id`` marks a payload built from one guild's state, for ``drop``.
+        """
+        entry = self._payloads.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            self._payloads.move_to_end(key)
+            return entry[1]
+
+        self.misses += 1
+        payload = render()
+        self._payloads[key] = (version, payload, guild_id)
+        self._payloads.move_to_end(key)
+        if len(self._payloads) > self.max_size:
+            self._payloads.popitem(last=False)
+        return payload
+
+    def share(self, channel_id: int, key, send) -> asyncio.Future:
+        """Call ``send()`` unless the same reply went to the channel within the window
+
+        ``send`` returns an awaitable. A request inside the window gets the
+        first request's future instead.
+        """
+        now = time.monotonic()
+        reply_key = (channel_id, key)
+        entry = self._replies.get(reply_key)
+        if entry is not None and entry[0] > now:
+            self.coalesced += 1
+            return entry[1]
+
+        if len(self._replies) >= self.max_size:
+            self._expire(now)
+        future = asyncio.ensure_future(send())
+        self._replies[reply_key] = (now + self.window, future)
+        return future
+
+    def drop(self, guild_id: int):
+        """Forget the payloads ``get`` stored for a guild the bot left"""
+        for key in [
+            key for key, entry in self._payloads.items() if entry[2] == guild_id
+        ]:
+            del self._payloads[key]
+
+    def stats(self) -> dict:
+        """Payload hits and misses and coalesced replies"""
+        lookups = self.hits + self.misses
+        return {
+            "payloads": len(self._payloads),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "coalesced": self.coalesced,
+        }
+
+    def _expire(self, now: float):
+        for reply_key, (expires, _) in list(self._replies.items()):
+            if expires <= now:
+                del self._replies[reply_key]
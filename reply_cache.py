@@ -0,0 +1,246 @@
+"""Lookup path for the message a reply points at.
+
+Resolution order, cheapest first:
+
+1. ``message.reference.resolved`` - the gateway usually ships the referenced
+   message inside MESSAGE_CREATE, so no lookup is needed at all.
+2. ``ReplyCache``'s own store of lightweight ``MessageSummary`` objects, filled
+   from every message the bot sees (an LRU/TTL map by default, or the
+   byte-bounded ``MessageStore`` in raw mode).
+3. ``message.reference.cached_message`` - discord.py's client message cache
+   (a linear scan, so it comes after the O(1) LRU).
+4. The shared state backend, if configured, which holds the summaries every
+   bot process has seen (see ``state.py``).
+5. ``channel.fetch_message`` over REST, with concurrent lookups for the same
+   id coalesced into a single request (together with step 4).
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
+import discord
+
+# resolve_local() result when no local tier knows the referenced message
+UNRESOLVED = object()
+
+
+class MessageSummary:
+    """The few fields the bot needs from a message, without the full object"""
+
+    __slots__ = ("id", "author_id", "author_name", "channel_id", "content")
+
+    def __init__(self, id, author_id, author_name, channel_id, content):
+        self.id = id
+        self.author_id = author_id
+        self.author_name = author_name
+        self.channel_id = channel_id
+        self.content = content
+
+    @classmethod
+    def from_message(cls, message, prefix: int = 200):
+        return cls(
+            message.id,
+            message.author.id,
+            message.author.name,
+            message.channel.id,
+            message.content[:prefix],
+        )
+
+    def __repr__(self):
+        return f"<MessageSummary id={self.id} author={self.author_name!r}>"
+
+
+class SummaryLRU:
+    """LRU map of message id -> summary with a size cap and per-entry TTL"""
+
+    def __init__(self, max_size: int = 5000, ttl: float = 600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, summary: MessageSummary):
+        entries = self._entries
+        entries[summary.id] = (time.monotonic() + self.ttl, summary)
+        entries.move_to_end(summary.id)
+        while len(entries) > self.max_size:
+            entries.popitem(last=False)
+
+    def get(self, message_id: int):
+        """Return a cached summary, or None if missing or expired"""
+        entry = self._entries.get(message_id)
+        if entry is None:
+            return None
+        expires, summary = entry
+        if expires < time.monotonic():
+            del self._entries[message_id]
+            return None
+        self._entries.move_to_end(message_id)
+        return summary
+
+    def pop(self, message_id: int):
+        entry = self._entries.pop(message_id, None)
+        return entry[1] if entry is not None else None
+
+
+class ReplyCache:
+    """Message summary cache with coalesced REST fallback
+
+    ``store`` is any object with ``put``/``get``/``pop`` for summaries; it
+    defaults to a ``SummaryLRU``. ``shared`` is an optional ``StateBackend``
+    that summaries are also written to and looked up in before REST.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 5000,
+        ttl: float = 600.0,
+        prefix: int = 200,
+        store=None,
+        shared=None,
+    ):
+        self.prefix = prefix
+        self.store = store if store is not None else SummaryLRU(max_size, ttl)
+        self.shared = shared
+
+        self._inflight = {}
+
+        self.resolved_hits = 0
+        self.cache_hits = 0
+        self.client_cache_hits = 0
+        self.shared_hits = 0
+        self.fetches = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_env(cls, store=None, shared=None):
+        """Build a cache configured from REPLY_CACHE_* environment variables"""
+        return cls(
+            max_size=int(os.getenv("REPLY_CACHE_SIZE", "5000")),
+            ttl=float(os.getenv("REPLY_CACHE_TTL", "600")),
+            store=store,
+            shared=shared,
+        )
+
+    def remember(self, message) -> MessageSummary:
+        """Store a summary of a message the bot has seen"""
+        summary = MessageSummary.from_message(message, self.prefix)
+        self.store.put(summary)
+        if self.shared is not None:
+            self.shared.put_summary(summary)
+        return summary
+
+    def forget(self, message_id: int):
+        """Drop a message and return its summary, e.g. after it was deleted"""
+        if self.shared is not None:
+            self.shared.delete_summary(message_id)
+        return self.store.pop(message_id)
+
+    def get(self, message_id: int):
+        """Return a cached summary, or None"""
+        return self.store.get(message_id)
+
+    async def lookup(self, message_id: int):
+        """Cached summary, else one another bot process stored, else None"""
+        summary = self.store.get(message_id)
+        if summary is None and self.shared is not None:
+            summary = await self._shared_get(message_id)
+        return summary
+
+    async def resolve(self, message):
+        """Summary of the message ``message`` replies to, or None if it was deleted
+
+        Raises ``discord.NotFound`` / ``discord.Forbidden`` when the REST
+        fallback fails.
+        """
+        summary = self.resolve_local(message)
+        if summary is UNRESOLVED:
+            return await self.fetch(message.channel, message.reference.message_id)
+        return summary
+
+    def resolve_local(self, message):
+        """Like ``resolve`` from the payload and in-process caches only
+
+        Returns ``UNRESOLVED`` when only the shared backend or REST could tell.
+        """
+        reference = message.reference
+
+        resolved = reference.resolved
+        if isinstance(resolved, discord.DeletedReferencedMessage):
+            self.resolved_hits += 1
+            return None
+        if isinstance(resolved, discord.Message):
+            self.resolved_hits += 1
+            return self.remember(resolved)
+
+        message_id = reference.message_id
+        summary = self.get(message_id)
+        if summary is not None:
+            self.cache_hits += 1
+            return summary
+
+        cached = reference.cached_message
+        if cached is not None:
+            self.client_cache_hits += 1
+            return self.remember(cached)
+
+        return UNRESOLVED
+
+    async def fetch(self, channel, message_id: int):
+        """Summary from the shared backend or REST, sharing concurrent requests
+
+        Raises ``discord.NotFound`` / ``discord.Forbidden`` when REST fails.
+        """
+        pending = self._inflight.get(message_id)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        return await self._fetch(channel, message_id)
+
+    def stats(self) -> dict:
+        """Hit/miss counters for each lookup tier"""
+        return {
+            "size": len(self.store),
+            "resolved_hits": self.resolved_hits,
+            "cache_hits": self.cache_hits,
+            "client_cache_hits": self.client_cache_hits,
+            "shared_hits": self.shared_hits,
+            "fetches": self.fetches,
+            "coalesced": self.coalesced,
+        }
+
+    async def _fetch(self, channel, message_id: int):
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[message_id] = future
+        try:
+            summary = None
+            if self.shared is not None:
+                summary = await self._shared_get(message_id)
+            if summary is None:
+                self.fetches += 1
+                summary = self.remember(await channel.fetch_message(message_id))
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure isn't reported by asyncio
+            future.exception()
+            raise
+        else:
+            future.set_result(summary)
+            return summary
+        finally:
+            del self._inflight[message_id]
+
+    async def _shared_get(self, message_id: int):
+        summary = await self.shared.get_summary(message_id)
+        if summary is not None:
+            self.shared_hits += 1
+            self.store.put(summary)
+        return summary
@@ -0,0 +1,337 @@
+"""Keyword and regex auto-response rules compiled into one matcher per scope.
+
+Rules come from a JSON file (``rules.json`` by default):
+
+    {"rules": [
+        {"id": "docs", "keywords": ["documentation", "docs"],
+         "reply": "📚 {mention}, the docs are at https://example.com"},
+        {"id": "ban-appeal", "regex": "\\bunban(ned)?\\b", "guild": 123,
+         "channels": [456], "react": "👀", "cooldown": 60}
+    ]}
+
+A rule applies everywhere, to one guild (``guild``) or to some channels
+(``channels``; thread messages use their parent channel). Every guild and
+channel that has rules of its own gets one ``RuleMatcher`` for all the rules
+that apply there. Channels and guilds without rules share the broader
+matcher, so a message needs one dict lookup to find its matcher.
+
+Inside a matcher, all keywords are merged into a single regex built from a
+trie of the keywords. ``re`` then scans a message once, whatever the number of
+keywords, and each hit is mapped back to its rules with a dict lookup. Regex
+rules are OR-ed into one pattern that rejects most messages in one search.
+Only when it matches are the individual regexes tried to find which rules
+fired. ``reload()`` compiles a new file completely before swapping it in.
+"""
+
+import json
+import os
+import random
+import re
+import time
+
+from templates import Template
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json")
+
+# Seconds a rule stays quiet in a channel after firing there
+DEFAULT_COOLDOWN = 30.0
+
+# Cooldown entries kept before expired ones are swept out
+MAX_COOLDOWNS = 10000
+
+
+def _listed(data: dict, key: str) -> list:
+    """``data[key]`` as a list; a single string or number counts as one item"""
+    value = data.get(key, ())
+    if isinstance(value, (str, int)):
+        return [value]
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"{key!r} must be a list, not {type(value).__name__}")
+    return value
+
+
+def trie_pattern(words) -> str:
+    """Regex source matching any of ``words``, factored by common prefixes
+
+    ``re`` tries alternatives one by one, so ``a|b|c...`` costs time per word
+    at every position. Sharing prefixes makes each position cost about one
+    branch per character instead.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        end = "" in node
+        branches = [
+            re.escape(char) + build(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not end:
+            return branches[0]
+        body = "(?:" + "|".join(branches) + ")"
+        return body + "?" if end else body
+
+    return build(trie)
+
+
+class Rule:
+    """One trigger and the reply and/or reaction it produces"""
+
+    __slots__ = (
+        "id",
+        "keywords",
+        "regex",
+        "guild_id",
+        "channel_ids",
+        "replies",
+        "react",
+        "cooldown",
+    )
+
+    def __init__(self, data: dict):
+        if not isinstance(data, dict):
+            raise ValueError(f"rule must be an object, not {data!r}")
+        self.id = str(data["id"])
+        keywords = _listed(data, "keywords")
+        if not all(isinstance(word, str) for word in keywords):
+            raise ValueError(f"rule {self.id!r} has a keyword that is not a string")
+        self.keywords = tuple(word.casefold() for word in keywords)
+        if not all(self.keywords):
+            raise ValueError(f"rule {self.id!r} has an empty keyword")
+        self.regex = (
+            re.compile(data["regex"], re.IGNORECASE) if data.get("regex") else None
+        )
+        if not self.keywords and self.regex is None:
+            raise ValueError(f"rule {self.id!r} has neither keywords nor regex")
+        self.guild_id = int(data["guild"]) if data.get("guild") else None
+        self.channel_ids = frozenset(int(c) for c in _listed(data, "channels"))
+
+        # Rule replies get no extras: only the member and guild fields exist
+        self.replies = tuple(
+            Template(text, extras=()) for text in _listed(data, "reply")
+        )
+        self.react = data.get("react")
+        if not self.replies and not self.react:
+            raise ValueError(f"rule {self.id!r} has neither reply nor react")
+        self.cooldown = float(data.get("cooldown", DEFAULT_COOLDOWN))
+
+    def render_reply(self, guild, member) -> str:
+        """One of the rule's reply templates, formatted for ``member``"""
+        replies = self.replies
+        template = replies[int(random.random() * len(replies))]
+        return template.render(guild, member, {})
+
+
+class RuleMatcher:
+    """All rules for one scope, compiled into one keyword and one regex pattern"""
+
+    __slots__ = (
+        "rules",
+        "order",
+        "keywords",
+        "keyword_pattern",
+        "regex_rules",
+        "any_regex",
+    )
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+        # rule -> position in the file, to report hits in file order
+        self.order = {rule: i for i, rule in enumerate(self.rules)}
+
+        # keyword -> rules using it, in file order
+        self.keywords = {}
+        for rule in self.rules:
+            for word in rule.keywords:
+                self.keywords.setdefault(word, []).append(rule)
+        self.keyword_pattern = (
+            re.compile(r"(?<!\w)(?:" + trie_pattern(self.keywords) + r")(?!\w)")
+            if self.keywords
+            else None
+        )
+
+        self.regex_rules = tuple(rule for rule in self.rules if rule.regex is not None)
+        self.any_regex = None
+        if self.regex_rules:
+            try:
+                self.any_regex = re.compile(
+                    "|".join(f"(?:{rule.regex.pattern})" for rule in self.regex_rules),
+                    re.IGNORECASE,
+                )
+            except re.error:
+                # e.g. two rules define the same group name; test each rule instead
+                pass
+
+    def match(self, content: str) -> list:
+        """Rules triggered by ``content``, each once, in file order"""
+        hits = set()
+        if self.keyword_pattern is not None:
+            keywords = self.keywords
+            for word in self.keyword_pattern.findall(content.casefold()):
+                hits.update(keywords[word])
+        if self.regex_rules and (
+            self.any_regex is None or self.any_regex.search(content)
+        ):
+            hits.update(rule for rule in self.regex_rules if rule.regex.search(content))
+        if not hits:
+            return []
+        return sorted(hits, key=self.order.__getitem__)
+
+
+class RuleSet:
+    """Parsed rules grouped by scope, with matchers compiled per scope"""
+
+    def __init__(self, rules=()):
+        self.rules = tuple(rules)
+        self.everywhere = tuple(
+            rule
+            for rule in self.rules
+            if rule.guild_id is None and not rule.channel_ids
+        )
+        self.by_guild = {}
+        self.by_channel = {}
+        for rule in self.rules:
+            if rule.channel_ids:
+                for channel_id in rule.channel_ids:
+                    self.by_channel.setdefault(channel_id, []).append(rule)
+            elif rule.guild_id is not None:
+                self.by_guild.setdefault(rule.guild_id, []).append(rule)
+
+        # (guild id or None, channel id or None) -> matcher, None if no rules apply.
+        # Scopes with a known guild are compiled now; channel rules without a
+        # guild are compiled on the channel's first message.
+        self.matchers = {(None, None): self._build(None, None)}
+        for guild_id in self.by_guild:
+            self.matchers[guild_id, None] = self._build(guild_id, None)
+        for channel_id, rules in self.by_channel.items():
+            for guild_id in {rule.guild_id for rule in rules} - {None}:
+                self.matchers[self._key(guild_id, channel_id)] = self._build(
+                    guild_id, channel_id
+                )
+
+    def _key(self, guild_id, channel_id) -> tuple:
+        if channel_id in self.by_channel:
+            return guild_id, channel_id
+        return guild_id if guild_id in self.by_guild else None, None
+
+    def _build(self, guild_id, channel_id):
+        rules = [*self.everywhere, *self.by_guild.get(guild_id, ())]
+        # A channel rule that also names a guild only applies inside it
+        rules += [
+            rule
+            for rule in self.by_channel.get(channel_id, ())
+            if rule.guild_id is None or rule.guild_id == guild_id
+        ]
+        return RuleMatcher(rules) if rules else None
+
+    def matcher(self, guild_id: int, channel_id: int):
+        key = self._key(guild_id, channel_id)
+        try:
+            return self.matchers[key]
+        except KeyError:
+            matcher = self.matchers[key] = self._build(guild_id, channel_id)
+            return matcher
+
+
+class RuleEngine:
+    """Rules from ``path`` indexed by guild and channel, reloadable at runtime"""
+
+    def __init__(self, path: str = DEFAULT_PATH, event_log=None):
+        self.path = path
+        self.event_log = event_log
+        self.reloads = 0
+        self.matched = 0
+
+        self._set = RuleSet()
+        # (rule id, channel id) -> monotonic time the rule may fire again
+        self._cooldowns = {}
+        self.reload()
+
+    @classmethod
+    def from_env(cls, event_log=None):
+        """Build an engine reading the file named by RULES_FILE"""
+        return cls(path=os.getenv("RULES_FILE", DEFAULT_PATH), event_log=event_log)
+
+    @property
+    def rules(self) -> tuple:
+        return self._set.rules
+
+    def reload(self) -> bool:
+        """Re-read the rules file; on error keep the current rules
+
+        A missing file means no rules.
+        """
+        try:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                data = {}
+            if not isinstance(data, dict):
+                raise ValueError("expected an object with a rules list")
+            rules = [Rule(item) for item in _listed(data, "rules")]
+            ids = [rule.id for rule in rules]
+            if len(set(ids)) != len(ids):
+                raise ValueError("rule ids must be unique")
+            ruleset = RuleSet(rules)
+        except (OSError, ValueError, KeyError, TypeError, re.error) as e:
+            if self.event_log is not None:
+                self.event_log.emit(
+                    "rules_reload_failed", path=self.path, error=repr(e)
+                )
+            return False
+
+        # One reference swap, so a match never sees a half-loaded file
+        self._set = ruleset
+        self._cooldowns = {}
+        self.reloads += 1
+        if self.event_log is not None:
+            self.event_log.emit(
+                "rules_loaded",
+                path=self.path,
+                rules=len(ruleset.rules),
+                guilds=len(ruleset.by_guild),
+                channels=len(ruleset.by_channel),
+            )
+        return True
+
+    def match(self, guild_id: int, channel_id: int, content: str) -> list:
+        """Rules that fire for a message, after per-channel cooldowns"""
+        matcher = self._set.matcher(guild_id, channel_id)
+        if matcher is None or not content:
+            return []
+        rules = matcher.match(content)
+        if not rules:
+            return []
+
+        now = time.monotonic()
+        cooldowns = self._cooldowns
+        if len(cooldowns) > MAX_COOLDOWNS:
+            self._cooldowns = cooldowns = {
+                key: until for key, until in cooldowns.items() if until > now
+            }
+        fired = []
+        for rule in rules:
+            key = (rule.id, channel_id)
+            if cooldowns.get(key, 0.0) > now:
+                continue
+            if rule.cooldown:
+                cooldowns[key] = now + rule.cooldown
+            fired.append(rule)
+        self.matched += len(fired)
+        return fired
+
+    def stats(self) -> dict:
+        return {
+            "rules": len(self._set.rules),
+            "matched": self.matched,
+            "reloads": self.reloads,
+            "cooldowns": len(self._cooldowns),
+        }
@@ -0,0 +1,147 @@
+"""Startup timing and the staged post-READY warmup.
+
+``StartupTimer`` records how long the process took to import bot.py, to reach
+READY and to finish warming up, measured from the first line of bot.py.
+
+``Warmup`` runs per-guild indexing and plugin loading as a background task
+after READY, instead of inside ``on_ready``. Each stage works through its
+items in slices and yields to the event loop whenever a slice has used
+``slice_budget`` seconds, so gateway events keep flowing. A stage that uses up
+its total ``budget`` stops early; the items it skipped are handled lazily the
+first time a handler needs them.
+"""
+
+import asyncio
+import inspect
+import os
+import time
+
+
+class StartupTimer:
+    """Seconds from process start to named milestones"""
+
+    def __init__(self, started: float):
+        self.started = started
+        self.marks = {}
+
+    def mark(self, name: str) -> bool:
+        """Record ``name`` the first time it happens; True if it was new"""
+        if name in self.marks:
+            return False
+        self.marks[name] = time.perf_counter() - self.started
+        return True
+
+    def report(self) -> dict:
+        return {f"{name}_s": round(seconds, 3) for name, seconds in self.marks.items()}
+
+
+class _Stage:
+    __slots__ = ("name", "work", "items", "budget")
+
+    def __init__(self, name, work, items, budget):
+        self.name = name
+        self.work = work
+        self.items = items
+        self.budget = budget
+
+
+class Warmup:
+    """Ordered, time-budgeted background stages run after READY"""
+
+    def __init__(
+        self,
+        startup: StartupTimer = None,
+        event_log=None,
+        slice_budget: float = 0.005,
+        stage_budget: float = 30.0,
+    ):
+        self.startup = startup
+        self.event_log = event_log
+        self.slice_budget = slice_budget
+        self.stage_budget = stage_budget
+
+        self.stages = []
+        # stage name -> {"seconds", "done", "total", "truncated"} for the last run
+        self.report = {}
+        self._task = None
+
+    @classmethod
+    def from_env(cls, startup=None, event_log=None):
+        """Build a warmup configured from WARMUP_* environment variables"""
+        return cls(
+            startup=startup,
+            event_log=event_log,
+            slice_budget=float(os.getenv("WARMUP_SLICE_MS", "5")) / 1000,
+            stage_budget=float(os.getenv("WARMUP_STAGE_BUDGET", "30")),
+        )
+
+    def add_stage(self, name: str, work, items=None, budget: float = None):
+        """Run ``work(item)`` for every item of ``items()``, or ``work()`` once
+
+        ``work`` may be a plain function or a coroutine function.
+        """
+        self.stages.append(
+            _Stage(
+                name, work, items, budget if budget is not None else self.stage_budget
+            )
+        )
+
+    def start(self) -> asyncio.Task:
+        """Start (or restart, after a reconnect) the warmup in the background"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = asyncio.create_task(self.run(), name="warmup")
+        return self._task
+
+    async def wait(self):
+        """Wait for the current warmup run to finish"""
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def run(self):
+        self.report = {}
+        for stage in self.stages:
+            self.report[stage.name] = await self._run_stage(stage)
+
+        if self.event_log is not None:
+            self.event_log.emit("warmup", stages=self.report)
+            if self.startup is not None and self.startup.mark("warm"):
+                self.event_log.emit(
+                    "startup", **self.startup.report(), stages=self.report
+                )
+
+    async def _run_stage(self, stage: _Stage) -> dict:
+        is_async = inspect.iscoroutinefunction(stage.work)
+        items = list(stage.items()) if stage.items is not None else [None]
+        clock = time.perf_counter
+        started = slice_started = clock()
+        done = 0
+
+        for item in items:
+            now = clock()
+            if now - started > stage.budget:
+                break
+            if now - slice_started > self.slice_budget:
+                # Let queued gateway events run before the next slice
+                await asyncio.sleep(0)
+                slice_started = clock()
+
+            args = () if stage.items is None else (item,)
+            try:
+                if is_async:
+                    await stage.work(*args)
+                else:
+                    stage.work(*args)
+            except Exception as e:
+                if self.event_log is not None:
+                    self.event_log.emit(
+                        "warmup_failed", stage=stage.name, error=repr(e)
+                    )
+            done += 1
+
+        return {
+            "seconds": round(clock() - started, 4),
+            "done": done,
+            "total": len(items),
+            "truncated": done < len(items),
+        }
@@ -0,0 +1,679 @@
+"""State shared between bot processes: message summaries and dedupe claims.
+
+Every backend stores short byte values under string keys, each with an
+optional TTL, and implements four primitives. The high-level methods the bot
+calls are built on top of those:
+
+- ``put_summary`` / ``get_summary`` / ``delete_summary`` hold the
+  ``MessageSummary`` of messages any instance has seen. Reply lookups and raw
+  events then rarely need ``fetch_message``.
+- ``claim`` atomically takes a key for ``ttl`` seconds. It returns False when
+  another process already holds the key, so only one instance acts on an event
+  that several of them receive.
+
+Writes never block: they are queued and sent or committed in batches. Reads
+are batched too. All ``get_*`` calls made in the same event loop iteration
+become one backend round trip (an ``MGET``, or one ``SELECT ... IN``).
+When the backend is unreachable, or does not answer within ``timeout``
+seconds, reads miss and claims succeed: an outage costs extra REST calls or a
+duplicate reply, never a lost one.
+
+Backends, chosen with ``StateBackend.from_env`` from STATE_BACKEND:
+
+- ``memory``: one process only, for tests and single-instance runs
+- ``sqlite:PATH``: a WAL database shared by every process on the host
+- ``redis://[:password@]host:port/db``: any server speaking the Redis protocol
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from batch_writer import BatchWriter
+from message_store import pack_summary, unpack_summary
+
+# Key namespaces under the backend's prefix
+SUMMARY = "msg:"
+CLAIM = "claim:"
+
+# Keys per batched read; larger batches are split
+MAX_BATCH = 500
+
+
+class StateError(Exception):
+    """The backend could not be reached or refused a command"""
+
+
+class ReadBatcher:
+    """Coalesces reads made in one loop iteration into one ``fetch_many`` call
+
+    ``fetch_many`` is an async function from a list of keys to their values in
+    the same order. Concurrent reads of the same key share one lookup; each
+    caller still gets a future of its own, so cancelling one leaves the others.
+    """
+
+    def __init__(self, fetch_many, max_batch: int = MAX_BATCH):
+        self._fetch_many = fetch_many
+        self.max_batch = max_batch
+        # key -> futures waiting for it
+        self._pending = {}
+        self._scheduled = False
+
+        self.batches = 0
+        self.keys = 0
+
+    def get(self, key: str) -> asyncio.Future:
+        """Future for the value of ``key``, resolved by the next batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiters = self._pending.get(key)
+        if waiters is not None:
+            waiters.append(future)
+            return future
+        self._pending[key] = [future]
+        if not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._flush)
+        return future
+
+    def _flush(self):
+        pending = list(self._pending.items())
+        self._pending = {}
+        self._scheduled = False
+        for start in range(0, len(pending), self.max_batch):
+            asyncio.ensure_future(self._run(pending[start : start + self.max_batch]))
+
+    async def _run(self, pending: list):
+        self.batches += 1
+        self.keys += len(pending)
+        try:
+            values = await self._fetch_many([key for key, _ in pending])
+        except Exception as e:
+            for _, waiters in pending:
+                for future in waiters:
+                    if not future.done():
+                        future.set_exception(e)
+                        # The waiter may be gone; don't let asyncio report it
+                        future.exception()
+            return
+        for (_, waiters), value in zip(pending, values):
+            for future in waiters:
+                if not future.done():
+                    future.set_result(value)
+
+
+class StateBackend:
+    """Shared key/value state with TTLs; subclasses implement the primitives
+
+    ``_get_many(keys)`` (async, values or None in key order), ``_put(key,
+    value, ttl)`` and ``_delete(key)`` (queued, never blocking) and
+    ``_claim(key, ttl)`` (async, True if the key was free).
+    """
+
+    def __init__(
+        self, prefix: str = "bot:", summary_ttl: float = 600.0, timeout: float = 1.0
+    ):
+        self.prefix = prefix
+        self.summary_ttl = summary_ttl
+        self.timeout = timeout
+        self._reads = ReadBatcher(self._get_many)
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.claims = 0
+        self.claims_lost = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls, event_log=None):
+        """Build the backend named by STATE_BACKEND (memory, sqlite:PATH, redis://...)"""
+        url = os.getenv("STATE_BACKEND", "memory")
+        options = {
+            "prefix": os.getenv("STATE_PREFIX", "bot:"),
+            "summary_ttl": float(os.getenv("STATE_SUMMARY_TTL", "600")),
+            "timeout": float(os.getenv("STATE_TIMEOUT", "1")),
+        }
+        if url == "memory":
+            return MemoryBackend(**options)
+        if url.startswith("sqlite:"):
+            return SQLiteBackend(
+                url.removeprefix("sqlite:").removeprefix("//"),
+                event_log=event_log,
+                **options,
+            )
+        if url.startswith("redis://"):
+            return RedisBackend.from_url(url, event_log=event_log, **options)
+        raise ValueError(f"unknown STATE_BACKEND {url!r}")
+
+    def start(self):
+        """Start background work (a writer thread for SQLite)"""
+
+    def close(self):
+        """Flush queued writes and release connections"""
+
+    def put_summary(self, summary):
+        self.writes += 1
+        self._put(
+            self.prefix + SUMMARY + str(summary.id),
+            pack_summary(summary),
+            self.summary_ttl,
+        )
+
+    def delete_summary(self, message_id: int):
+        self._delete(self.prefix + SUMMARY + str(message_id))
+
+    async def get_summary(self, message_id: int):
+        """Summary stored by any process, or None"""
+        blob = await self._read(self.prefix + SUMMARY + str(message_id))
+        if blob is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return unpack_summary(message_id, blob)
+
+    async def claim(self, key: str, ttl: float) -> bool:
+        """Take ``key`` for ``ttl`` seconds; False if another process holds it"""
+        self.claims += 1
+        try:
+            claimed = await asyncio.wait_for(
+                self._claim(self.prefix + CLAIM + key, ttl), self.timeout
+            )
+        except asyncio.TimeoutError:
+            self._timed_out()
+            return True
+        except StateError:
+            self.errors += 1
+            return True
+        if not claimed:
+            self.claims_lost += 1
+        return claimed
+
+    async def _read(self, key: str):
+        try:
+            return await asyncio.wait_for(self._reads.get(key), self.timeout)
+        except asyncio.TimeoutError:
+            self._timed_out()
+            return None
+        except StateError:
+            self.errors += 1
+            return None
+
+    def _timed_out(self):
+        """A read or claim got no answer within ``timeout`` seconds"""
+        self.errors += 1
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "read_batches": self._reads.batches,
+            "read_keys": self._reads.keys,
+            "writes": self.writes,
+            "claims": self.claims,
+            "claims_lost": self.claims_lost,
+            "errors": self.errors,
+        }
+
+    async def _get_many(self, keys: list) -> list:
+        raise NotImplementedError
+
+    def _put(self, key: str, value: bytes, ttl):
+        raise NotImplementedError
+
+    def _delete(self, key: str):
+        raise NotImplementedError
+
+    async def _claim(self, key: str, ttl: float) -> bool:
+        raise NotImplementedError
+
+
+class MemoryBackend(StateBackend):
+    """Process-local backend: a dict with expiry times and a size cap"""
+
+    def __init__(self, max_entries: int = 100000, **options):
+        super().__init__(**options)
+        # Nothing in-process can stall, so claims skip the timeout task
+        self.timeout = None
+        self.max_entries = max_entries
+        # key -> (expires at, value), oldest write first
+        self._entries = OrderedDict()
+
+    async def _read(self, key: str):
+        # Nothing to batch in-process
+        return self._get(key)
+
+    async def _get_many(self, keys: list) -> list:
+        return [self._get(key) for key in keys]
+
+    def _get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry[1]
+
+    def _put(self, key: str, value: bytes, ttl):
+        expires = time.monotonic() + ttl if ttl else math.inf
+        entries = self._entries
+        entries[key] = (expires, value)
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def _delete(self, key: str):
+        self._entries.pop(key, None)
+
+    async def _claim(self, key: str, ttl: float) -> bool:
+        if self._get(key) is not None:
+            return False
+        self._put(key, b"1", ttl)
+        return True
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS state_expires ON state (expires);
+"""
+
+# Claim: insert, or take over an expired row; one changed row means claimed
+SQLITE_CLAIM = (
+    "INSERT INTO state (key, value, expires) VALUES (?, x'31', ?)"
+    " ON CONFLICT (key) DO UPDATE SET expires = excluded.expires"
+    " WHERE state.expires IS NOT NULL AND state.expires <= ?"
+)
+
+
+class SQLiteBackend(StateBackend):
+    """Backend in one WAL-mode SQLite file shared by the processes on a host
+
+    Writes go through a ``BatchWriter``, one transaction per batch, like
+    ``EventStore``. Reads and claims run on a reader thread of their own with
+    a second connection, so a busy database never blocks the event loop. The
+    read batcher already merges concurrent reads, so one thread is enough.
+    WAL reads don't wait for the writer, and a claim waits at most for the
+    batch being committed. Expiry uses wall-clock time, since the processes
+    share no monotonic clock.
+    """
+
+    def __init__(
+        self,
+        path: str = "state.db",
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        max_queue: int = 100000,
+        sweep_interval: float = 60.0,
+        event_log=None,
+        **options,
+    ):
+        super().__init__(**options)
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.sweep_interval = sweep_interval
+        self.event_log = event_log
+
+        self.expired = 0
+
+        self._writer = BatchWriter(
+            self._write,
+            "state-writer",
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            max_queue=max_queue,
+            connect=self._connect_writer,
+            disconnect=lambda connection: connection.close(),
+            maintain=self._sweep,
+            maintain_interval=sweep_interval,
+            on_error=self._write_failed,
+        )
+        self._executor = None
+        # Used on the reader thread only
+        self._reader = None
+
+    @property
+    def dropped(self) -> int:
+        return self._writer.dropped
+
+    def start(self):
+        """Start the writer thread (which creates the schema)"""
+        self._writer.start()
+
+    def close(self, timeout: float = 10.0):
+        """Commit everything still queued and stop the writer and reader threads"""
+        self._writer.close(timeout)
+        if self._executor is not None:
+            self._executor.submit(self._close_reader)
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "queued": len(self._writer),
+            "dropped": self.dropped,
+            "expired": self.expired,
+        }
+
+    async def _get_many(self, keys: list) -> list:
+        return await self._on_reader(self._select, keys)
+
+    def _put(self, key: str, value: bytes, ttl):
+        self._writer.put((key, value, time.time() + ttl if ttl else None))
+
+    def _delete(self, key: str):
+        # A row that expired long ago is the same as a deleted one
+        self._writer.put((key, b"", 0.0))
+
+    async def _claim(self, key: str, ttl: float) -> bool:
+        return await self._on_reader(self._insert_claim, key, ttl)
+
+    async def _on_reader(self, func, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(1, thread_name_prefix="state-reader")
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
+    def _connection(self):
+        if self._reader is None:
+            import sqlite3
+
+            self._reader = sqlite3.connect(self.path, isolation_level=None, timeout=1.0)
+        return self._reader
+
+    def _close_reader(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def _select(self, keys: list) -> list:
+        import sqlite3
+
+        try:
+            rows = dict(
+                self._connection().execute(
+                    "SELECT key, value FROM state WHERE key IN"
+                    f" ({','.join('?' * len(keys))})"
+                    " AND (expires IS NULL OR expires > ?)",
+                    (*keys, time.time()),
+                )
+            )
+        except sqlite3.Error as e:
+            raise StateError(repr(e)) from e
+        return [rows.get(key) for key in keys]
+
+    def _insert_claim(self, key: str, ttl: float) -> bool:
+        import sqlite3
+
+        now = time.time()
+        try:
+            cursor = self._connection().execute(SQLITE_CLAIM, (key, now + ttl, now))
+        except sqlite3.Error as e:
+            raise StateError(repr(e)) from e
+        return cursor.rowcount == 1
+
+    def _connect_writer(self):
+        import sqlite3
+
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.executescript(SQLITE_SCHEMA)
+        return connection
+
+    def _write(self, connection, batch):
+        import sqlite3
+
+        try:
+            connection.execute("BEGIN")
+            connection.executemany(
+                "INSERT OR REPLACE INTO state (key, value, expires) VALUES (?, ?, ?)",
+                batch,
+            )
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+
+    def _write_failed(self, error: Exception, rows: int):
+        if self.event_log is not None:
+            self.event_log.emit("state_write_failed", error=repr(error), rows=rows)
+
+    def _sweep(self, connection):
+        import sqlite3
+
+        try:
+            self.expired += connection.execute(
+                "DELETE FROM state WHERE expires <= ?", (time.time(),)
+            ).rowcount
+        except sqlite3.Error as e:
+            if self.event_log is not None:
+                self.event_log.emit("state_sweep_failed", error=repr(e))
+
+
+def encode_command(*args) -> bytes:
+    """One Redis command as a RESP array of bulk strings"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, int):
+            arg = b"%d" % arg
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader):
+    """Read one RESP reply; error replies are returned as StateError instances"""
+    line = await reader.readuntil(b"\r\n")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        count = int(body)
+        if count < 0:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    if kind == b":":
+        return int(body)
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        return StateError(body.decode(errors="replace"))
+    raise StateError(f"unexpected reply {line!r}")
+
+
+class RedisBackend(StateBackend):
+    """Backend on a Redis-protocol server over one pipelined connection
+
+    Commands are written as they are issued, without waiting for earlier
+    replies. Replies come back in order and resolve the matching waiters, so
+    concurrent handlers share the connection and each pays about one round
+    trip. Writes are fire-and-forget. If the connection drops, pending reads
+    and claims fail with ``StateError`` and the next command reconnects
+    (after ``retry_interval`` if connecting failed).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        db: int = 0,
+        password: str = None,
+        retry_interval: float = 1.0,
+        event_log=None,
+        **options,
+    ):
+        super().__init__(**options)
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.retry_interval = retry_interval
+        self.event_log = event_log
+
+        self.dropped = 0
+
+        self._writer = None
+        self._connecting = None
+        self._replies = None
+        self._retry_at = 0.0
+        # One entry per command sent: its future, or None for fire-and-forget
+        self._waiting = deque()
+        self._out = []
+        self._flush_scheduled = False
+
+    @classmethod
+    def from_url(cls, url: str, event_log=None, **options):
+        """Backend for ``redis://[:password@]host[:port][/db]``"""
+        parsed = urlparse(url)
+        return cls(
+            host=parsed.hostname or "127.0.0.1",
+            port=parsed.port or 6379,
+            db=int(parsed.path.lstrip("/") or 0),
+            password=parsed.password,
+            event_log=event_log,
+            **options,
+        )
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "pending": len(self._waiting),
+            "dropped": self.dropped,
+        }
+
+    async def _get_many(self, keys: list) -> list:
+        return await self._call("MGET", *keys)
+
+    def _put(self, key: str, value: bytes, ttl):
+        if ttl:
+            self._send(encode_command("SET", key, value, "PX", int(ttl * 1000)))
+        else:
+            self._send(encode_command("SET", key, value))
+
+    def _delete(self, key: str):
+        self._send(encode_command("DEL", key))
+
+    async def _claim(self, key: str, ttl: float) -> bool:
+        reply = await self._call("SET", key, "1", "NX", "PX", int(ttl * 1000))
+        return reply == "OK"
+
+    async def _call(self, *args):
+        future = asyncio.get_running_loop().create_future()
+        if not self._send(encode_command(*args), future):
+            raise StateError(f"not connected to {self.host}:{self.port}")
+        reply = await future
+        if isinstance(reply, StateError):
+            raise reply
+        return reply
+
+    def _send(self, command: bytes, future=None) -> bool:
+        """Queue a command for the next write; False if the server is unreachable"""
+        if self._writer is None and self._connecting is None:
+            if time.monotonic() < self._retry_at:
+                if future is None:
+                    self.dropped += 1
+                return False
+            self._connecting = asyncio.ensure_future(self._connect())
+        self._out.append(command)
+        self._waiting.append(future)
+        if not self._flush_scheduled and self._writer is not None:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+        return True
+
+    def _flush(self):
+        self._flush_scheduled = False
+        if self._writer is None or not self._out:
+            return
+        # Everything issued this loop iteration goes out in one write
+        self._writer.write(b"".join(self._out))
+        self._out = []
+
+    async def _connect(self):
+        # Setup commands go ahead of anything queued while connecting
+        setup = []
+        if self.password:
+            setup.append(encode_command("AUTH", self.password))
+        if self.db:
+            setup.append(encode_command("SELECT", self.db))
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        except OSError as e:
+            self._retry_at = time.monotonic() + self.retry_interval
+            self._fail(StateError(repr(e)))
+            return
+        finally:
+            self._connecting = None
+        self._out[:0] = setup
+        self._waiting.extendleft([None] * len(setup))
+        self._writer = writer
+        self._replies = asyncio.ensure_future(self._read_replies(reader, writer))
+        self._flush()
+
+    async def _read_replies(self, reader, writer):
+        try:
+            while True:
+                reply = await read_reply(reader)
+                future = self._waiting.popleft()
+                if future is None:
+                    if isinstance(reply, StateError):
+                        self.errors += 1
+                elif not future.done():
+                    future.set_result(reply)
+        except Exception as e:
+            # A malformed or unsolicited reply leaves the stream out of step
+            # with ``_waiting``, so it drops the connection like a socket error
+            error = e if isinstance(e, StateError) else StateError(repr(e))
+        self._drop(writer, error)
+
+    def _timed_out(self):
+        super()._timed_out()
+        # A server that stopped answering would stall every later command too
+        if self._writer is not None:
+            self._drop(self._writer, StateError("timed out"))
+
+    def _drop(self, writer, error: StateError):
+        """Close ``writer`` and fail its pending commands, unless already replaced"""
+        if self._writer is writer:
+            self._writer = None
+            writer.close()
+            self._fail(error)
+
+    def _fail(self, error: StateError):
+        """Fail every pending command after the connection was lost"""
+        self.errors += 1
+        if self.event_log is not None:
+            self.event_log.emit(
+                "state_disconnected", host=self.host, port=self.port, error=str(error)
+            )
+        waiting, self._waiting = self._waiting, deque()
+        self._out = []
+        for future in waiting:
+            if future is None:
+                self.dropped += 1
+            elif not future.done():
+                future.set_exception(error)
+                future.exception()
@@ -0,0 +1,163 @@
+"""Message and thread-title templates loaded from a JSON file.
+
+Templates are ``str.format`` strings grouped by key (``welcome``,
+``questions_title``, ...) under ``default``, with optional per-guild overrides
+under ``guilds``. The file is parsed once: each template records which fields
+it uses, and every guild's override is merged with the defaults up front. A
+render picks one template index and formats only that template, computing only
+the fields it references. ``reload()`` swaps in a freshly parsed file without
+a restart.
+
+Fields: ``{mention}``, ``{name}``, ``{display_name}`` (of the member or message
+author), ``{guild}`` (the guild name) and any extras the caller passes, such as
+``{names}`` and ``{more}`` for combined greetings.
+"""
+
+import json
+import os
+import random
+import string
+from operator import attrgetter
+
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "templates.json"
+)
+
+# Field -> (read from the guild?, attribute), computed only when referenced
+FIELDS = {
+    "mention": (False, attrgetter("mention")),
+    "name": (False, attrgetter("name")),
+    "display_name": (False, attrgetter("display_name")),
+    "guild": (True, attrgetter("name")),
+}
+
+# Fields the bot passes explicitly for combined greetings
+EXTRAS = ("names", "more")
+
+# Keys the default set must define
+KEYS = (
+    "welcome",
+    "goodbye",
+    "welcome_batch",
+    "goodbye_batch",
+    "questions_title",
+    "questions_reply",
+    "questions_forbidden",
+    "questions_error",
+    "mention_title",
+    "mention_reply",
+    "mention_forbidden",
+    "mention_error",
+)
+
+_formatter = string.Formatter()
+
+
+class Template:
+    """One format string and the fields it references"""
+
+    __slots__ = ("text", "fields")
+
+    def __init__(self, text: str, extras=EXTRAS):
+        self.text = text
+        self.fields = tuple(
+            {field for _, field, _, _ in _formatter.parse(text) if field is not None}
+        )
+        for field in self.fields:
+            if field not in FIELDS and field not in extras:
+                raise ValueError(f"Unknown template field {{{field}}} in {text!r}")
+
+    def render(self, guild, member, extra: dict) -> str:
+        values = {}
+        for field in self.fields:
+            if field in extra:
+                values[field] = extra[field]
+            else:
+                from_guild, get = FIELDS[field]
+                values[field] = get(guild if from_guild else member)
+        return self.text.format_map(values)
+
+
+def _compile(sets: dict, where: str) -> dict:
+    if not isinstance(sets, dict):
+        raise ValueError(f"{where}: expected an object of templates")
+    compiled = {}
+    for key, texts in sets.items():
+        if isinstance(texts, str):
+            texts = [texts]
+        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+            raise ValueError(f"{where}: {key!r} must be a string or a list of strings")
+        if not texts:
+            raise ValueError(f"{where}: template list {key!r} is empty")
+        compiled[key] = tuple(Template(text) for text in texts)
+    return compiled
+
+
+class TemplateStore:
+    """Default and per-guild template sets, reloadable from ``path``"""
+
+    def __init__(self, path: str = DEFAULT_PATH, event_log=None):
+        self.path = path
+        self.event_log = event_log
+        self.reloads = 0
+
+        # guild id -> merged template sets; None holds the defaults
+        self._sets = {None: {}}
+        self.reload(raise_errors=True)
+
+    @classmethod
+    def from_env(cls, event_log=None):
+        """Build a store reading the file named by TEMPLATES_FILE"""
+        return cls(path=os.getenv("TEMPLATES_FILE", DEFAULT_PATH), event_log=event_log)
+
+    def reload(self, raise_errors: bool = False) -> bool:
+        """Re-read the template file; on error keep the current templates"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("expected an object with default and guilds")
+            guilds = data.get("guilds", {})
+            if not isinstance(guilds, dict):
+                raise ValueError("guilds: expected an object keyed by guild id")
+            default = _compile(data.get("default", {}), "default")
+            missing = [key for key in KEYS if key not in default]
+            if missing:
+                raise ValueError(f"default: missing templates {missing}")
+            sets = {
+                int(guild_id): {**default, **_compile(overrides, f"guild {guild_id}")}
+                for guild_id, overrides in guilds.items()
+            }
+            sets[None] = default
+        except (OSError, ValueError) as e:
+            if raise_errors:
+                raise
+            if self.event_log is not None:
+                self.event_log.emit(
+                    "templates_reload_failed", path=self.path, error=repr(e)
+                )
+            return False
+
+        # One reference swap, so a render never sees a half-loaded file
+        self._sets = sets
+        self.reloads += 1
+        if self.event_log is not None:
+            self.event_log.emit(
+                "templates_loaded",
+                path=self.path,
+                keys=len(default),
+                guild_overrides=len(sets) - 1,
+            )
+        return True
+
+    def pick(self, key: str, guild_id: int = None) -> Template:
+        """Choose one template for ``key``, honouring the guild's overrides"""
+        sets = self._sets
+        templates = (sets.get(guild_id) or sets[None])[key]
+        if len(templates) == 1:
+            return templates[0]
+        return templates[int(random.random() * len(templates))]
+
+    def render(self, key: str, guild, member, **extra) -> str:
+        """Pick a template for ``key`` and format only that one"""
+        return self.pick(key, guild.id).render(guild, member, extra)
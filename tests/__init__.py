@@ -0,0 +1 @@
+"""Tests for the bot's services. Run with ``python -m pytest`` from the repository root."""
@@ -0,0 +1,144 @@
+"""Admission control: queue limits, priority hand-off and what gets shed."""
+
+import asyncio
+
+import pytest
+
+from admission import (
+    CLASS_COMMAND,
+    CLASS_MEMBER,
+    CLASS_MESSAGE,
+    DEBUG_LOG,
+    DROP_OLDEST,
+    REPLY_LOOKUP,
+    AdmissionController,
+)
+from benchmarks.replay import (
+    GUILD_ID,
+    ReplayEnvironment,
+    join_stream,
+    message_stream,
+    replay,
+)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_full_queue_sheds_the_newest_handler():
+    async def scenario():
+        admission = AdmissionController(concurrency=1, limits={CLASS_MESSAGE: (1, 1)})
+        assert await admission.acquire(CLASS_MESSAGE)
+        waiting = asyncio.ensure_future(admission.acquire(CLASS_MESSAGE))
+        await asyncio.sleep(0)
+        shed = await admission.acquire(CLASS_MESSAGE)
+        admission.release(CLASS_MESSAGE)
+        return shed, await waiting, admission.stats()
+
+    shed, admitted, stats = run(scenario())
+    assert shed is False
+    assert admitted is True
+    assert stats["message_shed"] == 1
+    assert stats["message_admitted"] == 2
+
+
+def test_drop_oldest_sheds_the_longest_waiting_handler():
+    async def scenario():
+        admission = AdmissionController(
+            concurrency=1, limits={CLASS_MESSAGE: (1, 1)}, policy=DROP_OLDEST
+        )
+        assert await admission.acquire(CLASS_MESSAGE)
+        oldest = asyncio.ensure_future(admission.acquire(CLASS_MESSAGE))
+        await asyncio.sleep(0)
+        newest = asyncio.ensure_future(admission.acquire(CLASS_MESSAGE))
+        await asyncio.sleep(0)
+        admission.release(CLASS_MESSAGE)
+        return await oldest, await newest
+
+    assert run(scenario()) == (False, True)
+
+
+def test_commands_overtake_queued_messages():
+    async def scenario():
+        admission = AdmissionController(concurrency=1)
+        order = []
+
+        async def handler(name, label):
+            if await admission.acquire(name):
+                order.append(label)
+                admission.release(name)
+
+        assert await admission.acquire(CLASS_MESSAGE)
+        tasks = [
+            asyncio.ensure_future(handler(CLASS_MESSAGE, "message 1")),
+            asyncio.ensure_future(handler(CLASS_MESSAGE, "message 2")),
+            asyncio.ensure_future(handler(CLASS_COMMAND, "command")),
+        ]
+        await asyncio.sleep(0)
+        admission.release(CLASS_MESSAGE)
+        await asyncio.gather(*tasks)
+        return order
+
+    assert run(scenario()) == ["command", "message 1", "message 2"]
+
+
+def test_optional_features_shed_by_pressure():
+    async def scenario():
+        admission = AdmissionController(concurrency=4)
+        results = []
+        for _ in range(4):
+            await admission.acquire(CLASS_MEMBER)
+            results.append((admission.allow(DEBUG_LOG), admission.allow(REPLY_LOOKUP)))
+        return results, admission.stats()
+
+    results, stats = run(scenario())
+    # Pressure 0.25, 0.5, 0.75, 1.0: debug logs go first, lookups at capacity
+    assert results == [(True, True), (True, True), (False, True), (False, False)]
+    assert stats["debug_log_shed"] == 2
+    assert stats["reply_lookup_shed"] == 1
+
+
+@pytest.fixture(scope="module")
+def env():
+    environment = ReplayEnvironment()
+    asyncio.set_event_loop(loop := asyncio.new_event_loop())
+    loop.run_until_complete(environment.setup())
+    yield environment
+    loop.run_until_complete(environment.close())
+    loop.close()
+    asyncio.set_event_loop(None)
+
+
+def test_shed_handlers_still_do_bookkeeping(env):
+    module = env.module
+    loop = env.bot.loop
+    emitted = []
+    emit = module.event_log.emit
+
+    async def shed(name):
+        return False
+
+    module.admission.acquire = shed
+    module.event_log.emit = lambda event, **fields: emitted.append(event)
+    counters = module.member_stats.get(env.bot.get_guild(GUILD_ID))
+    members = counters.total
+    calls = sum(env.http.calls.values())
+    greeter = env.bot.get_cog("Welcome").greeter
+    greetings = greeter.stats()
+    messages = message_stream(40, start_id=10**17)
+    try:
+        loop.run_until_complete(replay(env, join_stream(50, start_id=10**17)))
+        loop.run_until_complete(replay(env, messages))
+    finally:
+        del module.admission.acquire
+        module.event_log.emit = emit
+
+    # Counters and the reply cache are kept for every event...
+    assert counters.total == members + 50
+    assert all(module.reply_cache.get(int(e["d"]["id"])) for e in messages)
+    # ...while logging, greetings, threads and mention replies are shed
+    assert "member_join" not in emitted
+    assert "message" not in emitted
+    assert greeter.stats() == greetings
+    assert sum(env.http.calls.values()) == calls
@@ -0,0 +1,128 @@
+"""Outbound scheduler: priority order, queue bounds and per-route rate limits."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from benchmarks.bench_admission import FakeHTTP
+from outbound import (
+    PRIORITY_COMMAND,
+    PRIORITY_THREAD,
+    PRIORITY_WELCOME,
+    OutboundQueueFull,
+    OutboundScheduler,
+)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_actions_run_in_priority_order():
+    async def scenario():
+        http = FakeHTTP(latency=0.001, capacity=1)
+        scheduler = OutboundScheduler(concurrency=1)
+        sent = []
+
+        async def send(label):
+            sent.append(await http.request(label))
+
+        submitted = [
+            ("welcome 1", PRIORITY_WELCOME),
+            ("thread 1", PRIORITY_THREAD),
+            ("command 1", PRIORITY_COMMAND),
+            ("welcome 2", PRIORITY_WELCOME),
+            ("command 2", PRIORITY_COMMAND),
+            ("thread 2", PRIORITY_THREAD),
+        ]
+        futures = [
+            scheduler.submit(("channel", 1), lambda label=label: send(label), priority)
+            for label, priority in submitted
+        ]
+        await asyncio.gather(*futures)
+        await scheduler.close()
+        return sent, http.requests, scheduler.stats()
+
+    sent, requests, stats = run(scenario())
+    # Lower priority values first, submission order within a priority
+    assert sent == [
+        "command 1",
+        "command 2",
+        "thread 1",
+        "thread 2",
+        "welcome 1",
+        "welcome 2",
+    ]
+    assert requests == 6
+    assert stats["completed"] == 6
+    assert stats["failed"] == stats["dropped"] == 0
+
+
+def test_full_queue_fails_the_new_action():
+    async def scenario():
+        scheduler = OutboundScheduler(concurrency=1, max_queue=2)
+        http = FakeHTTP(latency=0.001, capacity=1)
+        futures = [
+            scheduler.submit(("channel", 1), lambda: http.request("reply"))
+            for _ in range(3)
+        ]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        await scheduler.close()
+        return results, scheduler.stats()
+
+    results, stats = run(scenario())
+    assert results[:2] == ["reply", "reply"]
+    assert isinstance(results[2], OutboundQueueFull)
+    assert stats["dropped"] == 1
+
+
+def test_rate_limited_route_waits_while_others_run():
+    async def scenario():
+        scheduler = OutboundScheduler(concurrency=2)
+        started = {}
+        limited = SimpleNamespace(
+            status=200,
+            headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.1"},
+        )
+
+        async def send(label, response=None):
+            started[label] = time.monotonic()
+            return response
+
+        begin = time.monotonic()
+        first = scheduler.submit(("channel", 1), lambda: send("first", limited))
+        await first
+        await asyncio.gather(
+            scheduler.submit(("channel", 1), lambda: send("same route")),
+            scheduler.submit(("channel", 2), lambda: send("other route")),
+        )
+        await scheduler.close()
+        return {label: at - begin for label, at in started.items()}, scheduler.stats()
+
+    started, stats = run(scenario())
+    assert started["same route"] >= 0.09
+    assert started["other route"] < 0.05
+    assert stats["rate_limited"] == 1
+
+
+def test_failed_action_does_not_stop_the_queue():
+    async def scenario():
+        scheduler = OutboundScheduler(concurrency=1)
+
+        async def fail():
+            raise RuntimeError("send failed")
+
+        async def succeed():
+            return "sent"
+
+        failed = scheduler.submit(("channel", 1), fail)
+        ok = scheduler.submit(("channel", 1), succeed)
+        results = await asyncio.gather(failed, ok, return_exceptions=True)
+        await scheduler.close()
+        return results, scheduler.stats()
+
+    (error, result), stats = run(scenario())
+    assert isinstance(error, RuntimeError)
+    assert result == "sent"
+    assert stats["failed"] == 1
+    assert stats["completed"] == 1
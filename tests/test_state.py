@@ -0,0 +1,126 @@
+"""Shared state against benchmarks.fake_redis: claims, reconnects and timeouts."""
+
+import asyncio
+
+from benchmarks.fake_redis import FakeRedis
+from state import MemoryBackend, RedisBackend
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def start_server():
+    server = FakeRedis()
+    host, port = await server.start()
+    return server, host, port
+
+
+def test_claim_is_exclusive_across_processes():
+    async def scenario():
+        server, host, port = await start_server()
+        first = RedisBackend(host=host, port=port)
+        second = RedisBackend(host=host, port=port)
+        try:
+            results = await asyncio.gather(
+                *(backend.claim("thread:1", 60) for backend in (first, second) * 5)
+            )
+            again = await first.claim("thread:1", 60)
+            other = await second.claim("thread:2", 60)
+        finally:
+            first.close()
+            second.close()
+            await server.stop()
+        return results, again, other, first, second
+
+    results, again, other, first, second = run(scenario())
+    assert results.count(True) == 1
+    assert again is False
+    assert other is True
+    assert first.errors == second.errors == 0
+    assert first.claims_lost + second.claims_lost == 10
+
+
+def test_memory_claim_expires():
+    async def scenario():
+        backend = MemoryBackend()
+        taken = await backend.claim("reply:1", 0.01)
+        held = await backend.claim("reply:1", 0.01)
+        await asyncio.sleep(0.02)
+        return taken, held, await backend.claim("reply:1", 0.01)
+
+    assert run(scenario()) == (True, False, True)
+
+
+def test_reconnects_after_dropped_connection():
+    async def scenario():
+        server, host, port = await start_server()
+        backend = RedisBackend(host=host, port=port, retry_interval=0)
+        try:
+            assert await backend.claim("a", 60) is True
+            server.disconnect()
+            # Let the reader see the connection close
+            await asyncio.sleep(0.05)
+            disconnected = backend.errors
+            # The next command reconnects; the claim from before is still held
+            lost = await backend.claim("a", 60)
+            fresh = await backend.claim("b", 60)
+            missing = await backend.get_summary(1)
+        finally:
+            backend.close()
+            await server.stop()
+        return disconnected, lost, fresh, missing
+
+    disconnected, lost, fresh, missing = run(scenario())
+    assert disconnected == 1
+    assert lost is False
+    assert fresh is True
+    assert missing is None
+
+
+def test_unreachable_server_fails_open():
+    async def scenario():
+        server, host, port = await start_server()
+        await server.stop()
+        backend = RedisBackend(host=host, port=port, retry_interval=60)
+        claimed = await backend.claim("a", 60)
+        summary = await backend.get_summary(1)
+        return backend, claimed, summary
+
+    backend, claimed, summary = run(scenario())
+    # Reads miss and claims succeed, so an outage never loses a reply
+    assert claimed is True
+    assert summary is None
+    assert backend.errors >= 2
+
+
+def test_hung_server_times_out_and_bad_reply_drops_connection():
+    async def scenario():
+        async def hang(reader, writer):
+            await reader.read()
+
+        async def garbage(reader, writer):
+            await reader.readline()
+            writer.write(b":not-a-number\r\n")
+            await reader.read()
+
+        outcomes = []
+        for handler in (hang, garbage):
+            server = await asyncio.start_server(handler, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            backend = RedisBackend(port=port, timeout=0.1, retry_interval=60)
+            started = asyncio.get_running_loop().time()
+            claimed = await backend.claim("a", 60)
+            summary = await backend.get_summary(1)
+            elapsed = asyncio.get_running_loop().time() - started
+            outcomes.append((claimed, summary, elapsed, backend._writer))
+            backend.close()
+            server.close()
+        return outcomes
+
+    for claimed, summary, elapsed, writer in run(scenario()):
+        assert claimed is True
+        assert summary is None
+        # Nothing waits longer than the timeout, and the connection was dropped
+        assert elapsed < 1.0
+        assert writer is None